@@ -14,3 +14,12 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'accounts.settings')
 
 application = get_asgi_application()
+
+# Optionally pay the nba_api/pandas import and static table load now, at worker
+# start (or once in the master with gunicorn --preload), instead of on the first player request.
+from django.conf import settings  # noqa: E402
+
+if settings.PLAYERS_WARMUP:
+    from players.upstream import warm_up  # noqa: E402
+
+    warm_up()
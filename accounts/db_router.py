@@ -0,0 +1,80 @@
+"""
+Primary/replica database routing.
+
+Writes always go to the primary ("default"). Reads go to the "replica" alias
+unless the current request is pinned to the primary, which happens when:
+
+  * the request is a write (POST/PUT/PATCH/DELETE): its reads feed its
+    writes and its select_for_update locks only exist on the primary;
+  * the client wrote less than REPLICA_STICKY_SECONDS ago, so a member who
+    just picked sees their pick even if the replica lags (read-your-writes);
+  * a transaction is open on the primary.
+
+ReplicaRoutingMiddleware (accounts/middleware.py) does the pinning per request;
+use_primary() does it for code outside a request.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+PRIMARY = "default"
+REPLICA = "replica"
+
+# Clients that wrote recently carry this cookie, holding the time their stickiness ends
+STICKY_COOKIE = "primary_until"
+
+_pinned: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if _pinned.get() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+@contextmanager
+def use_primary(pinned: bool = True):
+    token = _pinned.set(pinned or _pinned.get())
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def sticky_until(request) -> float:
+    try:
+        return float(request.COOKIES.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return 0.0
+
+
+def is_sticky(request) -> bool:
+    return sticky_until(request) > time.time()
+
+
+def replicate_sqlite(primary: str = PRIMARY, replica: str = REPLICA) -> None:
+    """
+    Copy the primary into the replica with SQLite's online backup API.
+
+    The SQLite replica is a stand-in for a streaming replica in development,
+    tests and benchmarks. It only changes when this runs, so everything
+    written since the last copy is "replication lag".
+    """
+    source, target = connections[primary], connections[replica]
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
@@ -0,0 +1,152 @@
+import functools
+import gzip
+import logging
+import random
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from . import db_router, profiling
+
+try:  # optional: pip install brotli
+    import brotli
+except ImportError:
+    brotli = None
+
+_ACCEPT_BR = _lazy_re_compile(r"\bbr\b")
+_ACCEPT_GZIP = _lazy_re_compile(r"\bgzip\b")
+
+logger = logging.getLogger(__name__)
+
+
+class CompressionMiddleware:
+    """
+    Compress JSON responses of at least COMPRESS_MIN_BYTES, with brotli when the
+    client accepts it and the brotli package is installed, otherwise gzip.
+
+    Only JSON is compressed: HTML pages carry CSRF tokens, and compressing
+    secrets next to attacker-influenced text is what BREACH exploits.
+    Strong ETags become weak, as with Django's GZipMiddleware, since the bytes
+    on the wire no longer match the uncompressed representation.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_bytes = getattr(settings, "COMPRESS_MIN_BYTES", 1024)
+        self.gzip_level = getattr(settings, "COMPRESS_GZIP_LEVEL", 6)
+        self.brotli_quality = getattr(settings, "COMPRESS_BROTLI_QUALITY", 5)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or not response.get("Content-Type", "").startswith("application/json")
+        ):
+            return response
+
+        # Whether or not this one is compressed, the representation depends on it
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if len(response.content) < self.min_bytes:
+            return response
+
+        accept = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if brotli is not None and _ACCEPT_BR.search(accept):
+            content, encoding = brotli.compress(response.content, quality=self.brotli_quality), "br"
+        elif _ACCEPT_GZIP.search(accept):
+            content, encoding = gzip.compress(response.content, compresslevel=self.gzip_level, mtime=0), "gzip"
+        else:
+            return response
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response["Content-Length"] = str(len(content))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in (PROFILE_ENABLED) sampling profiler. Every request is sampled by
+    accounts.profiling's background thread; the stacks are written to
+    PROFILE_DIR only for a random PROFILE_SAMPLE_RATE share of requests and for
+    any request slower than PROFILE_SLOW_MS, and dropped otherwise.
+    Staff can read them at /profiles/.
+
+    WSGI only: samples are attributed to a request by its thread, and under
+    ASGI concurrent requests share threads, so ASGI requests are not sampled.
+
+    Keep it first in MIDDLEWARE so the other middleware's time is included.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILE_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PROFILE_SAMPLE_RATE", 0.01)
+        self.slow_ms = getattr(settings, "PROFILE_SLOW_MS", 1000)
+        self.directory = Path(settings.PROFILE_DIR)
+        self.keep = getattr(settings, "PROFILE_KEEP", 50)
+        self.sampler = _sampler(getattr(settings, "PROFILE_INTERVAL_MS", 5) / 1000)
+
+    def __call__(self, request):
+        if isinstance(request, ASGIRequest):
+            return self.get_response(request)
+        started = time.perf_counter()
+        # Stacks stop at this frame, so they start at the middleware below it
+        self.sampler.start(stop_at=ProfilingMiddleware.__call__.__code__)
+        try:
+            return self.get_response(request)
+        finally:
+            samples = self.sampler.stop()
+            duration_ms = (time.perf_counter() - started) * 1000
+            if samples and (duration_ms >= self.slow_ms or random.random() < self.sample_rate):
+                match = request.resolver_match
+                endpoint = profiling.endpoint_key(request.method, match.route if match else "")
+                try:
+                    profiling.write(self.directory, endpoint, samples, duration_ms, self.keep)
+                except OSError:
+                    logger.exception("Could not write profile for %s", endpoint)
+
+
+@functools.cache
+def _sampler(interval: float) -> profiling.Sampler:
+    return profiling.Sampler(interval)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Pins writes, and reads from clients that wrote in the last
+    REPLICA_STICKY_SECONDS, to the primary database (see accounts/db_router.py).
+    Not used unless PrimaryReplicaRouter is in DATABASE_ROUTERS.
+    """
+
+    def __init__(self, get_response):
+        if "accounts.db_router.PrimaryReplicaRouter" not in getattr(settings, "DATABASE_ROUTERS", []):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, "REPLICA_STICKY_SECONDS", 5)
+
+    def __call__(self, request):
+        write = request.method not in ("GET", "HEAD", "OPTIONS", "TRACE")
+        with db_router.use_primary(write or db_router.is_sticky(request)):
+            response = self.get_response(request)
+
+        if write and response.status_code < 400 and self.sticky_seconds > 0:
+            response.set_cookie(
+                db_router.STICKY_COOKIE,
+                f"{time.time() + self.sticky_seconds:.3f}",
+                max_age=self.sticky_seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,167 @@
+"""
+Sampling profiler for slow or randomly chosen requests (see ProfilingMiddleware).
+
+One daemon thread per process wakes every PROFILE_INTERVAL_MS, reads the
+current stack of each thread that is inside a request (sys._current_frames)
+and counts it. Requests that are not being sampled pay nothing beyond a dict
+insert and delete, so the cost does not grow with the number of calls a view
+makes, unlike cProfile.
+
+Samples are keyed by thread id, so a thread must serve one request at a time:
+fine under WSGI, but not under ASGI, where the middleware skips sampling.
+
+Kept profiles are stored as collapsed stacks, the input format of
+flamegraph.pl and speedscope:
+    PROFILE_DIR/<METHOD route>/<utc time>-<duration>ms-<id>.collapsed
+Each line is "outer;...;inner <samples>". to_speedscope() converts one or
+more of them to speedscope's JSON format.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+_FILE_NAME = re.compile(r"^(?P<at>\d{8}T\d{6}Z)-(?P<ms>\d+)ms-(?P<id>[0-9a-f]+)\.collapsed$")
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+# ---------- Sampling ----------
+
+class Sampler:
+    """Counts the stacks of registered threads from one background thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: dict[int, tuple[Counter, object]] = {}
+        self._names: dict[object, str] = {}
+        self._thread: threading.Thread | None = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self, stop_at=None) -> Counter:
+        """
+        Sample the calling thread until stop() and return its (live) counter.
+        Frames from `stop_at` (a code object) outwards are left off every stack.
+        """
+        self._ensure_thread()
+        samples = Counter()
+        self._active[threading.get_ident()] = (samples, stop_at)
+        return samples
+
+    def stop(self) -> Counter:
+        samples, _ = self._active.pop(threading.get_ident(), (Counter(), None))
+        return samples
+
+    def _ensure_thread(self) -> None:
+        # Threads don't survive fork, so a preloaded gunicorn master's sampler
+        # is restarted in each worker
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            if not self._active:
+                continue
+            frames = sys._current_frames()
+            for ident, (samples, stop_at) in list(self._active.items()):
+                frame = frames.get(ident)
+                if frame is not None:
+                    samples[self._stack(frame, stop_at)] += 1
+            del frames
+
+    def _stack(self, frame, stop_at) -> str:
+        names = []
+        while frame is not None and frame.f_code is not stop_at:
+            code = frame.f_code
+            name = self._names.get(code)
+            if name is None:
+                name = self._names[code] = (
+                    f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})".replace(";", ",")
+                )
+            names.append(name)
+            frame = frame.f_back
+        names.reverse()
+        return ";".join(names)
+
+
+# ---------- Storage ----------
+
+def endpoint_key(method: str, route: str) -> str:
+    """Directory name for a route, e.g. POST league_leagues_int_league_id_pick_"""
+    return _UNSAFE.sub("_", f"{method} {route or 'unresolved'}").strip("_")[:150]
+
+
+def write(directory: Path, endpoint: str, samples: Counter, duration_ms: float, keep: int) -> Path:
+    """Write one profile, then drop the endpoint's oldest beyond `keep`."""
+    folder = directory / endpoint
+    folder.mkdir(parents=True, exist_ok=True)
+    at = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = folder / f"{at}-{int(duration_ms)}ms-{uuid4().hex[:8]}.collapsed"
+    path.write_text("".join(f"{stack} {count}\n" for stack, count in samples.most_common()))
+
+    for old in sorted(folder.glob("*.collapsed"))[:-keep or None]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def describe(path: Path) -> dict | None:
+    m = _FILE_NAME.match(path.name)
+    if not m:
+        return None
+    return {
+        "file": path.name,
+        "recorded_at": datetime.strptime(m["at"], "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc).isoformat(),
+        "duration_ms": int(m["ms"]),
+        "bytes": path.stat().st_size,
+    }
+
+
+def read_collapsed(paths: list[Path]) -> Counter:
+    merged = Counter()
+    for path in paths:
+        for line in path.read_text().splitlines():
+            stack, _, count = line.rpartition(" ")
+            if stack:
+                merged[stack] += int(count)
+    return merged
+
+
+def to_speedscope(name: str, samples: Counter, interval_ms: float) -> dict:
+    frames: list[dict] = []
+    index: dict[str, int] = {}
+    stacks, weights = [], []
+    for stack, count in samples.most_common():
+        ids = []
+        for frame in stack.split(";"):
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({"name": frame})
+            ids.append(index[frame])
+        stacks.append(ids)
+        weights.append(count * interval_ms)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "accounts.profiling",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": stacks,
+            "weights": weights,
+        }],
+    }
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,11 +42,15 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'league',
-    'user'
+    'user',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'accounts.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'accounts.middleware.CompressionMiddleware',
+    'accounts.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -86,14 +92,110 @@ WSGI_APPLICATION = 'accounts.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# SQLite ignores select_for_update(), and two deferred transactions that both read and
+# then write deadlock ("database is locked"). BEGIN IMMEDIATE takes the write lock up
+# front, so draft writes queue behind each other instead (see `manage.py stress_draft`).
+SQLITE_OPTIONS = {'transaction_mode': 'IMMEDIATE'}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
     }
 }
 
 
+# Cache
+# Every gunicorn/uvicorn worker is a separate process, so the cache must be shared
+# between them. Defaults to a file-based cache; set DJANGO_CACHE_URL=redis://host:6379/0
+# to use Redis in production. Tests always get an isolated in-memory cache.
+
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
+CACHE_URL = os.environ.get('DJANGO_CACHE_URL', '')
+
+if TESTING:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+elif CACHE_URL.startswith(('redis://', 'rediss://', 'unix://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('DJANGO_CACHE_DIR', str(BASE_DIR / '.cache')),
+        }
+    }
+
+# Seconds a serialized league stays cached (it is also invalidated on every draft write)
+LEAGUE_CACHE_TIMEOUT = 300
+
+
+# Read replica (accounts/db_router.py). Set DJANGO_DB_REPLICA to a SQLite file to route
+# reads there and writes to the primary; `manage.py replicate_db` refreshes the file from
+# the primary, standing in for a streaming replica. A client that wrote in the last
+# REPLICA_STICKY_SECONDS keeps reading from the primary. Tests get a throwaway replica
+# file but no router unless they install one.
+DB_REPLICA = os.environ.get('DJANGO_DB_REPLICA', '')
+if DB_REPLICA or TESTING:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': DB_REPLICA or BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {'NAME': BASE_DIR / 'test_db_replica.sqlite3'},
+    }
+DATABASE_ROUTERS = ['accounts.db_router.PrimaryReplicaRouter'] if DB_REPLICA else []
+REPLICA_STICKY_SECONDS = 5
+
+# League sharding (league/sharding.py). DJANGO_LEAGUE_SHARDS=N keeps each league's rows in
+# one of N SQLite databases, chosen by league id ("default" is shard 0); set up new shards
+# with `manage.py migrate --database=league_shard_<i>`. N cannot change once leagues exist.
+# Tests get two spare shard files and install the router themselves.
+LEAGUE_SHARDS = ['default'] + [f'league_shard_{i}' for i in range(1, int(os.environ.get('DJANGO_LEAGUE_SHARDS', '1')))]
+for _alias in LEAGUE_SHARDS[1:] + (['league_shard_1', 'league_shard_2'] if TESTING else []):
+    DATABASES.setdefault(_alias, {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db.{_alias}.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
+        'TEST': {'NAME': BASE_DIR / f'test_db_{_alias}.sqlite3'},
+    })
+if len(LEAGUE_SHARDS) > 1:
+    # League queries go to their shard before the replica router sees them
+    DATABASE_ROUTERS = ['league.sharding.LeagueShardRouter'] + DATABASE_ROUTERS
+
+
+# Sessions and auth
+# cached_db reads sessions from the shared cache and only falls back to the
+# django_session table on a miss; "cache" skips the table entirely (sessions are
+# lost if the cache is flushed); "db" is Django's default.
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+}[os.environ.get('DJANGO_SESSION_ENGINE', 'cached_db')]
+
+# request.user is served from the cache too (see user/backends.py)
+AUTHENTICATION_BACKENDS = ['user.backends.CachedModelBackend']
+AUTH_USER_CACHE_TIMEOUT = 300
+
+# Failed login limiter (user/throttle.py)
+LOGIN_MAX_ATTEMPTS_PER_IP = 20
+LOGIN_MAX_ATTEMPTS_PER_USERNAME = 5
+LOGIN_ATTEMPT_WINDOW = 15 * 60
+
+# Tests create users constantly; the default PBKDF2 cost is for production only
+if TESTING:
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -129,3 +231,106 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+
+
+# League draft event log: store a replay snapshot every N events
+DRAFT_SNAPSHOT_INTERVAL = 20
+
+# Max players on a fantasy roster (enforced by trades and waiver claims)
+LEAGUE_ROSTER_SIZE = 13
+
+# nba_api seasons: the players API default, and the season still being played.
+# Stored game logs for the current season are refetched after NBA_CURRENT_SEASON_TTL seconds;
+# finished seasons are loaded once.
+NBA_DEFAULT_SEASON = '2024-25'
+NBA_CURRENT_SEASON = '2024-25'
+NBA_CURRENT_SEASON_TTL = 6 * 60 * 60
+
+# Preload nba_api and the static player/team tables when a web worker starts
+# (see players/upstream.py). Off by default so manage.py commands stay fast.
+PLAYERS_WARMUP = os.environ.get('PLAYERS_WARMUP', '') == '1'
+
+# Build the /api/teams/ payload and ETag in PlayersConfig.ready() when the static
+# index is already on disk (a map, no nba_api import). Set 0 to build on first request.
+PLAYERS_WARM_REFERENCE = os.environ.get('PLAYERS_WARM_REFERENCE', '1') == '1'
+
+# Memory-mapped static player/team index (players/static_index.py), one file per
+# nba_api version. Build it at deploy time with `manage.py build_static_index`.
+STATIC_INDEX_DIR = Path(os.environ.get('STATIC_INDEX_DIR', BASE_DIR / '.cache'))
+
+# Memory-mapped columnar game logs for the analytics endpoints (players/columnar.py),
+# one directory per season. Rebuilt by `manage.py build_columnar` and after each backfill.
+COLUMNAR_DIR = Path(os.environ.get('COLUMNAR_DIR', BASE_DIR / '.cache' / 'columnar'))
+
+# Mock draft simulator (league/simulation.py): request cap and process pool size (None = CPU count)
+MOCK_DRAFT_MAX_SIMULATIONS = 5000
+MOCK_DRAFT_WORKERS = None
+
+# Monte Carlo season projections (league/projections.py)
+PROJECTION_WEEKS = 20
+PROJECTION_GAMES_PER_WEEK = 3
+PROJECTION_MAX_SIMULATIONS = 20000
+
+# Daily lineup slots (league/lineups.py). G/F/C take players eligible at that
+# position; UTIL takes anyone. Rostered players not starting go to the bench.
+LINEUP_SLOTS = ['G', 'G', 'F', 'F', 'C', 'UTIL', 'UTIL', 'UTIL']
+
+# Player similarity index (players/similarity.py): seasons with fewer games are left out
+SIMILARITY_MIN_GAMES = 10
+
+# Email. With no EMAIL_HOST set, mail is printed to the console instead of sent.
+EMAIL_HOST = os.environ.get('EMAIL_HOST', '')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '587'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '1') == '1'
+EMAIL_TIMEOUT = 10
+EMAIL_BACKEND = os.environ.get(
+    'DJANGO_EMAIL_BACKEND',
+    'django.core.mail.backends.smtp.EmailBackend' if EMAIL_HOST else 'django.core.mail.backends.console.EmailBackend',
+)
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER or 'noreply@localhost')
+
+# League email outbox (league/outbox.py, delivered by `manage.py send_outbox`)
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BASE_SECONDS = 60
+OUTBOX_LEASE_SECONDS = 300
+
+# Background jobs (jobs/, run by `manage.py run_jobs`). Tasks are registered in each
+# app's tasks.py; JOBS_SCHEDULES enqueues them every `every` seconds.
+JOBS_WORKER_THREADS = int(os.environ.get('DJANGO_JOBS_THREADS', '4'))
+JOBS_POLL_SECONDS = 1.0
+# A job not finished this long after it was claimed is assumed lost and run again
+JOBS_LEASE_SECONDS = 600
+JOBS_SCHEDULES = {
+    'send-outbox': {'task': 'league.send_outbox', 'every': 60},
+    'process-waivers': {'task': 'league.process_waivers', 'every': 24 * 60 * 60},
+    'optimize-lineups': {'task': 'league.optimize_lineups', 'every': 24 * 60 * 60},
+    'rebuild-adp': {'task': 'league.rebuild_adp', 'every': 60 * 60},
+}
+
+# Per-client token bucket for /api/players/ and /api/teams/ (players/throttling.py):
+# bursts of API_THROTTLE_BURST requests, refilled at API_THROTTLE_RATE per second
+API_THROTTLE_BURST = 30
+API_THROTTLE_RATE = 5.0
+
+# Reference endpoints (teams, player search, finished-season rosters) send
+# ETags and Cache-Control: public, max-age=REFERENCE_MAX_AGE (players/reference.py)
+REFERENCE_MAX_AGE = 24 * 60 * 60
+
+# JSON responses at least this large are gzip/brotli compressed (accounts/middleware.py)
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_GZIP_LEVEL = 6
+COMPRESS_BROTLI_QUALITY = 5
+
+# Sampling profiler (accounts/middleware.py ProfilingMiddleware). When enabled, every
+# request's stacks are sampled each PROFILE_INTERVAL_MS; a PROFILE_SAMPLE_RATE share of
+# requests and any request slower than PROFILE_SLOW_MS are kept, the newest PROFILE_KEEP
+# per endpoint. Staff can read them at /profiles/. WSGI only; ASGI requests are not sampled.
+PROFILE_ENABLED = os.environ.get('DJANGO_PROFILE', '') == '1'
+PROFILE_SAMPLE_RATE = float(os.environ.get('DJANGO_PROFILE_SAMPLE_RATE', '0.01'))
+PROFILE_SLOW_MS = int(os.environ.get('DJANGO_PROFILE_SLOW_MS', '1000'))
+PROFILE_INTERVAL_MS = 5
+PROFILE_KEEP = 50
+PROFILE_DIR = Path(os.environ.get('DJANGO_PROFILE_DIR', BASE_DIR / '.cache' / 'profiles'))
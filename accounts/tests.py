@@ -0,0 +1,145 @@
+import json
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from . import profiling
+from .middleware import ProfilingMiddleware
+
+
+def slow_view(request):
+    time.sleep(0.05)
+    return HttpResponse("ok")
+
+
+class ProfilingTests(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        self.enterContext(override_settings(PROFILE_ENABLED=True, PROFILE_DIR=self.directory, PROFILE_INTERVAL_MS=1))
+
+    def stored(self) -> list[Path]:
+        return sorted(self.directory.glob("*/*.collapsed"))
+
+    def test_sampler_sees_only_frames_below_stop_at(self):
+        sampler = profiling.Sampler(0.001)
+        samples = sampler.start(stop_at=self.test_sampler_sees_only_frames_below_stop_at.__code__)
+        slow_view(None)
+        self.assertIs(sampler.stop(), samples)
+
+        self.assertTrue(samples)
+        self.assertTrue(all(stack.startswith("slow_view (tests.py:") for stack in samples), list(samples))
+        # A stopped thread is no longer sampled
+        time.sleep(0.01)
+        self.assertEqual(sampler.stop(), Counter())
+
+    def test_disabled_by_default(self):
+        with override_settings(PROFILE_ENABLED=False), self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(slow_view)
+
+    def test_keeps_slow_and_sampled_requests(self):
+        request = RequestFactory().get("/x/")
+        with override_settings(PROFILE_SAMPLE_RATE=0, PROFILE_SLOW_MS=10_000):
+            ProfilingMiddleware(slow_view)(request)
+        self.assertEqual(self.stored(), [])
+
+        with override_settings(PROFILE_SAMPLE_RATE=0, PROFILE_SLOW_MS=20):
+            ProfilingMiddleware(slow_view)(request)
+        with override_settings(PROFILE_SAMPLE_RATE=1, PROFILE_SLOW_MS=10_000):
+            ProfilingMiddleware(slow_view)(request)
+
+        stored = self.stored()
+        self.assertEqual(len(stored), 2)
+        self.assertEqual({p.parent.name for p in stored}, {"GET_unresolved"})
+        for path in stored:
+            self.assertGreaterEqual(profiling.describe(path)["duration_ms"], 50)
+            # Stacks start below the profiling middleware
+            stacks = profiling.read_collapsed([path])
+            self.assertTrue(all(s.startswith("slow_view (") for s in stacks), list(stacks))
+
+    def test_asgi_requests_are_not_sampled(self):
+        # Concurrent ASGI requests share threads, so their samples can't be told apart
+        with override_settings(PROFILE_SAMPLE_RATE=1, PROFILE_SLOW_MS=0):
+            response = ProfilingMiddleware(slow_view)(AsyncRequestFactory().get("/x/"))
+        self.assertEqual(response.content, b"ok")
+        self.assertEqual(self.stored(), [])
+
+    def test_keep_limits_profiles_per_endpoint(self):
+        for _ in range(4):
+            profiling.write(self.directory, "GET_a", Counter({"f;g": 1}), 5, keep=3)
+        profiling.write(self.directory, "GET_b", Counter({"f;g": 1}), 5, keep=3)
+        self.assertEqual(len(list((self.directory / "GET_a").iterdir())), 3)
+        self.assertEqual(len(list((self.directory / "GET_b").iterdir())), 1)
+
+    def test_endpoint_key(self):
+        self.assertEqual(profiling.endpoint_key("POST", "league/leagues/<int:league_id>/pick/"),
+                         "POST_league_leagues_int_league_id_pick")
+        self.assertEqual(profiling.endpoint_key("GET", ""), "GET_unresolved")
+
+    def test_speedscope_export(self):
+        samples = Counter({"a;b;c": 3, "a;b": 1, "a;d": 2})
+        doc = profiling.to_speedscope("GET x", samples, 5)
+
+        names = [f["name"] for f in doc["shared"]["frames"]]
+        self.assertEqual(sorted(names), ["a", "b", "c", "d"])
+        profile = doc["profiles"][0]
+        self.assertEqual(profile["type"], "sampled")
+        stacks = {";".join(names[i] for i in s): w for s, w in zip(profile["samples"], profile["weights"])}
+        self.assertEqual(stacks, {"a;b;c": 15, "a;b": 5, "a;d": 10})
+        self.assertEqual(profile["endValue"], 30)
+
+
+class ProfileViewTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        self.enterContext(override_settings(PROFILE_DIR=self.directory, PROFILE_INTERVAL_MS=5))
+        self.first = profiling.write(self.directory, "GET_api_teams", Counter({"view;query": 2, "view": 1}), 40, 50)
+        profiling.write(self.directory, "GET_api_teams", Counter({"view;query": 1}), 30, 50)
+
+        staff = get_user_model().objects.create_user("staff", "staff@test.com", "pw", is_staff=True)
+        self.client.force_login(staff)
+
+    def test_staff_only(self):
+        self.client.logout()
+        get_user_model().objects.create_user("ann", "ann@test.com", "pw")
+        self.client.login(username="ann", password="pw")
+        self.assertEqual(self.client.get("/profiles/").status_code, 302)
+
+    def test_index(self):
+        data = self.client.get("/profiles/").json()
+        [endpoint] = data["endpoints"]
+        self.assertEqual(endpoint["endpoint"], "GET_api_teams")
+        self.assertEqual(sorted(p["duration_ms"] for p in endpoint["profiles"]), [30, 40])
+        self.assertIn(self.first.name, [p["file"] for p in endpoint["profiles"]])
+
+    def test_collapsed_merges_profiles(self):
+        res = self.client.get("/profiles/GET_api_teams/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content.decode(), "view;query 3\nview 1\n")
+
+        res = self.client.get(f"/profiles/GET_api_teams/{self.first.name}")
+        self.assertEqual(res.content.decode(), "view;query 2\nview 1\n")
+
+    def test_speedscope(self):
+        res = self.client.get(f"/profiles/GET_api_teams/{self.first.name}?format=speedscope")
+        self.assertIn(".speedscope.json", res["Content-Disposition"])
+        doc = json.loads(res.content)
+        self.assertEqual(doc["profiles"][0]["endValue"], 15)
+
+        self.assertEqual(self.client.get("/profiles/GET_api_teams/?format=pprof").status_code, 400)
+
+    def test_unknown_or_unsafe_paths(self):
+        self.assertEqual(self.client.get("/profiles/GET_other/").status_code, 404)
+        self.assertEqual(self.client.get("/profiles/GET_api_teams/missing.collapsed").status_code, 404)
+        self.assertEqual(self.client.get("/profiles/..%2F/").status_code, 404)
@@ -18,6 +18,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.shortcuts import redirect
 
+from .views import profile_detail, profile_index
+
 def root_redirect(request):
     return redirect('login')
 
@@ -28,5 +30,8 @@ urlpatterns = [
     path('user/', include('django.contrib.auth.urls')),
     path("api/", include("players.urls")),
     path("league/", include("league.urls")),
+    path("profiles/", profile_index, name="profile-index"),
+    path("profiles/<str:endpoint>/", profile_detail, name="profile-endpoint"),
+    path("profiles/<str:endpoint>/<str:name>", profile_detail, name="profile-detail"),
 ]
  
@@ -0,0 +1,69 @@
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse, JsonResponse
+
+from . import profiling
+
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def _profile_dir() -> Path:
+    return Path(settings.PROFILE_DIR)
+
+
+def _endpoint_dir(endpoint: str) -> Path:
+    folder = _profile_dir() / endpoint
+    if not _SAFE_NAME.match(endpoint) or not folder.is_dir():
+        raise Http404("No profiles for this endpoint")
+    return folder
+
+
+@staff_member_required
+def profile_index(request):
+    """
+    GET /profiles/
+    Endpoints with stored profiles, newest first.
+    """
+    root = _profile_dir()
+    endpoints = []
+    if root.is_dir():
+        for folder in sorted(p for p in root.iterdir() if p.is_dir()):
+            profiles = [d for d in map(profiling.describe, sorted(folder.glob("*.collapsed"), reverse=True)) if d]
+            endpoints.append({"endpoint": folder.name, "profiles": profiles})
+    return JsonResponse({
+        "enabled": getattr(settings, "PROFILE_ENABLED", False),
+        "interval_ms": getattr(settings, "PROFILE_INTERVAL_MS", 5),
+        "endpoints": endpoints,
+    })
+
+
+@staff_member_required
+def profile_detail(request, endpoint: str, name: str | None = None):
+    """
+    GET /profiles/<endpoint>/                 every stored profile of the endpoint, merged
+    GET /profiles/<endpoint>/<file>.collapsed one request
+    ?format=collapsed (default, for flamegraph.pl) or ?format=speedscope
+    """
+    folder = _endpoint_dir(endpoint)
+    if name is None:
+        paths = sorted(folder.glob("*.collapsed"))
+    else:
+        path = folder / name
+        if not _SAFE_NAME.match(name) or not path.is_file():
+            raise Http404("No such profile")
+        paths = [path]
+
+    samples = profiling.read_collapsed(paths)
+    fmt = request.GET.get("format", "collapsed")
+    if fmt == "speedscope":
+        title = f"{endpoint}/{name}" if name else f"{endpoint} ({len(paths)} requests)"
+        response = JsonResponse(profiling.to_speedscope(title, samples, getattr(settings, "PROFILE_INTERVAL_MS", 5)))
+        response["Content-Disposition"] = f'attachment; filename="{(name or endpoint).removesuffix(".collapsed")}.speedscope.json"'
+        return response
+    if fmt != "collapsed":
+        return JsonResponse({"error": "format must be collapsed or speedscope"}, status=400)
+    body = "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+    return HttpResponse(body, content_type="text/plain; charset=utf-8")
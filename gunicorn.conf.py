@@ -0,0 +1,16 @@
+"""
+Gunicorn config for the multi-worker deployment mode.
+
+    gunicorn -c gunicorn.conf.py accounts.wsgi:application
+
+Workers are stateless: draft state lives in the database and cached payloads
+live in the shared cache (DJANGO_CACHE_URL / DJANGO_CACHE_DIR), so any number
+of workers can serve the same league.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 90))  # nba_api calls use timeout=60
@@ -0,0 +1,37 @@
+# jobs/management/commands/enqueue_job.py
+
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = "Queue one run of a background task, e.g. enqueue_job players.backfill_season --kwargs '{\"season\": \"2023-24\"}'"
+
+    def add_arguments(self, parser):
+        parser.add_argument("task", help="Registered task name")
+        parser.add_argument("--kwargs", default="{}", help="Task keyword arguments as a JSON object")
+        parser.add_argument("--priority", type=int, default=None, help="Higher runs first (default: the task's)")
+        parser.add_argument("--delay", type=float, default=0.0, help="Seconds before the job may run")
+        parser.add_argument("--key", default=None, help="Idempotency key: skip if a job with this key exists")
+
+    def handle(self, *args, **options):
+        try:
+            kwargs = json.loads(options["kwargs"])
+        except json.JSONDecodeError as e:
+            raise CommandError(f"--kwargs is not valid JSON: {e}")
+        if not isinstance(kwargs, dict):
+            raise CommandError("--kwargs must be a JSON object")
+
+        try:
+            job = queue.enqueue(
+                options["task"], kwargs, priority=options["priority"], idempotency_key=options["key"],
+                run_at=timezone.now() + timedelta(seconds=options["delay"]),
+            )
+        except LookupError as e:
+            raise CommandError(str(e))
+        self.stdout.write(f"job={job.id} task={job.task} status={job.status} priority={job.priority} run_at={job.run_at}")
@@ -0,0 +1,26 @@
+# jobs/management/commands/job_stats.py
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = "Queue depth, plus throughput and queue latency of the jobs finished in the last --minutes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--minutes", type=float, default=60.0)
+
+    def handle(self, *args, **options):
+        s = queue.stats(timezone.now() - timedelta(minutes=options["minutes"]))
+        self.stdout.write(
+            f"due={s['due']} delayed={s['delayed']} running={s['running']} "
+            f"finished={s['finished']} per_minute={s['per_minute']:.1f} "
+            f"latency p50={s['latency_p50_ms']:.0f}ms p95={s['latency_p95_ms']:.0f}ms max={s['latency_max_ms']:.0f}ms "
+            f"run p50={s['run_p50_ms']:.0f}ms p95={s['run_p95_ms']:.0f}ms"
+        )
+        for task, counts in sorted(s["tasks"].items()):
+            self.stdout.write(f"  {task}: succeeded={counts['succeeded']} failed={counts['failed']}")
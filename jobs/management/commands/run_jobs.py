@@ -0,0 +1,65 @@
+# jobs/management/commands/run_jobs.py
+
+import multiprocessing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from accounts.db_router import use_primary
+from jobs import queue, registry
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs from the database queue: a pool of worker threads (and optionally processes), "
+        "plus the periodic schedules from settings.JOBS_SCHEDULES."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=None, help="Worker threads per process")
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes (forked)")
+        parser.add_argument("--tasks", default="", help="Comma separated task names to run (default: all)")
+        parser.add_argument("--poll", type=float, default=None, help="Seconds between polls of an empty queue")
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is due")
+        parser.add_argument("--report", type=float, default=60.0, help="Seconds between metrics lines")
+
+    def handle(self, *args, **options):
+        tasks = [t.strip() for t in options["tasks"].split(",") if t.strip()]
+        try:
+            for name in tasks:
+                registry.get(name)
+            with use_primary():
+                queue.sync_schedules(getattr(settings, "JOBS_SCHEDULES", {}))
+        except LookupError as e:
+            raise CommandError(str(e))
+
+        threads = options["threads"] or getattr(settings, "JOBS_WORKER_THREADS", 4)
+        self.stdout.write(
+            f"processes={options['processes']} threads={threads} tasks={','.join(tasks) or 'all'} "
+            f"registered={','.join(registry.names())}"
+        )
+
+        def work():
+            worker = Worker(threads, tasks, poll=options["poll"], burst=options["burst"],
+                            report_every=options["report"], log=self.stdout.write)
+            self.stdout.write(f"{worker.name} done: {worker.run().line()}")
+
+        if options["processes"] <= 1:
+            work()
+            return
+
+        # Forked children must not reuse the parent's DB connections
+        connections.close_all()
+        ctx = multiprocessing.get_context("fork")
+        procs = [ctx.Process(target=work) for _ in range(options["processes"])]
+        for p in procs:
+            p.start()
+        try:
+            for p in procs:
+                p.join()
+        except KeyboardInterrupt:
+            # The children got the same SIGINT and finish their running jobs
+            for p in procs:
+                p.join()
@@ -0,0 +1,57 @@
+# jobs/models.py
+
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """One run of a registered task (jobs/registry.py), claimed and run by `manage.py run_jobs`."""
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED"
+        RUNNING = "RUNNING"
+        SUCCEEDED = "SUCCEEDED"
+        FAILED = "FAILED"
+
+    task = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True)
+    # Higher runs first
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    # Enqueueing an existing key returns that job instead of adding another
+    idempotency_key = models.CharField(max_length=200, null=True, blank=True, unique=True)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    # Not claimed before this time (delayed jobs, retry backoff)
+    run_at = models.DateTimeField(default=timezone.now)
+    # A RUNNING job whose worker hasn't finished by this time is claimed again
+    locked_until = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-priority", "run_at"]),
+            models.Index(fields=["status", "locked_until"]),
+        ]
+
+
+class PeriodicSchedule(models.Model):
+    """
+    Enqueues `task` every interval_seconds. Synced from settings.JOBS_SCHEDULES
+    when a worker starts; every worker ticks the schedules and the idempotency
+    key (name plus due time) keeps a due run from being enqueued twice.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    task = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0)
+    interval_seconds = models.PositiveIntegerField()
+    enabled = models.BooleanField(default=True)
+    next_run_at = models.DateTimeField(default=timezone.now)
+    last_enqueued_at = models.DateTimeField(null=True, blank=True)
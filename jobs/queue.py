@@ -0,0 +1,258 @@
+# jobs/queue.py
+#
+# Database-backed job queue: no broker, just the Job table.
+#
+# A worker claims a job with a conditional UPDATE (status and attempts must
+# still be what it read), so two workers never run the same attempt, on
+# SQLite as well as on Postgres. The claim leases the job; if the worker dies,
+# the job is claimed again once the lease runs out, or failed if that was its
+# last attempt. Failed attempts are retried with exponential backoff until the
+# task's max_attempts.
+
+from __future__ import annotations
+import json
+import math
+import traceback
+from dataclasses import asdict, is_dataclass
+from datetime import datetime, timedelta
+from typing import Any
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+from accounts.db_router import use_primary
+from .models import Job, PeriodicSchedule
+from . import registry
+
+# Due jobs read per claim; the first one whose UPDATE wins is taken
+_CLAIM_CANDIDATES = 20
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+# ----------------------------
+# Enqueue
+# ----------------------------
+
+def enqueue(task_name: str, kwargs: dict[str, Any] | None = None, *, priority: int | None = None,
+            run_at: datetime | None = None, idempotency_key: str | None = None) -> Job:
+    """
+    Queue a run of a registered task. With an idempotency_key, a job already
+    queued (or run) under that key is returned instead of adding another.
+    """
+    task = registry.get(task_name)
+    kwargs = kwargs or {}
+    json.dumps(kwargs)  # TypeError now rather than in the worker
+
+    fields = {
+        "task": task.name,
+        "kwargs": kwargs,
+        "priority": task.priority if priority is None else priority,
+        "max_attempts": task.max_attempts,
+        "run_at": run_at or timezone.now(),
+        "idempotency_key": idempotency_key,
+    }
+    # The key check must not read a lagging replica
+    with use_primary():
+        if idempotency_key is None:
+            return Job.objects.create(**fields)
+        existing = Job.objects.filter(idempotency_key=idempotency_key).first()
+        if existing:
+            return existing
+        try:
+            with transaction.atomic():
+                return Job.objects.create(**fields)
+        except IntegrityError:
+            # Enqueued concurrently under the same key
+            return Job.objects.get(idempotency_key=idempotency_key)
+
+
+# ----------------------------
+# Claim and finish (workers, see jobs/worker.py)
+# ----------------------------
+
+def _due(now: datetime) -> Q:
+    return (
+        Q(status=Job.Status.QUEUED, run_at__lte=now)
+        | Q(status=Job.Status.RUNNING, locked_until__lt=now, attempts__lt=F("max_attempts"))
+    )
+
+
+def _fail_exhausted(now: datetime, tasks: list[str] | None) -> int:
+    """
+    Fail expired leases that have no attempts left. A job that crashes or kills
+    its worker never reaches run()'s except branch, so this is where it stops.
+    """
+    exhausted = Job.objects.filter(status=Job.Status.RUNNING, locked_until__lt=now, attempts__gte=F("max_attempts"))
+    if tasks:
+        exhausted = exhausted.filter(task__in=tasks)
+    return exhausted.update(
+        status=Job.Status.FAILED,
+        locked_until=None,
+        finished_at=now,
+        last_error=Concat(Value("Lease expired on the last attempt (worker "), F("worker"), Value(")")),
+    )
+
+
+def _lease(task_name: str) -> timedelta:
+    try:
+        seconds = registry.get(task_name).lease_seconds
+    except LookupError:
+        seconds = None
+    return timedelta(seconds=seconds or _setting("JOBS_LEASE_SECONDS", 600))
+
+
+def claim(worker: str, tasks: list[str] | None = None) -> Job | None:
+    """Take the highest priority due job (oldest first), or None if nothing is due."""
+    now = timezone.now()
+    _fail_exhausted(now, tasks)
+    due = Job.objects.filter(_due(now))
+    if tasks:
+        due = due.filter(task__in=tasks)
+    candidates = list(due.order_by("-priority", "run_at", "id").values_list("id", "task", "attempts")[:_CLAIM_CANDIDATES])
+
+    for job_id, task_name, attempts in candidates:
+        won = Job.objects.filter(_due(now), id=job_id, attempts=attempts).update(
+            status=Job.Status.RUNNING,
+            attempts=attempts + 1,
+            worker=worker[:100],
+            started_at=now,
+            locked_until=now + _lease(task_name),
+        )
+        if won:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def _jsonable(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        value = asdict(value)
+    return json.loads(json.dumps(value, default=str))
+
+
+def run(job: Job) -> Job.Status:
+    """Run a claimed job and record the outcome: SUCCEEDED, QUEUED (retry later) or FAILED."""
+    try:
+        task = registry.get(job.task)
+    except LookupError as e:
+        return _finish(job, Job.Status.FAILED, error=str(e))
+
+    try:
+        value = task.func(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            return _finish(job, Job.Status.FAILED, error=error)
+        # Exponential backoff: base, 2x base, 4x base, ...
+        delay = task.retry_base_seconds * 2 ** (job.attempts - 1)
+        return _finish(job, Job.Status.QUEUED, error=error, run_at=timezone.now() + timedelta(seconds=delay))
+    return _finish(job, Job.Status.SUCCEEDED, result=_jsonable(value))
+
+
+def _finish(job: Job, status: Job.Status, *, error: str = "", result: Any = None,
+            run_at: datetime | None = None) -> Job.Status:
+    fields = {"status": status, "locked_until": None, "last_error": error[-4000:]}
+    if status == Job.Status.QUEUED:
+        fields["run_at"] = run_at
+    else:
+        fields["finished_at"] = timezone.now()
+        fields["result"] = result
+    # Only while this worker still holds the attempt; after an expired lease another worker owns it
+    Job.objects.filter(id=job.id, status=Job.Status.RUNNING, attempts=job.attempts).update(**fields)
+    return status
+
+
+# ----------------------------
+# Periodic schedules
+# ----------------------------
+
+def sync_schedules(config: dict[str, dict[str, Any]]) -> None:
+    """
+    Make PeriodicSchedule match settings.JOBS_SCHEDULES:
+    {"name": {"task": ..., "every": seconds, "kwargs": {...}, "priority": 0}}.
+    Schedules missing from the config are disabled; due times are kept.
+    """
+    for name, spec in config.items():
+        registry.get(spec["task"])
+        PeriodicSchedule.objects.update_or_create(name=name, defaults={
+            "task": spec["task"],
+            "kwargs": spec.get("kwargs", {}),
+            "priority": spec.get("priority", 0),
+            "interval_seconds": int(spec["every"]),
+            "enabled": spec.get("enabled", True),
+        })
+    PeriodicSchedule.objects.exclude(name__in=list(config)).update(enabled=False)
+
+
+def tick_schedules() -> int:
+    """Enqueue every due schedule once and move it to its next time. Returns the number enqueued."""
+    now = timezone.now()
+    enqueued = 0
+    for schedule in PeriodicSchedule.objects.filter(enabled=True, next_run_at__lte=now):
+        due = schedule.next_run_at
+        # Enqueue first: if another worker (or this one, before a crash) got here, the key dedupes it
+        enqueue(schedule.task, schedule.kwargs, priority=schedule.priority,
+                idempotency_key=f"schedule:{schedule.name}:{due.isoformat()}")
+        # Runs missed while no worker was up collapse into this one
+        interval = timedelta(seconds=schedule.interval_seconds)
+        skipped = math.floor((now - due) / interval)
+        moved = PeriodicSchedule.objects.filter(pk=schedule.pk, next_run_at=due).update(
+            next_run_at=due + interval * (skipped + 1), last_enqueued_at=now,
+        )
+        enqueued += moved
+    return enqueued
+
+
+# ----------------------------
+# Metrics
+# ----------------------------
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(latencies: list[float], durations: list[float]) -> dict[str, float]:
+    """Queue latency (due -> started) and run time percentiles, in milliseconds."""
+    return {
+        "latency_p50_ms": _percentile(latencies, 0.50) * 1000,
+        "latency_p95_ms": _percentile(latencies, 0.95) * 1000,
+        "latency_max_ms": max(latencies, default=0.0) * 1000,
+        "run_p50_ms": _percentile(durations, 0.50) * 1000,
+        "run_p95_ms": _percentile(durations, 0.95) * 1000,
+    }
+
+
+def stats(since: datetime) -> dict[str, Any]:
+    """Queue depth now, plus throughput and latency of the jobs finished since `since`."""
+    now = timezone.now()
+    with use_primary():
+        depth = {
+            "due": Job.objects.filter(status=Job.Status.QUEUED, run_at__lte=now).count(),
+            "delayed": Job.objects.filter(status=Job.Status.QUEUED, run_at__gt=now).count(),
+            "running": Job.objects.filter(status=Job.Status.RUNNING).count(),
+        }
+        finished = list(
+            Job.objects.filter(finished_at__gte=since).values_list("task", "status", "run_at", "started_at", "finished_at")
+        )
+
+    by_task: dict[str, dict[str, int]] = {}
+    for task, status, *_ in finished:
+        counts = by_task.setdefault(task, {"succeeded": 0, "failed": 0})
+        counts["succeeded" if status == Job.Status.SUCCEEDED else "failed"] += 1
+    minutes = max((now - since).total_seconds() / 60, 1e-9)
+    return {
+        **depth,
+        "finished": len(finished),
+        "per_minute": len(finished) / minutes,
+        **summarize(
+            [(s - r).total_seconds() for _, _, r, s, _ in finished if s],
+            [(f - s).total_seconds() for _, _, _, s, f in finished if s],
+        ),
+        "tasks": by_task,
+    }
@@ -0,0 +1,47 @@
+# jobs/registry.py
+#
+# Tasks are plain functions registered by name with @task, in each app's
+# tasks.py (imported when the jobs app loads). A job stores the task name and
+# JSON keyword arguments, so anything a task takes must be JSON-serializable.
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: Callable[..., Any]
+    max_attempts: int = 3
+    # Retry n waits retry_base_seconds * 2**(n-1)
+    retry_base_seconds: int = 30
+    # How long a run may take before another worker assumes it crashed
+    lease_seconds: int | None = None
+    priority: int = 0
+
+
+_tasks: dict[str, Task] = {}
+
+
+def task(name: str, *, max_attempts: int = 3, retry_base_seconds: int = 30,
+         lease_seconds: int | None = None, priority: int = 0):
+    """Register the decorated function as background task `name`."""
+    def register(func):
+        # Same qualname is the same function imported twice (e.g. under two module paths)
+        if name in _tasks and _tasks[name].func.__qualname__ != func.__qualname__:
+            raise ValueError(f"Task {name!r} is already registered to {_tasks[name].func.__qualname__}")
+        _tasks[name] = Task(name, func, max_attempts, retry_base_seconds, lease_seconds, priority)
+        return func
+    return register
+
+
+def get(name: str) -> Task:
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise LookupError(f"Unknown task {name!r}. Registered: {', '.join(sorted(_tasks)) or 'none'}") from None
+
+
+def names() -> list[str]:
+    return sorted(_tasks)
@@ -0,0 +1,128 @@
+from datetime import timedelta
+
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from jobs import queue
+from jobs.models import Job, PeriodicSchedule
+from jobs.registry import task
+from jobs.worker import Worker
+
+
+@task("tests.echo")
+def echo(value=None):
+    return {"value": value}
+
+
+@task("tests.broken", max_attempts=2, retry_base_seconds=60)
+def broken():
+    raise RuntimeError("upstream down")
+
+
+class JobQueueTests(TestCase):
+
+    def test_higher_priority_first_then_oldest(self):
+        low = queue.enqueue("tests.echo", {"value": "low"}, priority=-1)
+        first = queue.enqueue("tests.echo", {"value": "first"})
+        high = queue.enqueue("tests.echo", {"value": "high"}, priority=5)
+        second = queue.enqueue("tests.echo", {"value": "second"})
+        queue.enqueue("tests.echo", {"value": "later"}, run_at=timezone.now() + timedelta(hours=1))
+
+        claimed = [queue.claim("w") for _ in range(5)]
+
+        self.assertEqual([j.id if j else None for j in claimed], [high.id, first.id, second.id, low.id, None])
+        self.assertEqual(claimed[0].status, Job.Status.RUNNING)
+        self.assertEqual(claimed[0].attempts, 1)
+
+    def test_idempotency_key_dedupes(self):
+        a = queue.enqueue("tests.echo", {"value": 1}, idempotency_key="lineups:2026-10-19")
+        b = queue.enqueue("tests.echo", {"value": 2}, idempotency_key="lineups:2026-10-19")
+
+        self.assertEqual(a.id, b.id)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_run_records_result(self):
+        queue.enqueue("tests.echo", {"value": 7})
+        job = queue.claim("w")
+
+        self.assertEqual(queue.run(job), Job.Status.SUCCEEDED)
+        job.refresh_from_db()
+        self.assertEqual(job.result, {"value": 7})
+        self.assertIsNone(job.locked_until)
+
+    def test_failure_is_retried_with_backoff_then_failed(self):
+        queue.enqueue("tests.broken")
+        job = queue.claim("w")
+        self.assertEqual(queue.run(job), Job.Status.QUEUED)
+        job.refresh_from_db()
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=50))
+        self.assertIn("upstream down", job.last_error)
+
+        # Not due until the backoff has passed
+        self.assertIsNone(queue.claim("w"))
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+
+        job = queue.claim("w")
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(queue.run(job), Job.Status.FAILED)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_expired_lease_is_claimed_again(self):
+        queue.enqueue("tests.echo")
+        stale = queue.claim("w1")
+        self.assertIsNone(queue.claim("w2"))
+
+        Job.objects.filter(pk=stale.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        current = queue.claim("w2")
+        self.assertEqual((current.id, current.attempts, current.worker), (stale.id, 2, "w2"))
+
+        # The first worker finishing late doesn't overwrite the new attempt
+        queue.run(stale)
+        self.assertEqual(Job.objects.get(pk=stale.pk).status, Job.Status.RUNNING)
+
+    def test_expired_last_attempt_is_failed(self):
+        queue.enqueue("tests.echo")
+        job = queue.claim("w1")
+        Job.objects.filter(pk=job.pk).update(attempts=job.max_attempts,
+                                             locked_until=timezone.now() - timedelta(seconds=1))
+
+        self.assertIsNone(queue.claim("w2"))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, job.max_attempts))
+        self.assertIsNone(job.locked_until)
+        self.assertIsNotNone(job.finished_at)
+        self.assertIn("Lease expired", job.last_error)
+        self.assertIn("w1", job.last_error)
+
+    def test_schedule_enqueues_each_due_time_once(self):
+        queue.sync_schedules({"echo": {"task": "tests.echo", "every": 60, "kwargs": {"value": "tick"}}})
+
+        self.assertEqual(queue.tick_schedules(), 1)
+        self.assertEqual(queue.tick_schedules(), 0)
+        self.assertEqual(Job.objects.get().kwargs, {"value": "tick"})
+
+        # Missed runs collapse into one, and the next due time is in the future again
+        PeriodicSchedule.objects.update(next_run_at=timezone.now() - timedelta(seconds=200))
+        self.assertEqual(queue.tick_schedules(), 1)
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertGreater(PeriodicSchedule.objects.get().next_run_at, timezone.now())
+
+        queue.sync_schedules({})
+        self.assertFalse(PeriodicSchedule.objects.get().enabled)
+
+
+class WorkerTests(TransactionTestCase):
+
+    def test_burst_worker_drains_the_queue(self):
+        for i in range(5):
+            queue.enqueue("tests.echo", {"value": i})
+        queue.enqueue("tests.broken")
+
+        stats = Worker(threads=1, burst=True, poll=0.01, log=lambda line: None).run()
+
+        self.assertEqual(stats.counts[Job.Status.SUCCEEDED], 5)
+        self.assertEqual(stats.counts[Job.Status.QUEUED], 1)
+        self.assertEqual(Job.objects.filter(status=Job.Status.SUCCEEDED).count(), 5)
+        self.assertIn("jobs=6", stats.line())
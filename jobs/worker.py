@@ -0,0 +1,119 @@
+# jobs/worker.py
+#
+# A pool of worker threads in one process (`manage.py run_jobs`). Each thread
+# claims and runs one job at a time on its own DB connection; the main thread
+# ticks periodic schedules and logs throughput and queue-latency metrics.
+
+from __future__ import annotations
+import os
+import socket
+import threading
+import time
+from collections import deque
+from typing import Callable
+from django.conf import settings
+from django.db import close_old_connections, connections
+from accounts.db_router import use_primary
+from .models import Job
+from . import queue
+
+# Latency/run-time samples kept for the percentiles
+_SAMPLES = 10_000
+
+
+class WorkerStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.counts = {Job.Status.SUCCEEDED: 0, Job.Status.QUEUED: 0, Job.Status.FAILED: 0}
+        self.latencies: deque[float] = deque(maxlen=_SAMPLES)
+        self.durations: deque[float] = deque(maxlen=_SAMPLES)
+        self._lock = threading.Lock()
+
+    def record(self, outcome: Job.Status, latency: float, duration: float) -> None:
+        with self._lock:
+            self.counts[outcome] += 1
+            self.latencies.append(latency)
+            self.durations.append(duration)
+
+    def line(self) -> str:
+        with self._lock:
+            done = sum(self.counts.values())
+            elapsed = time.perf_counter() - self.started
+            m = queue.summarize(list(self.latencies), list(self.durations))
+            return (
+                f"jobs={done} ok={self.counts[Job.Status.SUCCEEDED]} retried={self.counts[Job.Status.QUEUED]} "
+                f"failed={self.counts[Job.Status.FAILED]} jobs/s={done / elapsed:.1f} "
+                f"latency p50={m['latency_p50_ms']:.0f}ms p95={m['latency_p95_ms']:.0f}ms "
+                f"max={m['latency_max_ms']:.0f}ms run p50={m['run_p50_ms']:.0f}ms p95={m['run_p95_ms']:.0f}ms"
+            )
+
+
+class Worker:
+    """
+    threads:  jobs run at the same time in this process
+    tasks:    only claim these task names (default: all)
+    burst:    exit once nothing is due instead of polling forever
+    """
+
+    def __init__(self, threads: int = 4, tasks: list[str] | None = None, poll: float | None = None,
+                 burst: bool = False, report_every: float = 60.0, log: Callable[[str], None] = print):
+        self.threads = max(1, threads)
+        self.tasks = tasks or None
+        self.poll = poll if poll is not None else getattr(settings, "JOBS_POLL_SECONDS", 1.0)
+        self.burst = burst
+        self.report_every = report_every
+        self.log = log
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.stats = WorkerStats()
+        self.stop = threading.Event()
+
+    def run(self) -> WorkerStats:
+        with use_primary():
+            queue.tick_schedules()
+        pool = [
+            threading.Thread(target=self._loop, args=(f"{self.name}:{i}",), name=f"job-worker-{i}", daemon=True)
+            for i in range(self.threads)
+        ]
+        for t in pool:
+            t.start()
+
+        next_report = time.monotonic() + self.report_every
+        try:
+            while any(t.is_alive() for t in pool):
+                if self.stop.wait(self.poll):
+                    break
+                if not self.burst:
+                    with use_primary():
+                        queue.tick_schedules()
+                    close_old_connections()
+                if time.monotonic() >= next_report:
+                    self.log(self.stats.line())
+                    next_report += self.report_every
+        except KeyboardInterrupt:
+            self.log("stopping: waiting for running jobs to finish")
+        self.stop.set()
+        for t in pool:
+            t.join()
+        connections.close_all()
+        return self.stats
+
+    def _loop(self, name: str) -> None:
+        # Claims read the primary: a lagging replica would offer jobs already taken
+        with use_primary():
+            try:
+                while not self.stop.is_set():
+                    close_old_connections()
+                    job = queue.claim(name, self.tasks)
+                    if job is None:
+                        if self.burst:
+                            return
+                        self.stop.wait(self.poll)
+                        continue
+                    latency = (job.started_at - job.run_at).total_seconds()
+                    started = time.perf_counter()
+                    outcome = queue.run(job)
+                    self.stats.record(outcome, max(latency, 0.0), time.perf_counter() - started)
+                    if outcome != Job.Status.SUCCEEDED:
+                        self.log(f"{job.task} #{job.id} attempt {job.attempts}/{job.max_attempts}: {outcome}")
+            finally:
+                connections.close_all()
@@ -0,0 +1,201 @@
+# league/adp.py
+
+from __future__ import annotations
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+from .models import Draft, DraftPick, PlayerDraftStat
+from . import sharding
+
+
+# ----------------------------
+# Incremental updates (call inside the pick's transaction)
+# ----------------------------
+
+def record_pick(player_id: int, pick_number: int, round: int) -> None:
+    PlayerDraftStat.objects.get_or_create(player_id=player_id)
+    PlayerDraftStat.objects.filter(player_id=player_id).update(
+        times_drafted=F("times_drafted") + 1,
+        pick_sum=F("pick_sum") + pick_number,
+        round_sum=F("round_sum") + round,
+        # Right-hand sides see the old row, so this is the new average
+        adp=Cast(F("pick_sum") + pick_number, FloatField()) / (F("times_drafted") + 1),
+        updated_at=timezone.now(),
+    )
+
+
+def remove_pick(player_id: int, pick_number: int, round: int) -> None:
+    PlayerDraftStat.objects.filter(player_id=player_id, times_drafted__gt=0).update(
+        times_drafted=F("times_drafted") - 1,
+        pick_sum=F("pick_sum") - pick_number,
+        round_sum=F("round_sum") - round,
+        adp=Case(
+            When(times_drafted__lte=1, then=Value(0.0)),
+            default=Cast(F("pick_sum") - pick_number, FloatField()) / (F("times_drafted") - 1),
+            output_field=FloatField(),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+# ----------------------------
+# Bulk rebuild
+# ----------------------------
+
+def rebuild(player_ids: list[int] | None = None) -> int:
+    """
+    Recompute the active shard's rows from its DraftPicks with one grouped query
+    and replace them. With player_ids, only those players are recomputed (used
+    after ResetLeague).
+    """
+    picks = DraftPick.objects.all()
+    stale = PlayerDraftStat.objects.all()
+    if player_ids is not None:
+        picks = picks.filter(player_id__in=player_ids)
+        stale = stale.filter(player_id__in=player_ids)
+
+    now = timezone.now()
+    rows = [
+        PlayerDraftStat(
+            player_id=r["player_id"],
+            times_drafted=r["n"],
+            pick_sum=r["pick_sum"],
+            round_sum=r["round_sum"],
+            adp=r["pick_sum"] / r["n"],
+            updated_at=now,
+        )
+        for r in picks.values("player_id").annotate(n=Count("id"), pick_sum=Sum("pick_number"), round_sum=Sum("round"))
+    ]
+
+    with sharding.atomic():
+        stale.delete()
+        PlayerDraftStat.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+# ----------------------------
+# Reads
+# ----------------------------
+
+SORTS = {
+    "adp": ("adp", "player_id"),
+    "-adp": ("-adp", "player_id"),
+    "ownership": ("-times_drafted", "adp", "player_id"),
+    "-ownership": ("times_drafted", "adp", "player_id"),
+}
+
+
+# Python equivalents of SORTS, for stats merged across shards
+_SORT_KEYS = {
+    "adp": lambda s: (s.adp, s.player_id),
+    "-adp": lambda s: (-s.adp, s.player_id),
+    "ownership": lambda s: (-s.times_drafted, s.adp, s.player_id),
+    "-ownership": lambda s: (s.times_drafted, s.adp, s.player_id),
+}
+
+# Lowest first sort-key component a player not read yet could still reach, given the
+# last row read from each unfinished shard. A summed ADP is a weighted mean of the
+# per-shard ADPs, so it never beats the best of them; a summed count is at most the
+# sum of the counts.
+_UNSEEN_BOUNDS = {
+    "adp": lambda last: min(s.adp for s in last),
+    "-adp": lambda last: min(-s.adp for s in last),
+    "ownership": lambda last: -sum(s.times_drafted for s in last),
+    "-ownership": lambda last: min(s.times_drafted for s in last),
+}
+
+_CHUNK = 500
+
+
+def ranked(sort: str, player_ids: list[int] | None = None, exclude: list[int] | None = None,
+           offset: int = 0, limit: int | None = None) -> list[PlayerDraftStat]:
+    """
+    Drafted players in `sort` order. Each shard keeps stats for its own
+    leagues; when sharded they are summed per player and sorted here.
+    """
+    def drafted(alias: str | None = None):
+        stats = PlayerDraftStat.objects.filter(times_drafted__gt=0)
+        if alias is not None:
+            stats = stats.using(alias)
+        if player_ids is not None:
+            stats = stats.filter(player_id__in=player_ids)
+        if exclude:
+            stats = stats.exclude(player_id__in=exclude)
+        return stats
+
+    if not sharding.is_sharded():
+        return list(drafted().order_by(*SORTS[sort])[offset:None if limit is None else offset + limit])
+
+    if limit is None or player_ids is not None:
+        merged: dict[int, PlayerDraftStat] = {}
+        for alias in sharding.shard_aliases():
+            _merge_rows(merged, drafted(alias))
+        return _sorted(merged, sort)[offset:None if limit is None else offset + limit]
+    return _top_across_shards(sort, drafted, offset + limit)[offset:]
+
+
+def _top_across_shards(sort: str, drafted, k: int) -> list[PlayerDraftStat]:
+    """
+    The first k players across shards without reading whole shards: each shard is
+    read in its own sort order, in growing batches, and every newly seen player's
+    rows are summed from all shards. Stops once the k-th summed player sorts
+    strictly ahead of anything an unread row could add up to.
+    """
+    aliases = sharding.shard_aliases()
+    merged: dict[int, PlayerDraftStat] = {}
+    read = dict.fromkeys(aliases, 0)
+    last: dict[str, PlayerDraftStat] = {}
+    live = list(aliases)
+    batch = max(k, 50)
+
+    while True:
+        seen: set[int] = set()
+        for alias in live:
+            rows = list(drafted(alias).order_by(*SORTS[sort])[read[alias]:read[alias] + batch])
+            read[alias] += len(rows)
+            if rows:
+                last[alias] = rows[-1]
+            if len(rows) < batch:
+                last.pop(alias, None)
+            seen.update(r.player_id for r in rows if r.player_id not in merged)
+
+        seen_ids = sorted(seen)
+        for i in range(0, len(seen_ids), _CHUNK):
+            chunk = seen_ids[i:i + _CHUNK]
+            for alias in aliases:
+                _merge_rows(merged, drafted(alias).filter(player_id__in=chunk))
+
+        stats = _sorted(merged, sort)
+        live = list(last)
+        if not live:
+            return stats[:k]
+        if len(stats) >= k and _SORT_KEYS[sort](stats[k - 1])[0] < _UNSEEN_BOUNDS[sort](last.values()):
+            return stats[:k]
+        batch *= 2
+
+
+def _merge_rows(merged: dict[int, PlayerDraftStat], rows) -> None:
+    for player_id, n, pick_sum, round_sum in rows.values_list("player_id", "times_drafted", "pick_sum", "round_sum"):
+        s = merged.setdefault(player_id, PlayerDraftStat(player_id=player_id, times_drafted=0, pick_sum=0, round_sum=0))
+        s.times_drafted += n
+        s.pick_sum += pick_sum
+        s.round_sum += round_sum
+        s.adp = s.pick_sum / s.times_drafted
+
+
+def _sorted(merged: dict[int, PlayerDraftStat], sort: str) -> list[PlayerDraftStat]:
+    return sorted(merged.values(), key=_SORT_KEYS[sort])
+
+
+def total_drafts() -> int:
+    return sum(Draft.objects.using(alias).count() for alias in sharding.shard_aliases())
+
+
+def serialize_stat(s: PlayerDraftStat, total_drafts: int) -> dict:
+    return {
+        "player_id": s.player_id,
+        "adp": round(s.adp, 2),
+        "avg_round": round(s.round_sum / s.times_drafted, 2) if s.times_drafted else None,
+        "times_drafted": s.times_drafted,
+        "ownership": round(s.times_drafted / total_drafts, 4) if total_drafts else 0.0,
+    }
@@ -0,0 +1,64 @@
+# league/cache.py
+
+from __future__ import annotations
+from typing import Any, Callable, Iterable
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.db.models import F
+from .models import League
+
+# Keeps each IN (...) list well under SQLite's bound-variable limit
+_CHUNK = 500
+
+
+# ----------------------------
+# Versioned league cache
+#
+# Payloads are stored under league:<id>:<db>:v<version>, where the version is
+# League.cache_version and <db> the alias the read was routed to. A write bumps it in its own transaction, so the bump
+# commits (or rolls back) with the data and two concurrent writes always
+# count as two: a cache-side counter (incr on the file cache) can lose one
+# and leave a payload without the second write cached under the final
+# version. Old payloads become unreachable at once in every worker process
+# and just expire.
+#
+# The alias keeps a payload built from a lagging replica away from readers
+# pinned to the primary: a replica that has the new version but not yet every
+# row the payload reads must not fill the primary's entry, and vice versa.
+# ----------------------------
+
+def _payload_key(league_id: int, db: str, version: int, variant: str) -> str:
+    return f"league:{league_id}:{db}:v{version}:{variant}"
+
+
+def league_version(league_id: int, db: str | None = None) -> int | None:
+    """The league's cache version (active shard), or None if the league doesn't exist."""
+    leagues = League.objects.using(db) if db else League.objects
+    return leagues.filter(pk=league_id).values_list("cache_version", flat=True).first()
+
+
+def invalidate_league(league_id: int) -> None:
+    """Call inside the write's transaction, on the league's shard."""
+    League.objects.filter(pk=league_id).update(cache_version=F("cache_version") + 1)
+
+
+def invalidate_leagues(league_ids: Iterable[int]) -> None:
+    league_ids = sorted(set(league_ids))
+    for i in range(0, len(league_ids), _CHUNK):
+        League.objects.filter(pk__in=league_ids[i:i + _CHUNK]).update(cache_version=F("cache_version") + 1)
+
+
+def get_or_build(league_id: int, variant: str, build: Callable[[], Any]) -> Any:
+    """build()'s payload for the league, cached per read alias and cache version."""
+    db = router.db_for_read(League)
+    version = league_version(league_id, db)
+    if version is None:
+        # Not cached, so the view's own 404 handling applies
+        return build()
+    key = _payload_key(league_id, db, version, variant)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, timeout=getattr(settings, "LEAGUE_CACHE_TIMEOUT", 300))
+    return payload
@@ -0,0 +1,144 @@
+# league/draft_log.py
+
+from __future__ import annotations
+from dataclasses import dataclass, field, asdict
+from typing import Any
+from django.conf import settings
+from django.db.models import Max
+from .models import League, Draft, DraftEvent, DraftSnapshot
+from .turns import advance_turn
+
+
+# ----------------------------
+# Replay state
+# ----------------------------
+
+def _snapshot_interval() -> int:
+    return max(1, int(getattr(settings, "DRAFT_SNAPSHOT_INTERVAL", 20)))
+
+
+@dataclass
+class DraftState:
+    """
+    In-memory draft state rebuilt from the event log.
+    picks rows are [pick_number, round, slot, member_id, player_id].
+    """
+    seq: int = 0
+    status: str = Draft.Status.NOT_STARTED
+    current_slot: int = 1
+    round: int = 1
+    pick_number: int = 1
+    member_count: int = 0
+    picks: list[list[Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> DraftState:
+        return cls(**data)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def apply(self, event: DraftEvent) -> None:
+        kind = event.kind
+
+        if kind == DraftEvent.Kind.START:
+            self.status = Draft.Status.IN_PROGRESS
+            self.current_slot = 1
+            self.round = 1
+            self.pick_number = 1
+            self.member_count = event.member_count or 0
+
+        elif kind == DraftEvent.Kind.PICK:
+            self.picks.append([event.pick_number, event.round, event.slot, event.member_id, event.player_id])
+            advance_turn(self, self.member_count)
+
+        elif kind == DraftEvent.Kind.UNDO:
+            if self.picks:
+                pick_number, rnd, slot = self.picks.pop()[:3]
+                self.pick_number, self.round, self.current_slot = pick_number, rnd, slot
+                self.status = Draft.Status.IN_PROGRESS
+
+        elif kind == DraftEvent.Kind.RESET:
+            self.status = Draft.Status.NOT_STARTED
+            self.current_slot = 1
+            self.round = 1
+            self.pick_number = 1
+            self.member_count = 0
+            self.picks = []
+
+        self.seq = event.seq
+
+
+# ----------------------------
+# Log writes (call inside the caller's transaction)
+# ----------------------------
+
+def record_event(league: League, kind: str, **fields: Any) -> DraftEvent:
+    """
+    Append one event for the league and, every DRAFT_SNAPSHOT_INTERVAL events,
+    store a snapshot so replay never walks more than one interval.
+    Callers hold the Draft row lock (or are creating it), which serializes seq allocation.
+    """
+    last_seq = DraftEvent.objects.filter(league=league).aggregate(m=Max("seq"))["m"] or 0
+    event = DraftEvent.objects.create(league=league, seq=last_seq + 1, kind=kind, **fields)
+
+    if event.seq % _snapshot_interval() == 0:
+        state = reconstruct(league, seq=event.seq)
+        DraftSnapshot.objects.create(league=league, seq=event.seq, state=state.to_dict())
+
+    return event
+
+
+# ----------------------------
+# Reads
+# ----------------------------
+
+def reconstruct(league: League, seq: int | None = None) -> DraftState:
+    """
+    Draft state after event `seq` (latest if None).
+    Starts from the nearest snapshot at or before `seq`, so the cost is
+    O(events since snapshot) rather than O(whole history).
+    """
+    snapshots = DraftSnapshot.objects.filter(league=league)
+    events = DraftEvent.objects.filter(league=league)
+    if seq is not None:
+        snapshots = snapshots.filter(seq__lte=seq)
+        events = events.filter(seq__lte=seq)
+
+    snapshot = snapshots.order_by("-seq").first()
+    state = DraftState.from_dict(snapshot.state) if snapshot else DraftState()
+
+    for event in events.filter(seq__gt=state.seq).order_by("seq"):
+        state.apply(event)
+    return state
+
+
+def reconstruct_at_pick(league: League, pick_number: int) -> DraftState | None:
+    """
+    Draft state right after pick `pick_number` was made.
+    If that pick was undone and re-made, the surviving (latest) one is used.
+    """
+    event = (
+        DraftEvent.objects
+        .filter(league=league, kind=DraftEvent.Kind.PICK, pick_number=pick_number)
+        .order_by("-seq")
+        .only("seq")
+        .first()
+    )
+    if not event:
+        return None
+    return reconstruct(league, seq=event.seq)
+
+
+def serialize_event(e: DraftEvent) -> dict[str, Any]:
+    return {
+        "seq": e.seq,
+        "kind": e.kind,
+        "pick_number": e.pick_number,
+        "round": e.round,
+        "slot": e.slot,
+        "member_id": e.member_id,
+        "player_id": e.player_id,
+        "actor_email": e.actor_email,
+        "created_at": e.created_at,
+    }
@@ -0,0 +1,102 @@
+# league/joins.py
+#
+# Self-service joining with short join codes. A code maps to a league id in
+# the global JoinCode table (unique index on code), so it also finds the
+# league's shard.
+#
+# Joining takes the lowest free slot with one INSERT ... SELECT that also
+# checks the league is still in SETUP and not full, instead of counting
+# members and then inserting. The unique (league, slot) index turns a lost
+# race into an IntegrityError, and the join is retried with the next slot.
+
+from __future__ import annotations
+import secrets
+from django.db import IntegrityError, connections
+from .models import FantasyTeam, JoinCode, League, LeagueMember
+from . import cache as league_cache
+from . import sharding
+
+# No 0/O or 1/I, so codes survive being read aloud
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+CODE_LENGTH = 8
+
+# Each retry means another joiner took the slot first; a league has at most max_players slots
+_JOIN_ATTEMPTS = 8
+
+
+def normalize_code(code: str) -> str:
+    return (code or "").strip().upper()
+
+
+def _new_code() -> str:
+    return "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+
+
+def code_for(league_id: int) -> str:
+    """The league's join code, created on first use."""
+    while True:
+        existing = JoinCode.objects.filter(league_id=league_id).values_list("code", flat=True).first()
+        if existing:
+            return existing
+        try:
+            return JoinCode.objects.create(code=_new_code(), league_id=league_id).code
+        except IntegrityError:
+            # Code collision, or a concurrent request created this league's code: look again
+            continue
+
+
+def league_for_code(code: str) -> int | None:
+    return JoinCode.objects.filter(code=normalize_code(code)).values_list("league_id", flat=True).first()
+
+
+# ----------------------------
+# Joining
+# ----------------------------
+
+def _insert_next_slot(league_id: int, email: str, display_name: str) -> bool:
+    """
+    Insert the member into the lowest free slot in one statement. Inserts
+    nothing (returns False) if the league is full or no longer in SETUP.
+    """
+    member, league = LeagueMember._meta.db_table, League._meta.db_table
+    sql = f"""
+        INSERT INTO {member} (league_id, email, display_name, slot, is_commissioner, waiver_priority)
+        SELECT l.id, %s, %s, COALESCE((
+                   SELECT MIN(m.slot) + 1 FROM {member} m
+                   WHERE m.league_id = l.id AND NOT EXISTS (
+                       SELECT 1 FROM {member} n WHERE n.league_id = l.id AND n.slot = m.slot + 1
+                   )
+               ), 1), %s, 0
+        FROM {league} l
+        WHERE l.id = %s AND l.status = %s
+          AND (SELECT COUNT(*) FROM {member} c WHERE c.league_id = l.id) < l.max_players
+    """
+    with connections[sharding.current()].cursor() as cursor:
+        cursor.execute(sql, [email, display_name, False, league_id, League.Status.SETUP])
+        return cursor.rowcount == 1
+
+
+def join_league(league: League, email: str, display_name: str = "") -> tuple[LeagueMember | None, bool]:
+    """
+    Add `email` to the league (on the active shard) with its own team.
+
+    Returns (member, True) when it joined, (member, False) when it was
+    already a member and (None, False) when the league is full or drafting.
+    """
+    display_name = (display_name or email.split("@")[0])[:30]
+    for _ in range(_JOIN_ATTEMPTS):
+        existing = league.members.filter(email=email).first()
+        if existing:
+            return existing, False
+        try:
+            with sharding.atomic():
+                if not _insert_next_slot(league.id, email, display_name):
+                    return None, False
+                member = league.members.get(email=email)
+                FantasyTeam.objects.create(league=league, member=member, name=f"{display_name}'s Team")
+                league_cache.invalidate_league(league.id)
+            return member, True
+        except IntegrityError:
+            # Someone else took that slot (or joined with this email) first
+            continue
+    raise IntegrityError(f"Could not find a free slot in league {league.id} after {_JOIN_ATTEMPTS} attempts")
@@ -0,0 +1,196 @@
+# league/lineups.py
+#
+# Daily lineups. Each member's rostered players are assigned to the slots in
+# settings.LINEUP_SLOTS to maximize projected fantasy points, where a player
+# may fill a G/F/C slot only if their listed position includes it.
+
+from __future__ import annotations
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable
+from django.conf import settings
+from django.utils import timezone
+from .models import Lineup, LineupEntry, RosterPlayer
+from . import sharding
+from players import warehouse
+from players.models import PlayerProfile, PlayerSeasonAggregate
+
+
+UTIL = "UTIL"
+
+# Keeps each IN (...) list well under SQLite's bound-variable limit
+_CHUNK = 500
+
+
+def lineup_slots() -> list[str]:
+    return list(getattr(settings, "LINEUP_SLOTS", ["G", "G", "F", "F", "C", UTIL, UTIL, UTIL]))
+
+
+def _chunks(items: list[int], size: int = _CHUNK) -> Iterable[list[int]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# ----------------------------
+# Optimizer
+# ----------------------------
+
+def optimize(players: list[tuple[int, frozenset[str], float]], slots: list[str]) -> tuple[float, dict[int, str]]:
+    """
+    players: (player_id, position codes, projected points).
+    Returns (best total, player_id -> slot type) for the starters; everyone
+    else is benched.
+
+    Exact DP over players, where the state is how many slots of each type are
+    still open. With a handful of slot types that is at most a few hundred
+    states, so a 13-man roster costs a few thousand steps instead of the
+    13!/5! orderings a brute force would try.
+    """
+    types = sorted(set(slots))
+    start = tuple(slots.count(t) for t in types)
+
+    # eligible[p] = indexes into `types` player p may fill
+    eligible = [
+        [k for k, t in enumerate(types) if t == UTIL or t in codes]
+        for _, codes, _ in players
+    ]
+
+    best: dict[tuple[int, ...], float] = {start: 0.0}
+    steps: list[dict[tuple[int, ...], tuple[tuple[int, ...], int | None]]] = []
+
+    for p, (_, _, points) in enumerate(players):
+        nxt: dict[tuple[int, ...], float] = {}
+        back: dict[tuple[int, ...], tuple[tuple[int, ...], int | None]] = {}
+        for state, total in best.items():
+            # Bench, then each open eligible slot type
+            options = [(state, None, total)]
+            for k in eligible[p]:
+                if state[k]:
+                    after = state[:k] + (state[k] - 1,) + state[k + 1:]
+                    options.append((after, k, total + points))
+            for after, k, value in options:
+                if after not in nxt or value > nxt[after]:
+                    nxt[after] = value
+                    back[after] = (state, k)
+        best = nxt
+        steps.append(back)
+
+    state = max(best, key=best.get)
+    total = best[state]
+    assignment: dict[int, str] = {}
+    for p in range(len(players) - 1, -1, -1):
+        state, k = steps[p][state]
+        if k is not None:
+            assignment[players[p][0]] = types[k]
+    return total, assignment
+
+
+# ----------------------------
+# Nightly batch
+# ----------------------------
+
+@dataclass
+class LineupRunResult:
+    leagues: int = 0
+    teams: int = 0
+    players: int = 0
+    load_seconds: float = 0.0
+    optimize_seconds: float = 0.0
+    write_seconds: float = 0.0
+
+
+def optimize_lineups(day: date, season: str | None = None, league_ids: list[int] | None = None) -> LineupRunResult:
+    """
+    Rebuild every member's lineup for `day` (or only those in `league_ids`).
+    Projections are season fantasy-point averages, or 0 for a player whose team
+    has no game that day; positions and teams come from PlayerProfile, and
+    players without a profile can only start at UTIL (and are assumed to play).
+
+    Reads are a fixed handful of queries per chunk of leagues and players, and
+    the write is one DELETE plus two bulk INSERTs per chunk, so the run scales
+    with the number of rostered players rather than the number of leagues.
+    """
+    result = LineupRunResult()
+    season = season or warehouse.default_season()
+    started = time.perf_counter()
+    playing = warehouse.teams_playing(day)
+    result.load_seconds += time.perf_counter() - started
+    for _ in sharding.each_shard():
+        _optimize_shard(day, season, playing, league_ids, result)
+    return result
+
+
+def _optimize_shard(day: date, season: str, playing: frozenset[str] | None, league_ids: list[int] | None,
+                    result: LineupRunResult) -> None:
+    """optimize_lineups() for the active shard, adding to `result`. `playing` None means every team plays."""
+    started = time.perf_counter()
+    roster_qs = RosterPlayer.objects.order_by("league_id", "member_id", "id")
+    league_chunks = [None] if league_ids is None else list(_chunks(sorted(set(league_ids))))
+    rosters: dict[tuple[int, int], list[int]] = {}
+    for chunk in league_chunks:
+        qs = roster_qs if chunk is None else roster_qs.filter(league_id__in=chunk)
+        for league_id, member_id, player_id in qs.values_list("league_id", "member_id", "player_id"):
+            rosters.setdefault((league_id, member_id), []).append(player_id)
+
+    player_ids = sorted({pid for ids in rosters.values() for pid in ids})
+    positions: dict[int, frozenset[str]] = {}
+    off_day: set[int] = set()
+    projected: dict[int, float] = {}
+    for chunk in _chunks(player_ids):
+        for pid, position, team in (
+            PlayerProfile.objects.filter(player_id__in=chunk)
+            .values_list("player_id", "position", "team_abbreviation")
+        ):
+            positions[pid] = warehouse.position_codes(position)
+            if playing is not None and team and team not in playing:
+                off_day.add(pid)
+        projected.update(
+            PlayerSeasonAggregate.objects
+            .filter(season=season, season_type=warehouse.REGULAR_SEASON, player_id__in=chunk)
+            .values_list("player_id", "fantasy_points_avg")
+        )
+    for pid in off_day:
+        projected[pid] = 0.0
+    result.load_seconds += time.perf_counter() - started
+
+    started = time.perf_counter()
+    slots = lineup_slots()
+    now = timezone.now()
+    lineups: list[Lineup] = []
+    entries: list[list[LineupEntry]] = []
+    for (league_id, member_id), ids in rosters.items():
+        players = [(pid, positions.get(pid, frozenset()), projected.get(pid, 0.0)) for pid in ids]
+        total, assignment = optimize(players, slots)
+        lineups.append(Lineup(
+            league_id=league_id, member_id=member_id, date=day,
+            projected_points=round(total, 2), optimized_at=now,
+        ))
+        entries.append([
+            LineupEntry(
+                slot=assignment.get(pid, LineupEntry.BENCH),
+                player_id=pid,
+                projected_points=round(points, 2),
+            )
+            for pid, _, points in players
+        ])
+    result.optimize_seconds += time.perf_counter() - started
+
+    started = time.perf_counter()
+    with sharding.atomic():
+        for chunk in league_chunks:
+            stale = Lineup.objects.filter(date=day)
+            if chunk is not None:
+                stale = stale.filter(league_id__in=chunk)
+            stale.delete()
+        # SQLite 3.35+ and Postgres return primary keys from bulk_create
+        Lineup.objects.bulk_create(lineups, batch_size=_CHUNK)
+        for lineup, rows in zip(lineups, entries):
+            for e in rows:
+                e.lineup = lineup
+        LineupEntry.objects.bulk_create([e for rows in entries for e in rows], batch_size=_CHUNK)
+    result.write_seconds += time.perf_counter() - started
+
+    result.leagues += len({league_id for league_id, _ in rosters})
+    result.teams += len(rosters)
+    result.players += len(player_ids)
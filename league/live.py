@@ -0,0 +1,310 @@
+# league/live.py
+#
+# Live scoring. A feed yields batches of box-score lines (cumulative stats for
+# one player in one game); apply_lines() diffs them against the stored
+# PlayerGameLog rows, writes only the lines that changed, and adds each
+# player's fantasy-point delta to the FantasyTeam that currently rosters them
+# (only if the player starts in that team's Lineup for the game's day, when set).
+#
+# RosterPlayer.player_id is indexed, so "which teams own this player" is an
+# index lookup per changed player: a batch costs O(changed players + their
+# owners), independent of how many leagues exist.
+
+from __future__ import annotations
+import json
+import re
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+from zoneinfo import ZoneInfo
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils import timezone
+from .models import FantasyTeam, Lineup, LineupEntry, RosterPlayer
+from . import cache as league_cache
+from . import sharding
+from players import upstream, warehouse
+from players.models import PlayerGameLog
+from players.scoring import fantasy_points
+
+# Keeps each IN (...) list well under SQLite's bound-variable limit
+_CHUNK = 500
+
+
+def _chunks(items: list, size: int = _CHUNK) -> Iterable[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+@dataclass
+class BoxScoreLine:
+    game_id: str
+    game_date: date
+    player_id: int
+    matchup: str
+    stats: dict[str, float]  # PlayerGameLog stat fields, cumulative for the game
+
+
+# ----------------------------
+# Feeds
+# ----------------------------
+
+class FileFeed:
+    """
+    JSON lines stand-in for the live feed, one box-score line per row:
+    {"game_id": "0022400001", "game_date": "2025-01-15", "player_id": 2544,
+     "matchup": "LAL vs. BOS", "pts": 12, "reb": 4, "ast": 3, "minutes": 18.5}
+    Rows are read in batches of `batch_size`. With follow=True the file is
+    tailed like `tail -f` until interrupted.
+    """
+
+    def __init__(self, path: str | Path, batch_size: int = 500, follow: bool = False, interval: float = 1.0):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.follow = follow
+        self.interval = interval
+
+    def batches(self) -> Iterator[list[BoxScoreLine]]:
+        with self.path.open() as f:
+            batch: list[BoxScoreLine] = []
+            while True:
+                line = f.readline()
+                if line.strip():
+                    batch.append(self._parse(json.loads(line)))
+                    if len(batch) >= self.batch_size:
+                        yield batch
+                        batch = []
+                    continue
+                if batch:
+                    yield batch
+                    batch = []
+                if not self.follow:
+                    return
+                time.sleep(self.interval)
+
+    @staticmethod
+    def _parse(row: dict) -> BoxScoreLine:
+        return BoxScoreLine(
+            game_id=str(row["game_id"]),
+            game_date=date.fromisoformat(row["game_date"]),
+            player_id=int(row["player_id"]),
+            matchup=row.get("matchup") or "",
+            stats={field: float(row.get(field) or 0) for field in warehouse.STAT_COLUMNS},
+        )
+
+
+# NBA game dates (and PlayerGameLog.game_date from the stats API) are US Eastern
+GAME_DAY_TZ = ZoneInfo("America/New_York")
+
+_ISO_MINUTES = re.compile(r"PT(?:(\d+)M)?(?:([\d.]+)S)?")
+
+# PlayerGameLog field -> nba_api live boxscore statistic
+LIVE_STATS = {
+    "pts": "points",
+    "reb": "reboundsTotal",
+    "ast": "assists",
+    "stl": "steals",
+    "blk": "blocks",
+    "tov": "turnovers",
+    "fg3m": "threePointersMade",
+    "fgm": "fieldGoalsMade",
+    "fga": "fieldGoalsAttempted",
+    "ftm": "freeThrowsMade",
+    "fta": "freeThrowsAttempted",
+}
+
+
+class NbaLiveFeed:
+    """
+    Polls today's scoreboard and the box score of every game in progress
+    (or final) through nba_api's live endpoints, every `interval` seconds.
+    Each poll yields every player line; apply_lines() drops the unchanged ones.
+    """
+
+    def __init__(self, interval: float = 30.0, once: bool = False):
+        self.interval = interval
+        self.once = once
+
+    def batches(self) -> Iterator[list[BoxScoreLine]]:
+        while True:
+            yield self.poll()
+            if self.once:
+                return
+            time.sleep(self.interval)
+
+    def poll(self) -> list[BoxScoreLine]:
+        live = upstream.live_endpoints()
+        games = live.ScoreBoard().get_dict()["scoreboard"]["games"]
+        lines = []
+        for game in games:
+            if game.get("gameStatus") not in (2, 3):  # 1 = scheduled
+                continue
+            box = live.BoxScore(game_id=game["gameId"]).get_dict()["game"]
+            game_date = self._game_day(box["gameTimeUTC"])
+            home, away = box["homeTeam"]["teamTricode"], box["awayTeam"]["teamTricode"]
+            for side, matchup in (("homeTeam", f"{home} vs. {away}"), ("awayTeam", f"{away} @ {home}")):
+                for player in box[side].get("players", []):
+                    s = player.get("statistics") or {}
+                    stats = {field: float(s.get(key) or 0) for field, key in LIVE_STATS.items()}
+                    stats["minutes"] = self._minutes(s.get("minutesCalculated") or s.get("minutes"))
+                    lines.append(BoxScoreLine(box["gameId"], game_date, int(player["personId"]), matchup, stats))
+        return lines
+
+    @staticmethod
+    def _game_day(utc: str) -> date:
+        # A 7:30pm ET tip-off is already the next day in UTC
+        return datetime.fromisoformat(utc.replace("Z", "+00:00")).astimezone(GAME_DAY_TZ).date()
+
+    @staticmethod
+    def _minutes(raw: str | None) -> float:
+        m = _ISO_MINUTES.match(raw or "")
+        if not m:
+            return 0.0
+        return int(m.group(1) or 0) + float(m.group(2) or 0) / 60
+
+
+# ----------------------------
+# Ingestion
+# ----------------------------
+
+@dataclass
+class LiveBatchResult:
+    lines: int = 0
+    changed: int = 0
+    players: int = 0
+    teams: int = 0
+    seconds: float = 0.0
+
+
+def apply_lines(lines: list[BoxScoreLine], season: str | None = None) -> LiveBatchResult:
+    """
+    Apply one batch of cumulative box-score lines. Unchanged lines are dropped
+    after one lookup of the stored rows; changed ones are upserted, their
+    fantasy-point deltas are summed per owning team, and the owning teams are
+    updated with one CASE UPDATE per chunk.
+    """
+    started = time.perf_counter()
+    result = LiveBatchResult(lines=len(lines))
+    season = season or warehouse.current_season()
+    season_type = warehouse.REGULAR_SEASON
+
+    # Last line wins when a batch carries several updates for the same player/game
+    latest = {(l.player_id, l.game_id): l for l in lines}
+
+    stored: dict[tuple[int, str], tuple] = {}
+    stat_fields = list(warehouse.STAT_COLUMNS)
+    player_ids = sorted({pid for pid, _ in latest})
+    game_ids = sorted({gid for _, gid in latest})
+    for chunk in _chunks(player_ids):
+        for row in (
+            PlayerGameLog.objects
+            .filter(season=season, season_type=season_type, player_id__in=chunk, game_id__in=game_ids)
+            .values_list("player_id", "game_id", "fantasy_points", *stat_fields)
+        ):
+            stored[(row[0], row[1])] = row[2:]
+
+    changed: list[PlayerGameLog] = []
+    delta_by_player: dict[tuple[int, date], float] = {}
+    for key, line in latest.items():
+        new_fp = fantasy_points(line.stats)
+        old = stored.get(key)
+        if old is not None and list(old[1:]) == [line.stats[f] for f in stat_fields]:
+            continue
+        changed.append(PlayerGameLog(
+            season=season,
+            season_type=season_type,
+            player_id=line.player_id,
+            game_id=line.game_id,
+            game_date=line.game_date,
+            matchup=line.matchup,
+            fantasy_points=new_fp,
+            **line.stats,
+        ))
+        delta = new_fp - (old[0] if old is not None else 0.0)
+        if delta:
+            key = (line.player_id, line.game_date)
+            delta_by_player[key] = delta_by_player.get(key, 0.0) + delta
+
+    result.changed = len(changed)
+    if not changed:
+        result.seconds = time.perf_counter() - started
+        return result
+
+    with transaction.atomic():
+        warehouse.store_logs(changed)
+        warehouse.refresh_aggregates(season, season_type, player_ids={l.player_id for l in changed})
+
+        # Each shard commits on its own; the default shard's work joins the outer transaction
+        for _ in sharding.each_shard():
+            with sharding.atomic():
+                result.teams += _apply_deltas(delta_by_player)
+
+    result.players = len({l.player_id for l in changed})
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _apply_deltas(delta_by_player: dict[tuple[int, date], float]) -> int:
+    """
+    Add (player, game day) fantasy-point deltas to the active shard's owning teams.
+    A team with a Lineup for the day is credited for its starters only; without
+    one, every rostered player counts. Returns the number of teams updated.
+    """
+    days_by_player: dict[int, list[date]] = {}
+    for player_id, day in delta_by_player:
+        days_by_player.setdefault(player_id, []).append(day)
+    days = sorted({day for _, day in delta_by_player})
+
+    # Reverse index: changed player -> members rostering them, in any league
+    owners: list[tuple[int, int, int]] = []
+    for chunk in _chunks(sorted(days_by_player)):
+        owners.extend(
+            RosterPlayer.objects
+            .filter(player_id__in=chunk)
+            .values_list("player_id", "member_id", "league_id")
+        )
+
+    # (member, day) -> starters, for owners with a lineup on one of the game days
+    starters: dict[tuple[int, date], set[int]] = {}
+    for chunk in _chunks(sorted({member_id for _, member_id, _ in owners})):
+        lineup_keys = {
+            lineup_id: (member_id, day)
+            for lineup_id, member_id, day in (
+                Lineup.objects.filter(member_id__in=chunk, date__in=days).values_list("id", "member_id", "date")
+            )
+        }
+        for key in lineup_keys.values():
+            starters[key] = set()
+        for lineup_chunk in _chunks(sorted(lineup_keys)):
+            for lineup_id, player_id in (
+                LineupEntry.objects
+                .filter(lineup_id__in=lineup_chunk)
+                .exclude(slot=LineupEntry.BENCH)
+                .values_list("lineup_id", "player_id")
+            ):
+                starters[lineup_keys[lineup_id]].add(player_id)
+
+    delta_by_member: dict[int, float] = {}
+    leagues: set[int] = set()
+    for player_id, member_id, league_id in owners:
+        for day in days_by_player[player_id]:
+            lineup = starters.get((member_id, day))
+            if lineup is not None and player_id not in lineup:
+                continue
+            delta_by_member[member_id] = delta_by_member.get(member_id, 0.0) + delta_by_player[(player_id, day)]
+            leagues.add(league_id)
+
+    now = timezone.now()
+    for chunk in _chunks(sorted(delta_by_member)):
+        FantasyTeam.objects.filter(member_id__in=chunk).update(
+            points=F("points") + Case(
+                *(When(member_id=m, then=Value(delta_by_member[m])) for m in chunk),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+            points_updated_at=now,
+        )
+    league_cache.invalidate_leagues(leagues)
+    return len(delta_by_member)
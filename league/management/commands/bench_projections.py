@@ -0,0 +1,39 @@
+# league/management/commands/bench_projections.py
+
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from league import projections
+
+
+class Command(BaseCommand):
+    help = "Time the Monte Carlo season projection on a synthetic league."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--teams", type=int, default=20)
+        parser.add_argument("--roster", type=int, default=13)
+        parser.add_argument("--simulations", type=int, default=10_000)
+        parser.add_argument("--weeks", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        n_players = options["teams"] * options["roster"]
+        logs = [rng.gamma(4.0, 8.0, size=int(rng.integers(20, 82))).tolist() for _ in range(n_players)]
+        team_index = [p // options["roster"] for p in range(n_players)]
+
+        started = time.perf_counter()
+        result = projections.project_season(
+            logs, team_index, options["teams"],
+            simulations=options["simulations"], weeks=options["weeks"], seed=options["seed"],
+        )
+        elapsed = time.perf_counter() - started
+
+        best = max(range(options["teams"]), key=lambda t: result["titles"][t])
+        self.stdout.write(
+            f"teams={options['teams']} players={n_players} simulations={options['simulations']} "
+            f"weeks={options['weeks']} seconds={elapsed:.3f} "
+            f"favourite=team{best} ({result['titles'][best] / options['simulations']:.1%})"
+        )
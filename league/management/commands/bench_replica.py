@@ -0,0 +1,102 @@
+# league/management/commands/bench_replica.py
+
+import multiprocessing
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client, override_settings
+
+from accounts.db_router import REPLICA, replicate_sqlite
+from league.models import League, LeagueMember, FantasyTeam
+
+ROUTER = "accounts.db_router.PrimaryReplicaRouter"
+# The league cache would answer most reads without touching either database
+NO_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+def _reader(league_id: int, routers: list[str], duration: float, queue) -> None:
+    # Forked children must not reuse the parent's DB connection
+    connections.close_all()
+    done = 0
+    with override_settings(DATABASE_ROUTERS=routers, CACHES=NO_CACHE):
+        client = Client(HTTP_HOST="localhost")
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            url = f"/league/leagues/{league_id}/" if done % 2 else f"/league/leagues/{league_id}/teams/"
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} returned {response.status_code}")
+            done += 1
+    queue.put(done)
+
+
+def _writer(league_id: int, duration: float, hold: float, queue) -> None:
+    """Stands in for MakePick: short write transactions on the primary, back to back."""
+    connections.close_all()
+    done = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        with transaction.atomic():
+            League.objects.filter(pk=league_id).update(name=f"bench_replica {done}")
+            time.sleep(hold)
+        done += 1
+    queue.put(done)
+
+
+class Command(BaseCommand):
+    help = (
+        "League read throughput with every query on the primary vs reads routed to the replica, "
+        "while a writer keeps the primary busy. Needs DJANGO_DB_REPLICA."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", default="1,2,4", help="Comma separated reader process counts")
+        parser.add_argument("--duration", type=float, default=3.0, help="Seconds per run")
+        parser.add_argument("--hold", type=float, default=0.002, help="Seconds each write transaction stays open")
+        parser.add_argument("--no-writer", action="store_true", help="Reads only")
+
+    def handle(self, *args, **options):
+        if REPLICA not in settings.DATABASES:
+            raise CommandError("Set DJANGO_DB_REPLICA=/path/to/replica.sqlite3 to benchmark the replica.")
+        try:
+            worker_counts = [int(n) for n in options["workers"].split(",") if n.strip()]
+        except ValueError:
+            raise CommandError("--workers must be a comma separated list of integers")
+
+        league = League.objects.create(name="bench_replica", commissioner_email="bench@test.com")
+        for slot in range(1, 9):
+            member = LeagueMember.objects.create(
+                league=league, email=f"bench{slot}@test.com", slot=slot, is_commissioner=slot == 1,
+            )
+            FantasyTeam.objects.create(league=league, member=member)
+        replicate_sqlite()
+        connections.close_all()
+
+        ctx = multiprocessing.get_context("fork")
+        duration = options["duration"]
+        try:
+            for label, routers in (("primary only", []), ("read replica", [ROUTER])):
+                baseline = None
+                for n in worker_counts:
+                    queue, writes = ctx.Queue(), ctx.Queue()
+                    procs = [ctx.Process(target=_reader, args=(league.id, routers, duration, queue)) for _ in range(n)]
+                    if not options["no_writer"]:
+                        procs.append(ctx.Process(target=_writer, args=(league.id, duration, options["hold"], writes)))
+                    for p in procs:
+                        p.start()
+                    reads = sum(queue.get() for _ in range(n))
+                    written = 0 if options["no_writer"] else writes.get()
+                    for p in procs:
+                        p.join()
+
+                    rps = reads / duration
+                    baseline = baseline or rps
+                    self.stdout.write(
+                        f"{label:<13} readers={n:<3} reads/s={rps:9.1f} scaling={rps / baseline:5.2f}x "
+                        f"writes/s={written / duration:8.1f}"
+                    )
+        finally:
+            league.delete()
+            replicate_sqlite()
@@ -0,0 +1,107 @@
+# league/management/commands/bench_shards.py
+
+import multiprocessing
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+
+from league import sharding
+from league.models import League, LeagueMember, FantasyTeam
+
+MEMBERS = 4
+
+
+def _drafter(league_id: int, shards: list[str], duration: float, queue) -> None:
+    """Makes picks in one league through MakePick as fast as it can."""
+    # Forked children must not reuse the parent's DB connections
+    connections.close_all()
+    picks = failed = 0
+    try:
+        with override_settings(LEAGUE_SHARDS=shards):
+            client = Client(HTTP_HOST="localhost", raise_request_exception=False)
+            url = f"/league/leagues/{league_id}/pick/"
+            email = "bench1@test.com"
+            deadline = time.perf_counter() + duration
+            while time.perf_counter() < deadline:
+                response = client.post(url, {"email": email, "player_id": picks + 1}, content_type="application/json")
+                if response.status_code != 200:
+                    # "database is locked" once SQLite's busy timeout runs out
+                    failed += 1
+                    continue
+                email = response.json()["draft"]["current_turn"]["email"]
+                picks += 1
+    finally:
+        queue.put((picks, failed))
+
+
+class Command(BaseCommand):
+    help = (
+        "Draft pick throughput as leagues are spread over more shards: one process per league, "
+        "each posting picks back to back. Needs DJANGO_LEAGUE_SHARDS >= the largest shard count."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shards", default="1,2,4", help="Comma separated shard counts")
+        parser.add_argument("--leagues", type=int, default=4, help="Concurrent drafts (one process each)")
+        parser.add_argument("--duration", type=float, default=3.0, help="Seconds per run")
+
+    def handle(self, *args, **options):
+        try:
+            counts = [int(n) for n in options["shards"].split(",") if n.strip()]
+        except ValueError:
+            raise CommandError("--shards must be a comma separated list of integers")
+        configured = list(settings.LEAGUE_SHARDS)
+        if max(counts) > len(configured):
+            raise CommandError(f"Only {len(configured)} shard(s) configured; set DJANGO_LEAGUE_SHARDS={max(counts)}.")
+        for alias in configured[1:]:
+            call_command("migrate", database=alias, verbosity=0)
+
+        ctx = multiprocessing.get_context("fork")
+        baseline = None
+        for n in counts:
+            shards = configured[:n]
+            with override_settings(LEAGUE_SHARDS=shards):
+                leagues = [self._league(i) for i in range(options["leagues"])]
+                used = len({sharding.shard_for(l.id) for l in leagues})
+                connections.close_all()
+                try:
+                    queue = ctx.Queue()
+                    procs = [
+                        ctx.Process(target=_drafter, args=(l.id, shards, options["duration"], queue))
+                        for l in leagues
+                    ]
+                    for p in procs:
+                        p.start()
+                    results = [queue.get() for _ in procs]
+                    for p in procs:
+                        p.join()
+                finally:
+                    for league in leagues:
+                        league.delete()
+
+            picks = sum(r[0] for r in results)
+            failed = sum(r[1] for r in results)
+            rate = picks / options["duration"]
+            baseline = baseline or rate
+            self.stdout.write(
+                f"shards={n:<3} leagues={len(leagues):<3} (on {used} shard(s)) picks={picks:<7} "
+                f"picks/s={rate:8.1f} scaling={rate / baseline:5.2f}x failed={failed}"
+            )
+
+    def _league(self, i: int) -> League:
+        league_id = sharding.allocate_league_id()
+        with sharding.use_league(league_id):
+            league = League.objects.create(id=league_id, name=f"bench_shards {i}", commissioner_email="bench1@test.com")
+            for slot in range(1, MEMBERS + 1):
+                member = LeagueMember.objects.create(
+                    league=league, email=f"bench{slot}@test.com", slot=slot, is_commissioner=slot == 1,
+                )
+                FantasyTeam.objects.create(league=league, member=member)
+        response = Client(HTTP_HOST="localhost").post(f"/league/leagues/{league.id}/start-draft/")
+        if response.status_code != 200:
+            raise CommandError(f"Could not start the draft: {response.content[:200]}")
+        return league
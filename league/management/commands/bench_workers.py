@@ -0,0 +1,75 @@
+# league/management/commands/bench_workers.py
+
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+
+from league import sharding
+from league.models import League, LeagueMember, FantasyTeam
+
+
+def _worker(league_id: int, duration: float, queue) -> None:
+    # Forked children must not reuse the parent's DB connection
+    connections.close_all()
+    client = Client(HTTP_HOST="localhost")
+    url = f"/league/leagues/{league_id}/"
+
+    done = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} returned {response.status_code}")
+        done += 1
+    queue.put(done)
+
+
+class Command(BaseCommand):
+    help = "Measure LeagueDetail read throughput as the number of worker processes grows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", default="1,2,4", help="Comma separated process counts, e.g. 1,2,4,8")
+        parser.add_argument("--duration", type=float, default=3.0, help="Seconds per run")
+        parser.add_argument("--league-id", type=int, help="Existing league to read (default: a temporary one)")
+
+    def handle(self, *args, **options):
+        try:
+            worker_counts = [int(n) for n in options["workers"].split(",") if n.strip()]
+        except ValueError:
+            raise CommandError("--workers must be a comma separated list of integers")
+
+        league = None
+        league_id = options["league_id"]
+        if league_id is None:
+            new_id = sharding.allocate_league_id()
+            with sharding.use_league(new_id):
+                league = League.objects.create(id=new_id, name="bench_workers", commissioner_email="bench@test.com")
+                for slot in range(1, 5):
+                    member = LeagueMember.objects.create(
+                        league=league, email=f"bench{slot}@test.com", slot=slot, is_commissioner=slot == 1,
+                    )
+                    FantasyTeam.objects.create(league=league, member=member)
+            league_id = league.id
+
+        ctx = multiprocessing.get_context("fork")
+        baseline = None
+        try:
+            for n in worker_counts:
+                connections.close_all()
+                queue = ctx.Queue()
+                procs = [ctx.Process(target=_worker, args=(league_id, options["duration"], queue)) for _ in range(n)]
+                for p in procs:
+                    p.start()
+                total = sum(queue.get() for _ in procs)
+                for p in procs:
+                    p.join()
+
+                rps = total / options["duration"]
+                baseline = baseline or rps
+                self.stdout.write(f"workers={n:<3} requests={total:<8} req/s={rps:10.1f} scaling={rps / baseline:5.2f}x")
+        finally:
+            if league is not None:
+                league.delete()
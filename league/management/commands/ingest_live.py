@@ -0,0 +1,47 @@
+# league/management/commands/ingest_live.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from league.live import FileFeed, NbaLiveFeed, apply_lines
+from players import warehouse
+
+
+class Command(BaseCommand):
+    help = "Stream box-score updates into stored game logs and fantasy team totals."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", help="Read JSON-lines box-score updates from a file instead of nba_api")
+        parser.add_argument("--follow", action="store_true", help="Keep tailing --file for new lines")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--interval", type=float, default=30.0, help="Seconds between nba_api polls")
+        parser.add_argument("--once", action="store_true", help="Poll nba_api once and exit")
+        parser.add_argument("--season", help="Season the games belong to (default: NBA_CURRENT_SEASON)")
+
+    def handle(self, *args, **options):
+        try:
+            season = warehouse.parse_season(options["season"] or warehouse.current_season())
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options["file"]:
+            feed = FileFeed(options["file"], batch_size=options["batch_size"], follow=options["follow"])
+        else:
+            feed = NbaLiveFeed(interval=options["interval"], once=options["once"])
+
+        totals = {"lines": 0, "changed": 0, "seconds": 0.0}
+        try:
+            for batch in feed.batches():
+                r = apply_lines(batch, season=season)
+                totals["lines"] += r.lines
+                totals["changed"] += r.changed
+                totals["seconds"] += r.seconds
+                self.stdout.write(
+                    f"lines={r.lines} changed={r.changed} players={r.players} "
+                    f"teams={r.teams} seconds={r.seconds:.3f}"
+                )
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            f"total lines={totals['lines']} changed={totals['changed']} seconds={totals['seconds']:.3f}"
+        )
@@ -0,0 +1,43 @@
+# league/management/commands/mock_drafts.py
+
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from league import simulation
+
+
+class Command(BaseCommand):
+    help = "Benchmark the in-memory mock draft simulator across process pool sizes (synthetic player pool)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--simulations", type=int, default=2000)
+        parser.add_argument("--members", type=int, default=12)
+        parser.add_argument("--rounds", type=int, default=13)
+        parser.add_argument("--workers", default="1,2,4", help="Comma separated pool sizes")
+        parser.add_argument("--strategy", default="value_noise", choices=sorted(simulation.STRATEGIES))
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            worker_counts = [int(n) for n in options["workers"].split(",") if n.strip()]
+        except ValueError:
+            raise CommandError("--workers must be a comma separated list of integers")
+
+        members, rounds = options["members"], options["rounds"]
+        rng = random.Random(options["seed"])
+        values = sorted((rng.paretovariate(2.5) * 1000 for _ in range(members * (rounds + 8))), reverse=True)
+        strategies = {slot: options["strategy"] for slot in range(1, members + 1)}
+
+        for workers in worker_counts:
+            started = time.perf_counter()
+            result = simulation.run_mock_drafts(
+                values, strategies, members, rounds, options["simulations"],
+                seed=options["seed"], workers=workers,
+            )
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"workers={workers:<3} drafts={result.simulations} picks={result.simulations * members * rounds} "
+                f"seconds={elapsed:.3f} drafts/s={result.simulations / elapsed:,.0f}"
+            )
@@ -0,0 +1,37 @@
+# league/management/commands/optimize_lineups.py
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from league.lineups import optimize_lineups
+from players import warehouse
+
+
+class Command(BaseCommand):
+    help = "Set the optimal lineup for every team in every league (run nightly from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Lineup date, YYYY-MM-DD (default: today)")
+        parser.add_argument("--season", help="Season whose averages are the projection (default: NBA_DEFAULT_SEASON)")
+        parser.add_argument("--refresh-profiles", action="store_true",
+                            help="Reload player positions from every team roster first (30 nba_api calls)")
+
+    def handle(self, *args, **options):
+        try:
+            day = date.fromisoformat(options["date"]) if options["date"] else date.today()
+            season = warehouse.parse_season(options["season"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options["refresh_profiles"]:
+            loaded = warehouse.load_team_profiles(season, log=self.stdout.write)
+            self.stdout.write(f"profiles loaded: {loaded}")
+
+        result = optimize_lineups(day, season=season)
+        total = result.load_seconds + result.optimize_seconds + result.write_seconds
+        self.stdout.write(
+            f"date={day} leagues={result.leagues} teams={result.teams} players={result.players} "
+            f"load={result.load_seconds:.3f}s optimize={result.optimize_seconds:.3f}s "
+            f"write={result.write_seconds:.3f}s total={total:.3f}s"
+        )
@@ -0,0 +1,24 @@
+# league/management/commands/process_waivers.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from league.rosters import process_waivers
+
+
+class Command(BaseCommand):
+    help = "Resolve all pending waiver claims in one batch (run from cron at the daily waiver time)."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            result = process_waivers()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"claims={result.claims} leagues={result.leagues} awarded={result.awarded} "
+            f"failed={result.failed} queries={len(queries)} seconds={elapsed:.3f}"
+        )
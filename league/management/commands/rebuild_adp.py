@@ -0,0 +1,16 @@
+# league/management/commands/rebuild_adp.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from league import adp, sharding
+
+
+class Command(BaseCommand):
+    help = "Rebuild the cross-league ADP table from every DraftPick with one grouped query per shard."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        players = sum(adp.rebuild() for _ in sharding.each_shard())
+        self.stdout.write(f"players={players} seconds={time.perf_counter() - started:.3f}")
@@ -0,0 +1,16 @@
+# league/management/commands/rebuild_ownership.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from league import ownership
+
+
+class Command(BaseCommand):
+    help = "Rebuild every league's ownership bitmap from RosterPlayer (run after upgrading nba_api)."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        leagues = ownership.rebuild_all()
+        self.stdout.write(f"leagues={leagues} seconds={time.perf_counter() - started:.3f}")
@@ -0,0 +1,34 @@
+# league/management/commands/replicate_db.py
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.db_router import PRIMARY, REPLICA, replicate_sqlite
+
+
+class Command(BaseCommand):
+    help = "Copy the primary database into the SQLite read replica (DJANGO_DB_REPLICA)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep copying, like a replica with bounded lag")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds between copies with --loop")
+
+    def handle(self, *args, **options):
+        if REPLICA not in settings.DATABASES:
+            raise CommandError("No replica configured: set DJANGO_DB_REPLICA to the replica's SQLite file.")
+        for alias in (PRIMARY, REPLICA):
+            if settings.DATABASES[alias]["ENGINE"] != "django.db.backends.sqlite3":
+                raise CommandError(f"{alias} is not SQLite; use the database's own replication instead.")
+
+        while True:
+            started = time.perf_counter()
+            replicate_sqlite()
+            self.stdout.write(f"replicated in {time.perf_counter() - started:.3f}s")
+            if not options["loop"]:
+                return
+            try:
+                time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,31 @@
+# league/management/commands/send_outbox.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from league.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = "Deliver queued league emails (invitations, draft turns) in batches over one SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new mail")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            r = deliver_pending(options["batch_size"])
+            if r.claimed or not options["loop"]:
+                self.stdout.write(
+                    f"claimed={r.claimed} sent={r.sent} retried={r.retried} "
+                    f"failed={r.failed} seconds={r.seconds:.3f}"
+                )
+            if not options["loop"]:
+                return
+            try:
+                time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,125 @@
+# league/management/commands/stress_draft.py
+
+import multiprocessing
+import random
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from league import stress
+
+
+def _process(leagues, seed: int, options: dict, queue) -> None:
+    # Forked children must not reuse the parent's DB connections
+    connections.close_all()
+    try:
+        result = stress.run(
+            leagues, seed=seed, workers=options["threads"], ops_per_worker=options["ops"],
+            overlap=options["overlap"], players=options["players"],
+        )
+        queue.put(result)
+    except BaseException as e:
+        queue.put(e)
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer draft rooms with concurrent picks, starts, resets and joins, then check that no pick number "
+        "was repeated or skipped and every pick was made in turn. The same --seed replays the same schedule; "
+        "with --overlap 1 (one operation at a time) it replays exactly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, help="Scheduler seed (default: random, printed)")
+        parser.add_argument("--leagues", type=int, default=2, help="Leagues the workers share")
+        parser.add_argument("--threads", type=int, default=8, help="Worker threads per process")
+        parser.add_argument("--processes", type=int, default=1,
+                            help="Processes, each with its own scheduler (seed, seed+1, ...) on the same leagues")
+        parser.add_argument("--ops", type=int, default=50, help="Operations per worker")
+        parser.add_argument("--overlap", type=int, default=4, help="Operations admitted together at each step")
+        parser.add_argument("--players", type=int, default=300, help="Size of the player pool picks draw from")
+        parser.add_argument("--check-every-step", action="store_true",
+                            help="Check invariants after every operation (use with --overlap 1 to find the step)")
+        parser.add_argument("--trace", action="store_true", help="Print every operation in admission order")
+        parser.add_argument("--keep", action="store_true", help="Keep the leagues instead of deleting them")
+
+    def handle(self, *args, **options):
+        if options["threads"] < 1 or options["processes"] < 1 or options["ops"] < 1:
+            raise CommandError("--threads, --processes and --ops must be at least 1")
+        seed = options["seed"] if options["seed"] is not None else random.randrange(1_000_000)
+
+        leagues = stress.create_leagues(options["leagues"])
+        try:
+            if options["processes"] == 1:
+                results = [stress.run(
+                    leagues, seed=seed, workers=options["threads"], ops_per_worker=options["ops"],
+                    overlap=options["overlap"], players=options["players"],
+                    check_every_step=options["check_every_step"],
+                )]
+            else:
+                results = self._fork(leagues, seed, options)
+            # Invariants hold at every commit, so a check another process raced with still counts
+            violations = [v for r in results for v in r.violations]
+        finally:
+            if not options["keep"]:
+                stress.delete_leagues(leagues)
+
+        if options["trace"]:
+            for r in results:
+                for step, worker, league_id, kind, email, player_id, code in r.trace:
+                    self.stdout.write(
+                        f"seed={r.seed} step={step} worker={worker} league={league_id} op={kind} "
+                        f"email={email} player_id={player_id or ''} status={code}"
+                    )
+        self._report(seed, results, violations, options)
+
+    def _fork(self, leagues, seed: int, options: dict) -> list[stress.StressResult]:
+        ctx = multiprocessing.get_context("fork")
+        queue = ctx.Queue()
+        connections.close_all()
+        procs = [ctx.Process(target=_process, args=(leagues, seed + i, options, queue))
+                 for i in range(options["processes"])]
+        for p in procs:
+            p.start()
+        results = [queue.get() for _ in procs]
+        for p in procs:
+            p.join()
+        for r in results:
+            if isinstance(r, BaseException):
+                raise CommandError(f"A worker process failed: {r!r}")
+        return results
+
+    def _report(self, seed: int, results: list[stress.StressResult], violations: list[str], options: dict) -> None:
+        ops = sum(r.operations for r in results)
+        seconds = max(r.seconds for r in results)
+        latencies = [x for r in results for x in r.latencies]
+        waits = [x for r in results for x in r.lock_waits]
+        outcomes = sum((r.outcomes for r in results), start=Counter())
+        errors = [e for r in results for e in r.errors]
+
+        self.stdout.write(
+            f"seed={seed} leagues={options['leagues']} processes={options['processes']} "
+            f"threads={options['threads']} overlap={options['overlap']}"
+        )
+        self.stdout.write(f"ops={ops} seconds={seconds:.2f} ops/s={ops / seconds:.1f}")
+        self.stdout.write(
+            f"latency p50={stress.percentile(latencies, 0.5) * 1000:.1f}ms "
+            f"p95={stress.percentile(latencies, 0.95) * 1000:.1f}ms max={max(latencies, default=0) * 1000:.1f}ms"
+        )
+        self.stdout.write(
+            f"lock_wait total={sum(waits):.2f}s p50={stress.percentile(waits, 0.5) * 1000:.1f}ms "
+            f"p95={stress.percentile(waits, 0.95) * 1000:.1f}ms max={max(waits, default=0) * 1000:.1f}ms "
+            f"lock_errors={sum(r.lock_errors for r in results)}"
+        )
+        self.stdout.write("outcomes " + " ".join(f"{k}={v}" for k, v in sorted(outcomes.items())))
+        self.stdout.write(f"errors={len(errors)} violations={len(violations)}")
+        for line in errors[:20] + violations[:20]:
+            self.stdout.write(f"  {line}")
+        if violations or errors:
+            # Same schedule; --overlap 1 --check-every-step replays it one operation at a time
+            self.stdout.write(
+                f"replay: manage.py stress_draft --seed {seed} --leagues {options['leagues']} "
+                f"--threads {options['threads']} --ops {options['ops']} --overlap {options['overlap']} "
+                f"--players {options['players']} --trace"
+            )
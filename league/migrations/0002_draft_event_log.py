@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DraftEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField()),
+                ('kind', models.CharField(choices=[('START', 'Start'), ('PICK', 'Pick'), ('UNDO', 'Undo'), ('RESET', 'Reset')], max_length=10)),
+                ('member_count', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('pick_number', models.PositiveIntegerField(blank=True, null=True)),
+                ('round', models.PositiveIntegerField(blank=True, null=True)),
+                ('slot', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('player_id', models.IntegerField(blank=True, null=True)),
+                ('actor_email', models.EmailField(blank=True, max_length=254)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='draft_events', to='league.league')),
+                ('member', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='league.leaguemember')),
+            ],
+            options={
+                'unique_together': {('league', 'seq')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DraftSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField()),
+                ('state', models.JSONField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='draft_snapshots', to='league.league')),
+            ],
+            options={
+                'unique_together': {('league', 'seq')},
+            },
+        ),
+    ]
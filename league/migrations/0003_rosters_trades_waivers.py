@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_rosters_from_picks(apps, schema_editor):
+    DraftPick = apps.get_model("league", "DraftPick")
+    RosterPlayer = apps.get_model("league", "RosterPlayer")
+    RosterPlayer.objects.bulk_create(
+        [
+            RosterPlayer(league_id=p.draft.league_id, member_id=p.member_id, player_id=p.player_id, source="DRAFT")
+            for p in DraftPick.objects.select_related("draft").order_by("draft_id", "pick_number")
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0002_draft_event_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Trade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PROPOSED', 'Proposed'), ('ACCEPTED', 'Accepted'), ('REJECTED', 'Rejected'), ('CANCELLED', 'Cancelled'), ('FAILED', 'Failed')], default='PROPOSED', max_length=20)),
+                ('result', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trades', to='league.league')),
+                ('proposer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trades_proposed', to='league.leaguemember')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trades_received', to='league.leaguemember')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TradeItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_id', models.IntegerField()),
+                ('from_member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='league.leaguemember')),
+                ('trade', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='league.trade')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RosterPlayer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_id', models.IntegerField(db_index=True)),
+                ('source', models.CharField(choices=[('DRAFT', 'Draft'), ('TRADE', 'Trade'), ('WAIVER', 'Waiver')], default='DRAFT', max_length=10)),
+                ('acquired_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roster_players', to='league.league')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roster_players', to='league.leaguemember')),
+            ],
+            options={
+                'unique_together': {('league', 'player_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='WaiverClaim',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('add_player_id', models.IntegerField()),
+                ('drop_player_id', models.IntegerField(blank=True, null=True)),
+                ('priority', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('AWARDED', 'Awarded'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('result', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waiver_claims', to='league.league')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waiver_claims', to='league.leaguemember')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'league', 'priority', 'created_at'], name='league_waiv_status_1df9d3_idx')],
+            },
+        ),
+        migrations.RunPython(seed_rosters_from_picks, migrations.RunPython.noop),
+    ]
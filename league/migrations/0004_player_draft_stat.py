@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:03
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0003_rosters_trades_waivers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerDraftStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_id', models.IntegerField(unique=True)),
+                ('times_drafted', models.PositiveIntegerField(db_index=True, default=0)),
+                ('pick_sum', models.PositiveBigIntegerField(default=0)),
+                ('round_sum', models.PositiveBigIntegerField(default=0)),
+                ('adp', models.FloatField(db_index=True, default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0004_player_draft_stat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Lineup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('projected_points', models.FloatField(default=0)),
+                ('optimized_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lineups', to='league.league')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lineups', to='league.leaguemember')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LineupEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.CharField(max_length=10)),
+                ('player_id', models.IntegerField()),
+                ('projected_points', models.FloatField(default=0)),
+                ('lineup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='league.lineup')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='lineup',
+            index=models.Index(fields=['league', 'date'], name='league_line_league__7ee7a2_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='lineup',
+            unique_together={('member', 'date')},
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0005_lineups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fantasyteam',
+            name='points',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fantasyteam',
+            name='points_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:31
+
+import django.utils.timezone
+from django.core.management.color import no_style
+from django.db import migrations, models
+
+
+def seed_league_key(apps, schema_editor):
+    """Start the global id sequence after the leagues that already exist."""
+    League = apps.get_model('league', 'League')
+    LeagueKey = apps.get_model('league', 'LeagueKey')
+    db = schema_editor.connection.alias
+    last = League.objects.using(db).order_by('-id').values_list('id', flat=True).first()
+    if last:
+        LeagueKey.objects.using(db).create(id=last)
+        # Explicit ids don't advance sequences on every backend
+        with schema_editor.connection.cursor() as cursor:
+            for sql in schema_editor.connection.ops.sequence_reset_sql(no_style(), [LeagueKey]):
+                cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0007_email_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeagueKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(seed_league_key, migrations.RunPython.noop, hints={'model_name': 'leaguekey'}),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0008_league_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JoinCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=12, unique=True)),
+                ('league_id', models.BigIntegerField(unique=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='leaguemember',
+            unique_together={('league', 'email'), ('league', 'slot')},
+        ),
+    ]
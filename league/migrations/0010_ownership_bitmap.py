@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0009_join_codes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnershipBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index_version', models.CharField(max_length=20)),
+                ('bits', models.BinaryField(default=b'')),
+                ('league', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ownership', to='league.league')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0010_ownership_bitmap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='league',
+            name='cache_version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
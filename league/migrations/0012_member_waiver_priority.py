@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0011_league_cache_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leaguemember',
+            name='waiver_priority',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
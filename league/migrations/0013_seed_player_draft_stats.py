@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:05
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+
+def rebuild_draft_stats(apps, schema_editor):
+    """
+    0004 created PlayerDraftStat empty, so drafts made before it were missing
+    from ADP and picks since then were added to partial counts. Recompute every
+    row from DraftPick, as `manage.py rebuild_adp` does.
+    """
+    DraftPick = apps.get_model('league', 'DraftPick')
+    PlayerDraftStat = apps.get_model('league', 'PlayerDraftStat')
+    db = schema_editor.connection.alias
+    now = timezone.now()
+    rows = [
+        PlayerDraftStat(
+            player_id=r['player_id'],
+            times_drafted=r['n'],
+            pick_sum=r['pick_sum'],
+            round_sum=r['round_sum'],
+            adp=r['pick_sum'] / r['n'],
+            updated_at=now,
+        )
+        for r in DraftPick.objects.using(db).values('player_id').annotate(
+            n=Count('id'), pick_sum=Sum('pick_number'), round_sum=Sum('round'),
+        )
+    ]
+    PlayerDraftStat.objects.using(db).all().delete()
+    PlayerDraftStat.objects.using(db).bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0012_member_waiver_priority'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_draft_stats, migrations.RunPython.noop),
+    ]
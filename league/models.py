@@ -13,6 +13,8 @@ class League(models.Model):
     max_players = models.PositiveSmallIntegerField(default=4)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.SETUP)
     created_at = models.DateTimeField(default=timezone.now)
+    # Bumped by every write that changes a cached league payload (league/cache.py)
+    cache_version = models.PositiveIntegerField(default=1)
 
 
 class LeagueMember(models.Model):
@@ -21,15 +23,22 @@ class LeagueMember(models.Model):
     display_name = models.CharField(max_length=80, blank=True)
     slot = models.PositiveSmallIntegerField()  # 1..max_players
     is_commissioner = models.BooleanField(default=False)
+    # Rolling waiver order, lowest first, ties to the later draft slot; an awarded
+    # claim moves the member to the back (league/rosters.py)
+    waiver_priority = models.PositiveIntegerField(default=0)
 
     class Meta:
-        unique_together = [("league", "email")]
+        # (league, slot) backs the conditional insert in league/joins.py
+        unique_together = [("league", "email"), ("league", "slot")]
 
 
 class FantasyTeam(models.Model):
     league = models.ForeignKey(League, on_delete=models.CASCADE, related_name="teams")
     member = models.OneToOneField(LeagueMember, on_delete=models.CASCADE, related_name="team")
     name = models.CharField(max_length=120, default="My Team")
+    # Fantasy points scored by rostered players while on this team (league/live.py)
+    points = models.FloatField(default=0)
+    points_updated_at = models.DateTimeField(null=True, blank=True)
 
 
 class Draft(models.Model):
@@ -59,4 +68,201 @@ class DraftPick(models.Model):
         unique_together = [
             ("draft", "player_id"),
             ("draft", "pick_number"),
-        ]
\ No newline at end of file
+        ]
+
+class DraftEvent(models.Model):
+    """
+    Append-only draft audit log. Keyed by league (not Draft) so the history
+    survives ResetLeague deleting the Draft row.
+    """
+    class Kind(models.TextChoices):
+        START = "START"
+        PICK = "PICK"
+        UNDO = "UNDO"
+        RESET = "RESET"
+
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name="draft_events")
+    seq = models.PositiveIntegerField()  # 1..n per league
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    member_count = models.PositiveSmallIntegerField(null=True, blank=True)  # START only
+    pick_number = models.PositiveIntegerField(null=True, blank=True)
+    round = models.PositiveIntegerField(null=True, blank=True)
+    slot = models.PositiveSmallIntegerField(null=True, blank=True)
+    member = models.ForeignKey(LeagueMember, on_delete=models.SET_NULL, null=True, blank=True)
+    player_id = models.IntegerField(null=True, blank=True)
+    actor_email = models.EmailField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = [("league", "seq")]
+
+
+class DraftSnapshot(models.Model):
+    """Compact replay state after event `seq`, written every DRAFT_SNAPSHOT_INTERVAL events."""
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name="draft_snapshots")
+    seq = models.PositiveIntegerField()
+    state = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = [("league", "seq")]
+
+
+class RosterPlayer(models.Model):
+    """
+    Current ownership of a player in a league. Seeded by draft picks, then
+    moved by trades and waiver claims. DraftPick stays as the draft record.
+    """
+    class Source(models.TextChoices):
+        DRAFT = "DRAFT"
+        TRADE = "TRADE"
+        WAIVER = "WAIVER"
+
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name="roster_players")
+    member = models.ForeignKey(LeagueMember, on_delete=models.CASCADE, related_name="roster_players")
+    player_id = models.IntegerField(db_index=True)
+    source = models.CharField(max_length=10, choices=Source.choices, default=Source.DRAFT)
+    acquired_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = [("league", "player_id")]
+
+
+class Trade(models.Model):
+    class Status(models.TextChoices):
+        PROPOSED = "PROPOSED"
+        ACCEPTED = "ACCEPTED"
+        REJECTED = "REJECTED"
+        CANCELLED = "CANCELLED"
+        FAILED = "FAILED"
+
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name="trades")
+    proposer = models.ForeignKey(LeagueMember, on_delete=models.CASCADE, related_name="trades_proposed")
+    recipient = models.ForeignKey(LeagueMember, on_delete=models.CASCADE, related_name="trades_received")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PROPOSED)
+    result = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+
+
+class TradeItem(models.Model):
+    trade = models.ForeignKey(Trade, on_delete=models.CASCADE, related_name="items")
+    from_member = models.ForeignKey(LeagueMember, on_delete=models.CASCADE)
+    player_id = models.IntegerField()
+
+
+class WaiverClaim(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "PENDING"
+        AWARDED = "AWARDED"
+        FAILED = "FAILED"
+
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name="waiver_claims")
+    member = models.ForeignKey(LeagueMember, on_delete=models.CASCADE, related_name="waiver_claims")
+    add_player_id = models.IntegerField()
+    drop_player_id = models.IntegerField(null=True, blank=True)
+    priority = models.PositiveIntegerField()  # the member's place in the waiver order when claiming, 1 = first
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    result = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "league", "priority", "created_at"])]
+
+
+class PlayerDraftStat(models.Model):
+    """
+    Cross-league draft aggregate per player (average draft position and how
+    often they are drafted). Kept current by MakePick/UndoPick/ResetLeague and
+    rebuildable from DraftPick with `manage.py rebuild_adp`.
+    """
+    player_id = models.IntegerField(unique=True)
+    times_drafted = models.PositiveIntegerField(default=0, db_index=True)
+    pick_sum = models.PositiveBigIntegerField(default=0)
+    round_sum = models.PositiveBigIntegerField(default=0)
+    adp = models.FloatField(default=0, db_index=True)  # pick_sum / times_drafted, stored so it can be sorted on
+    updated_at = models.DateTimeField(default=timezone.now)
+
+
+class Lineup(models.Model):
+    """A member's starters for one day, as chosen by league/lineups.py."""
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name="lineups")
+    member = models.ForeignKey(LeagueMember, on_delete=models.CASCADE, related_name="lineups")
+    date = models.DateField()
+    projected_points = models.FloatField(default=0)
+    optimized_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = [("member", "date")]
+        indexes = [models.Index(fields=["league", "date"])]
+
+
+class LineupEntry(models.Model):
+    BENCH = "BN"
+
+    lineup = models.ForeignKey(Lineup, on_delete=models.CASCADE, related_name="entries")
+    slot = models.CharField(max_length=10)  # slot type from LINEUP_SLOTS, or "BN"
+    player_id = models.IntegerField()
+    projected_points = models.FloatField(default=0)
+
+
+class OwnershipBitmap(models.Model):
+    """
+    The league's rostered players as a bitset over the static player index rows
+    (players/static_index.py), kept in step with RosterPlayer by league/ownership.py.
+    """
+    league = models.OneToOneField(League, on_delete=models.CASCADE, related_name="ownership")
+    # Rows differ between nba_api versions; a bitmap built for another version is rebuilt
+    index_version = models.CharField(max_length=20)
+    bits = models.BinaryField(default=b"")
+
+
+class EmailOutbox(models.Model):
+    """
+    Outgoing mail, written in the same transaction as the change that causes it
+    and delivered later by `manage.py send_outbox` (league/outbox.py).
+    """
+    class Kind(models.TextChoices):
+        INVITE = "INVITE"
+        DRAFT_TURN = "DRAFT_TURN"
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING"
+        SENT = "SENT"
+        FAILED = "FAILED"
+
+    league = models.ForeignKey(League, on_delete=models.SET_NULL, null=True, blank=True, related_name="emails")
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+
+class LeagueKey(models.Model):
+    """
+    Global league id sequence (league/sharding.py).
+    Lives only in the default database; each row's id becomes a League id,
+    so ids are unique across shards and pick the shard they live on.
+    """
+    created_at = models.DateTimeField(default=timezone.now)
+
+
+class JoinCode(models.Model):
+    """
+    Short code that lets anyone join a league (league/joins.py). Global like
+    LeagueKey, so a code finds its league's shard; league_id is a plain
+    integer because the league may live in another database.
+    """
+    code = models.CharField(max_length=12, unique=True)
+    league_id = models.BigIntegerField(unique=True)
+    created_at = models.DateTimeField(default=timezone.now)
@@ -0,0 +1,157 @@
+# league/outbox.py
+#
+# Transactional outbox for league email. Views only insert EmailOutbox rows
+# (inside their own transaction, so a rolled-back league never mails anyone);
+# `manage.py send_outbox` delivers them in batches over one SMTP connection.
+
+from __future__ import annotations
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+from .models import EmailOutbox, League, LeagueMember
+from . import sharding
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+# ----------------------------
+# Enqueue (call inside the request's transaction)
+# ----------------------------
+
+def enqueue_invitations(league: League, members: list[LeagueMember]) -> None:
+    EmailOutbox.objects.bulk_create([
+        EmailOutbox(
+            league=league,
+            kind=EmailOutbox.Kind.INVITE,
+            to_email=m.email,
+            subject=f"You're invited to {league.name}",
+            body=(
+                f"{league.commissioner_email} invited you to the fantasy basketball league "
+                f"\"{league.name}\".\n\nYou have draft slot {m.slot} of {league.max_players}. "
+                f"Sign in with {m.email} to join the draft."
+            ),
+        )
+        for m in members
+    ])
+
+
+def enqueue_draft_turn(league: League, member: LeagueMember, round: int, pick_number: int) -> None:
+    EmailOutbox.objects.create(
+        league=league,
+        kind=EmailOutbox.Kind.DRAFT_TURN,
+        to_email=member.email,
+        subject=f"{league.name}: you're on the clock",
+        body=f"It's your turn in the {league.name} draft (round {round}, pick {pick_number}).",
+    )
+
+
+# ----------------------------
+# Delivery
+# ----------------------------
+
+@dataclass
+class OutboxRunResult:
+    claimed: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+
+def _claim(batch_size: int) -> list[EmailOutbox]:
+    """
+    Take up to batch_size due messages and push their next_attempt_at past the
+    lease, so a second sender running at the same time skips them.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=_setting("OUTBOX_LEASE_SECONDS", 300))
+    with sharding.atomic():
+        ids = list(
+            EmailOutbox.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=EmailOutbox.Status.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        EmailOutbox.objects.filter(id__in=ids).update(next_attempt_at=now + lease)
+    return list(EmailOutbox.objects.filter(id__in=ids).order_by("id"))
+
+
+def _record_failure(item: EmailOutbox, error: str, now, result: OutboxRunResult) -> None:
+    item.attempts += 1
+    item.last_error = error[:1000]
+    if item.attempts >= _setting("OUTBOX_MAX_ATTEMPTS", 5):
+        item.status = EmailOutbox.Status.FAILED
+        result.failed += 1
+    else:
+        # Exponential backoff: base, 2x base, 4x base, ...
+        delay = _setting("OUTBOX_RETRY_BASE_SECONDS", 60) * 2 ** (item.attempts - 1)
+        item.next_attempt_at = now + timedelta(seconds=delay)
+        result.retried += 1
+
+
+def deliver_batch(batch_size: int | None = None) -> OutboxRunResult:
+    """
+    Send one batch of the active shard's due messages over a single connection.
+
+    Messages go out one send_messages() call at a time on the already-open
+    connection, so a rejected recipient is charged to its own row instead of
+    failing (and later re-sending) the whole batch. If the connection cannot be
+    opened at all, every claimed message is rescheduled.
+    """
+    started = time.perf_counter()
+    result = OutboxRunResult()
+    items = _claim(batch_size or _setting("OUTBOX_BATCH_SIZE", 100))
+    result.claimed = len(items)
+    if not items:
+        return result
+
+    from_email = _setting("DEFAULT_FROM_EMAIL", "webmaster@localhost")
+    now = timezone.now()
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for item in items:
+            _record_failure(item, f"connect: {e}", now, result)
+    else:
+        try:
+            for item in items:
+                message = EmailMessage(item.subject, item.body, from_email, [item.to_email], connection=connection)
+                try:
+                    connection.send_messages([message])
+                except Exception as e:
+                    _record_failure(item, str(e), now, result)
+                else:
+                    item.status = EmailOutbox.Status.SENT
+                    item.attempts += 1
+                    item.sent_at = timezone.now()
+                    item.last_error = ""
+                    result.sent += 1
+        finally:
+            connection.close()
+
+    EmailOutbox.objects.bulk_update(items, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"])
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def deliver_pending(batch_size: int | None = None) -> OutboxRunResult:
+    """Deliver batches until nothing is due, shard by shard."""
+    total = OutboxRunResult()
+    for _ in sharding.each_shard():
+        while True:
+            r = deliver_batch(batch_size)
+            if not r.claimed:
+                break
+            total.claimed += r.claimed
+            total.sent += r.sent
+            total.retried += r.retried
+            total.failed += r.failed
+            total.seconds += r.seconds
+    return total
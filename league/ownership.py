@@ -0,0 +1,143 @@
+# league/ownership.py
+#
+# Ownership index: each league's rostered players as a bitset over the dense
+# rows of the static player index (players/static_index.py), one
+# OwnershipBitmap row per league. With the bitset in hand, "is this player
+# available", bulk availability for a list of players and free-agent search
+# are bit operations instead of a RosterPlayer query per player.
+#
+# RosterPlayer stays the source of truth. Roster writes (pick, undo, reset,
+# waivers) update the bitmap in the same transaction; trades move players
+# between members of one league, so its bitmap doesn't change. A league with
+# no bitmap yet, or one built for another nba_api version, is rebuilt from
+# RosterPlayer by its next roster write and computed in memory by readers
+# until then.
+#
+# Players newer than the installed nba_api have no row and no bit; the few
+# lookups that involve them go to RosterPlayer, as does leagues_owning().
+
+from __future__ import annotations
+from typing import Iterable
+from players import static_index
+from .models import League, OwnershipBitmap, RosterPlayer
+from . import sharding
+
+# Keeps each IN (...) list well under SQLite's bound-variable limit
+_CHUNK = 500
+
+
+def _bitset(player_ids: Iterable[int]) -> tuple[int, list[int]]:
+    """Bitset of the players' index rows, plus the ids that have no row."""
+    index = static_index.get()
+    bits, missing = 0, []
+    for player_id in player_ids:
+        row = index.row_of(player_id)
+        if row is None:
+            missing.append(player_id)
+        else:
+            bits |= 1 << row
+    return bits, missing
+
+
+def _to_bytes(bits: int) -> bytes:
+    # Fixed width, so byte i always holds rows 8i..8i+7
+    return bits.to_bytes((static_index.get().size + 7) // 8, "little")
+
+
+# ----------------------------
+# Writes (call inside the roster change's transaction, after it)
+# ----------------------------
+
+def rebuild(league_ids: list[int]) -> None:
+    """Recompute the bitmaps of these leagues (on the active shard) from RosterPlayer."""
+    version = static_index.get().nba_api_version
+    for i in range(0, len(league_ids), _CHUNK):
+        chunk = league_ids[i:i + _CHUNK]
+        owned: dict[int, list[int]] = {league_id: [] for league_id in chunk}
+        for league_id, player_id in RosterPlayer.objects.filter(league_id__in=chunk).values_list("league_id", "player_id"):
+            owned[league_id].append(player_id)
+        OwnershipBitmap.objects.filter(league_id__in=chunk).delete()
+        OwnershipBitmap.objects.bulk_create([
+            OwnershipBitmap(league_id=league_id, index_version=version, bits=_to_bytes(_bitset(ids)[0]))
+            for league_id, ids in owned.items()
+        ])
+
+
+def rebuild_all() -> int:
+    """Rebuild every league on every shard, e.g. after an nba_api upgrade. Returns the league count."""
+    leagues = 0
+    for _ in sharding.each_shard():
+        league_ids = list(League.objects.values_list("id", flat=True))
+        with sharding.atomic():
+            rebuild(league_ids)
+        leagues += len(league_ids)
+    return leagues
+
+
+def update(league_id: int, add: Iterable[int] = (), remove: Iterable[int] = ()) -> None:
+    """Apply a roster change the caller just made: set the bits of `add`, clear those of `remove`."""
+    bitmap = OwnershipBitmap.objects.select_for_update().filter(league_id=league_id).first()
+    if bitmap is None or bitmap.index_version != static_index.get().nba_api_version:
+        # RosterPlayer already includes the caller's change
+        rebuild([league_id])
+        return
+    added, _ = _bitset(add)
+    removed, _ = _bitset(remove)
+    bits = int.from_bytes(bitmap.bits, "little") & ~removed | added
+    OwnershipBitmap.objects.filter(pk=bitmap.pk).update(bits=_to_bytes(bits))
+
+
+def clear(league_id: int) -> None:
+    OwnershipBitmap.objects.update_or_create(
+        league_id=league_id,
+        defaults={"index_version": static_index.get().nba_api_version, "bits": _to_bytes(0)},
+    )
+
+
+# ----------------------------
+# Reads
+# ----------------------------
+
+def owned_bits(league_id: int) -> int:
+    """Bitset of the index rows owned in the league (active shard)."""
+    row = OwnershipBitmap.objects.filter(league_id=league_id).values_list("index_version", "bits").first()
+    if row and row[0] == static_index.get().nba_api_version:
+        return int.from_bytes(row[1], "little")
+    return _bitset(RosterPlayer.objects.filter(league_id=league_id).values_list("player_id", flat=True))[0]
+
+
+def availability(league_id: int, player_ids: list[int]) -> dict[int, bool]:
+    """player_id -> True if no one in the league owns the player."""
+    index = static_index.get()
+    owned = owned_bits(league_id)
+    result: dict[int, bool] = {}
+    missing = []
+    for player_id in player_ids:
+        row = index.row_of(player_id)
+        if row is None:
+            missing.append(player_id)
+        else:
+            result[player_id] = not owned >> row & 1
+    if missing:
+        taken = set(
+            RosterPlayer.objects.filter(league_id=league_id, player_id__in=missing).values_list("player_id", flat=True)
+        )
+        result.update((player_id, player_id not in taken) for player_id in missing)
+    return result
+
+
+def free_agents(league_id: int, query: str, limit: int = 25) -> list[dict]:
+    """Name search over the static index, skipping every player owned in the league."""
+    return static_index.get().search(query, limit=limit, exclude=owned_bits(league_id))
+
+
+def leagues_owning(player_id: int) -> list[int]:
+    """
+    Ids of every league, on every shard, where the player is rostered. A
+    reverse lookup is what the RosterPlayer.player_id index is for; the
+    bitmaps answer per-league questions and would all have to be scanned.
+    """
+    found: list[int] = []
+    for _ in sharding.each_shard():
+        found += RosterPlayer.objects.filter(player_id=player_id).values_list("league_id", flat=True).distinct()
+    return sorted(found)
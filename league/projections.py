@@ -0,0 +1,107 @@
+# league/projections.py
+#
+# Monte Carlo season projections. Each simulated week, every rostered player
+# plays `games_per_week` games whose fantasy points are resampled from that
+# player's game log; team totals decide head-to-head matchups on a round-robin schedule.
+
+from __future__ import annotations
+import numpy as np
+
+
+def round_robin(n_teams: int, weeks: int) -> np.ndarray:
+    """
+    (weeks, n_teams) array of opponent indexes using the circle method.
+    With an odd team count the team drawn against the phantom gets a bye (-1).
+    """
+    n = n_teams + (n_teams % 2)
+    order = list(range(n))
+    rounds = []
+    for _ in range(n - 1):
+        opp = [-1] * n
+        for i in range(n // 2):
+            a, b = order[i], order[n - 1 - i]
+            opp[a], opp[b] = b, a
+        rounds.append(opp[:n_teams])
+        order = [order[0], order[-1], *order[1:-1]]
+
+    schedule = np.array([rounds[w % len(rounds)] for w in range(weeks)], dtype=np.int64)
+    schedule[schedule >= n_teams] = -1
+    return schedule
+
+
+def project_season(game_logs: list[list[float]], team_index: list[int], n_teams: int, *,
+                   simulations: int = 10_000, weeks: int = 20, games_per_week: int = 3,
+                   seed: int = 0, chunk_size: int = 500) -> dict[str, np.ndarray]:
+    """
+    game_logs[p] holds player p's historical fantasy points per game and
+    team_index[p] the team that player is on. Simulations run in chunks of `chunk_size`
+    so the (sims x weeks x games x players) sample array stays bounded.
+    The same seed always gives the same result.
+
+    Returns per-team arrays: wins (simulations, n_teams), points (simulations, n_teams)
+    and titles (n_teams,) counting seasons the team finished first.
+    """
+    n_players = len(game_logs)
+    rng = np.random.default_rng(seed)
+    schedule = round_robin(n_teams, weeks)
+    has_game = schedule >= 0
+    safe_opp = np.where(has_game, schedule, 0)
+
+    # Pad logs into one matrix; players with no games always score 0
+    counts = np.array([max(len(g), 1) for g in game_logs], dtype=np.int64)
+    width = int(counts.max()) if n_players else 1
+    logs = np.zeros((n_players, width), dtype=np.float32)
+    for p, g in enumerate(game_logs):
+        logs[p, :len(g)] = g
+
+    membership = np.zeros((n_players, n_teams), dtype=np.float32)
+    membership[np.arange(n_players), team_index] = 1.0
+
+    # Sample through the flattened matrix: row offset + column, all int32
+    flat_logs = logs.ravel()
+    row_offsets = (np.arange(n_players) * width).astype(np.int32)
+    counts_f = counts.astype(np.float32)
+    max_col = (counts - 1).astype(np.int32)
+
+    wins = np.zeros((simulations, n_teams), dtype=np.float32)
+    points = np.zeros((simulations, n_teams), dtype=np.float32)
+
+    for start in range(0, simulations, chunk_size):
+        c = min(chunk_size, simulations - start)
+        # float32 uniforms scaled per player are ~3x cheaper than rng.integers with array bounds
+        cols = (rng.random((c, weeks, games_per_week, n_players), dtype=np.float32) * counts_f).astype(np.int32)
+        np.minimum(cols, max_col, out=cols)  # float rounding can land exactly on the count
+        player_week = flat_logs[cols + row_offsets].sum(axis=2)     # (c, weeks, players)
+        team_week = player_week @ membership                        # (c, weeks, teams)
+        opp_week = np.take_along_axis(team_week, np.broadcast_to(safe_opp, team_week.shape), axis=2)
+
+        result = (team_week > opp_week) + 0.5 * (team_week == opp_week)
+        wins[start:start + c] = np.where(has_game, result, 0.0).sum(axis=1)
+        points[start:start + c] = team_week.sum(axis=1)
+
+    # Title = most wins, season points break ties, and a coin flip breaks the rest
+    # (argmax alone would hand every exact tie, e.g. empty rosters, to team 0)
+    standing = wins.astype(np.float64) * 1e7 + points
+    leaders = standing == standing.max(axis=1, keepdims=True)
+    champion = np.where(leaders, rng.random(standing.shape), -1.0).argmax(axis=1)
+    titles = np.bincount(champion, minlength=n_teams)
+    return {"wins": wins, "points": points, "titles": titles}
+
+
+def summarize(result: dict[str, np.ndarray], interval: float = 0.9) -> list[dict[str, float]]:
+    wins, points, titles = result["wins"], result["points"], result["titles"]
+    lo, hi = 50 * (1 - interval), 50 * (1 + interval)
+    sims = wins.shape[0]
+
+    win_lo, win_hi = np.percentile(wins, [lo, hi], axis=0)
+    pts_lo, pts_hi = np.percentile(points, [lo, hi], axis=0)
+    return [
+        {
+            "title_probability": round(float(titles[t]) / sims, 4),
+            "expected_wins": round(float(wins[:, t].mean()), 2),
+            "wins_interval": [round(float(win_lo[t]), 1), round(float(win_hi[t]), 1)],
+            "expected_points": round(float(points[:, t].mean()), 1),
+            "points_interval": [round(float(pts_lo[t]), 1), round(float(pts_hi[t]), 1)],
+        }
+        for t in range(wins.shape[1])
+    ]
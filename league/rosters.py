@@ -0,0 +1,244 @@
+# league/rosters.py
+
+from __future__ import annotations
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Iterable
+from django.conf import settings
+from django.utils import timezone
+from .models import LeagueMember, RosterPlayer, Trade, WaiverClaim
+from . import cache as league_cache
+from . import ownership, sharding
+
+
+# Keeps each IN (...) list well under SQLite's bound-variable limit
+_CHUNK = 500
+
+
+def roster_limit() -> int:
+    return int(getattr(settings, "LEAGUE_ROSTER_SIZE", 13))
+
+
+def _chunks(items: list[int], size: int = _CHUNK) -> Iterable[list[int]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# ----------------------------
+# Trades
+# ----------------------------
+
+def accept_trade(trade: Trade) -> str | None:
+    """
+    Move every TradeItem to the other side in two bulk UPDATEs.
+    Ownership and roster limits are checked with one lookup of the traded
+    players and one grouped count, not per item.
+    Returns an error message, or None on success. Caller holds a transaction.
+    """
+    # One item per player, even if the trade was stored with a repeated id
+    items = list({i.player_id: i for i in trade.items.all()}.values())
+    player_ids = [i.player_id for i in items]
+
+    owners = dict(
+        RosterPlayer.objects
+        .filter(league_id=trade.league_id, player_id__in=player_ids)
+        .values_list("player_id", "member_id")
+    )
+    for item in items:
+        if owners.get(item.player_id) != item.from_member_id:
+            return f"Player {item.player_id} is no longer owned by member {item.from_member_id}"
+
+    sides = {trade.proposer_id: trade.recipient_id, trade.recipient_id: trade.proposer_id}
+    outgoing = Counter(i.from_member_id for i in items)
+    sizes = Counter(
+        RosterPlayer.objects
+        .filter(member_id__in=sides.keys())
+        .values_list("member_id", flat=True)
+    )
+    for member_id, other_id in sides.items():
+        after = sizes[member_id] - outgoing[member_id] + outgoing[other_id]
+        if after > roster_limit():
+            return f"Trade would put member {member_id} over the roster limit of {roster_limit()}"
+
+    for from_id, to_id in sides.items():
+        ids = [i.player_id for i in items if i.from_member_id == from_id]
+        if ids:
+            RosterPlayer.objects.filter(league_id=trade.league_id, player_id__in=ids).update(
+                member_id=to_id, source=RosterPlayer.Source.TRADE, acquired_at=timezone.now(),
+            )
+    league_cache.invalidate_league(trade.league_id)
+    return None
+
+
+# ----------------------------
+# Waivers
+# ----------------------------
+
+@dataclass
+class WaiverRunResult:
+    claims: int = 0
+    awarded: int = 0
+    failed: int = 0
+    leagues: int = 0
+
+
+def _waiver_key(member: LeagueMember) -> tuple[int, int]:
+    # Lowest waiver_priority first; before any award, the later draft slot goes first
+    return member.waiver_priority, -member.slot
+
+
+def waiver_position(member: LeagueMember) -> int:
+    """The member's 1-based place in their league's current waiver order."""
+    others = LeagueMember.objects.filter(league_id=member.league_id).exclude(pk=member.pk)
+    return 1 + sum(1 for m in others.only("slot", "waiver_priority") if _waiver_key(m) < _waiver_key(member))
+
+
+def process_waivers() -> WaiverRunResult:
+    """
+    Resolve every PENDING claim in one batch, league by league in rolling
+    waiver order: the first member in the order with a pending claim has their
+    oldest claim tried; an award moves them to the back of the order, a failure
+    moves on to their next claim.
+
+    All reads happen up front (pending claims, then current ownership and the
+    waiver order for the affected leagues) and all writes at the end (one DELETE
+    for drops, one bulk INSERT for adds, one UPDATE per claim outcome, a bulk
+    UPDATE of the new order), so the query count depends on the number of chunks,
+    not on the number of claims. Each shard is its own batch.
+    """
+    result = WaiverRunResult()
+    for _ in sharding.each_shard():
+        _process_shard(result)
+    return result
+
+
+def _process_shard(result: WaiverRunResult) -> None:
+    with sharding.atomic():
+        claims = list(
+            WaiverClaim.objects
+            .select_for_update()
+            .filter(status=WaiverClaim.Status.PENDING)
+            .order_by("league_id", "created_at", "id")
+        )
+        if not claims:
+            return
+
+        league_ids = sorted({c.league_id for c in claims})
+
+        # (league_id, player_id) -> (roster row id, member_id)
+        owned: dict[tuple[int, int], tuple[int, int]] = {}
+        sizes: Counter[int] = Counter()
+        members: dict[int, LeagueMember] = {}
+        for chunk in _chunks(league_ids):
+            for row_id, league_id, player_id, member_id in (
+                RosterPlayer.objects
+                .filter(league_id__in=chunk)
+                .values_list("id", "league_id", "player_id", "member_id")
+            ):
+                owned[(league_id, player_id)] = (row_id, member_id)
+                sizes[member_id] += 1
+            members.update(
+                (m.id, m)
+                for m in LeagueMember.objects.filter(league_id__in=chunk).only("league_id", "slot", "waiver_priority")
+            )
+
+        # league_id -> member_id -> that member's claims, oldest first
+        queues: dict[int, dict[int, deque[WaiverClaim]]] = {}
+        for claim in claims:
+            queues.setdefault(claim.league_id, {}).setdefault(claim.member_id, deque()).append(claim)
+        # Each league's back of the order
+        last: dict[int, int] = {}
+        for m in members.values():
+            last[m.league_id] = max(last.get(m.league_id, 0), m.waiver_priority)
+        moved: list[LeagueMember] = []
+
+        now = timezone.now()
+        limit = roster_limit()
+        drop_row_ids: list[int] = []
+        adds: list[RosterPlayer] = []
+
+        for claim in _in_waiver_order(queues, members):
+            key_add = (claim.league_id, claim.add_player_id)
+            key_drop = (claim.league_id, claim.drop_player_id) if claim.drop_player_id is not None else None
+            error = None
+
+            if key_add in owned:
+                error = "Player is not available"
+            elif key_drop is not None and owned.get(key_drop, (None, None))[1] != claim.member_id:
+                error = "Drop player is not on your roster"
+            elif key_drop is None and sizes[claim.member_id] >= limit:
+                error = f"Roster is full ({limit}); include a drop_player_id"
+
+            claim.processed_at = now
+            if error:
+                claim.status = WaiverClaim.Status.FAILED
+                claim.result = error
+                result.failed += 1
+                continue
+
+            if key_drop is not None:
+                row_id, _ = owned.pop(key_drop)
+                if row_id is not None:
+                    drop_row_ids.append(row_id)
+                else:
+                    # Added earlier in this run, so not inserted yet
+                    adds = [a for a in adds if (a.league_id, a.player_id) != key_drop]
+                sizes[claim.member_id] -= 1
+
+            owned[key_add] = (None, claim.member_id)
+            sizes[claim.member_id] += 1
+            adds.append(RosterPlayer(
+                league_id=claim.league_id,
+                member_id=claim.member_id,
+                player_id=claim.add_player_id,
+                source=RosterPlayer.Source.WAIVER,
+                acquired_at=now,
+            ))
+            claim.status = WaiverClaim.Status.AWARDED
+            claim.result = ""
+            result.awarded += 1
+
+            member = members[claim.member_id]
+            last[claim.league_id] += 1
+            member.waiver_priority = last[claim.league_id]
+            moved.append(member)
+
+        for chunk in _chunks(drop_row_ids):
+            RosterPlayer.objects.filter(id__in=chunk).delete()
+        RosterPlayer.objects.bulk_create(adds, batch_size=_CHUNK)
+        LeagueMember.objects.bulk_update(list({m.id: m for m in moved}.values()), ["waiver_priority"],
+                                         batch_size=_CHUNK)
+        ownership.rebuild(league_ids)
+
+        # Outcomes only take a handful of distinct (status, result) values,
+        # so one UPDATE per outcome beats a per-row CASE bulk_update
+        by_outcome: dict[tuple[str, str], list[int]] = {}
+        for claim in claims:
+            by_outcome.setdefault((claim.status, claim.result), []).append(claim.id)
+        for (claim_status, claim_result), ids in by_outcome.items():
+            for chunk in _chunks(ids):
+                WaiverClaim.objects.filter(id__in=chunk).update(
+                    status=claim_status, result=claim_result, processed_at=now,
+                )
+
+        league_cache.invalidate_leagues(league_ids)
+
+    result.claims += len(claims)
+    result.leagues += len(league_ids)
+
+
+def _in_waiver_order(queues: dict[int, dict[int, deque[WaiverClaim]]],
+                     members: dict[int, LeagueMember]) -> Iterable[WaiverClaim]:
+    """
+    Yield each league's claims in rolling waiver order. The order is read again
+    before every claim, so the caller moving a member to the back (by raising
+    their waiver_priority) takes effect for the next one.
+    """
+    for by_member in queues.values():
+        while by_member:
+            member_id = min(by_member, key=lambda mid: _waiver_key(members[mid]))
+            pending = by_member[member_id]
+            claim = pending.popleft()
+            if not pending:
+                del by_member[member_id]
+            yield claim
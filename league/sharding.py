@@ -0,0 +1,139 @@
+# league/sharding.py
+#
+# Horizontal sharding of the league app by league id. settings.LEAGUE_SHARDS
+# lists the database aliases; a league lives on LEAGUE_SHARDS[id % N] together
+# with every row that belongs to it (members, teams, draft, picks, events,
+# rosters, trades, waivers, lineups, email). Drafts in different leagues then
+# take different write locks and grow different tables.
+#
+# Queries don't carry a league id the router could read, so the shard is
+# chosen per request instead: ShardedViewMixin activates the shard of the
+# URL's league_id, and LeagueShardRouter sends league-app queries to the
+# active shard. Code outside a request uses use_league() or each_shard().
+#
+# Changing the shard count remaps ids, so existing leagues must be moved to
+# their new shard when it changes.
+# LeagueKey and JoinCode stay in "default". PlayerDraftStat is kept per shard, so a pick
+# never writes outside its shard; league/adp.py sums the shards on read.
+
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+from django.conf import settings
+from django.db import transaction
+
+GLOBAL_DB = "default"
+
+# league models that are not per league
+GLOBAL_MODELS = {"leaguekey", "joincode"}
+
+_current: ContextVar[str | None] = ContextVar("league_shard", default=None)
+
+
+def shard_aliases() -> list[str]:
+    return list(getattr(settings, "LEAGUE_SHARDS", [GLOBAL_DB]))
+
+
+def is_sharded() -> bool:
+    return len(shard_aliases()) > 1
+
+
+def shard_for(league_id: int) -> str:
+    aliases = shard_aliases()
+    return aliases[int(league_id) % len(aliases)]
+
+
+def current() -> str:
+    """The active shard; the default database when none is active."""
+    return _current.get() or GLOBAL_DB
+
+
+@contextmanager
+def use_shard(alias: str):
+    token = _current.set(alias)
+    try:
+        yield alias
+    finally:
+        _current.reset(token)
+
+
+def use_league(league_id: int):
+    return use_shard(shard_for(league_id))
+
+
+def each_shard() -> Iterator[str]:
+    """Activate each shard in turn, for work that spans every league."""
+    for alias in shard_aliases():
+        with use_shard(alias):
+            yield alias
+
+
+def atomic():
+    """transaction.atomic() on the active shard."""
+    return transaction.atomic(using=current())
+
+
+def on_commit(func: Callable[[], None]) -> None:
+    transaction.on_commit(func, using=current())
+
+
+def allocate_league_id() -> int:
+    """
+    Id for a new league: the next LeagueKey id, unique across shards. Also
+    used unsharded, so leagues keep their ids if shards are added later.
+    """
+    from .models import LeagueKey
+    return LeagueKey.objects.using(GLOBAL_DB).create().pk
+
+
+# ----------------------------
+# Routing
+# ----------------------------
+
+class ShardedViewMixin:
+    """APIView mixin: run the request against the shard of the URL's league_id."""
+
+    def dispatch(self, request, *args, **kwargs):
+        league_id = kwargs.get("league_id")
+        if league_id is None:
+            return super().dispatch(request, *args, **kwargs)
+        with use_league(league_id):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class LeagueShardRouter:
+    """
+    Sends league-app queries to the active shard (or, for related lookups, to
+    the database the instance came from). Other apps are left to later routers.
+    """
+
+    def _db(self, model, hints) -> str | None:
+        if model._meta.app_label != "league":
+            return None
+        if model._meta.model_name in GLOBAL_MODELS:
+            return GLOBAL_DB
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return current()
+
+    def db_for_read(self, model, **hints):
+        return self._db(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._db(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if "league" in (obj1._meta.app_label, obj2._meta.app_label):
+            return obj1._state.db == obj2._state.db
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == "league":
+            if model_name in GLOBAL_MODELS:
+                return db == GLOBAL_DB
+            return db in shard_aliases()
+        if db != GLOBAL_DB and db in shard_aliases():
+            return False
+        return None
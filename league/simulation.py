@@ -0,0 +1,235 @@
+# league/simulation.py
+#
+# In-memory mock drafts. Nothing here touches the database or Django settings,
+# so chunks of simulations can run in ProcessPoolExecutor workers.
+
+from __future__ import annotations
+import math
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable
+from .turns import advance_turn
+
+
+# ----------------------------
+# Bot strategies
+#
+# A strategy gets the pool values (sorted best first), the board of untaken
+# players, the bot's current roster (pool indexes) and an rng, and returns a
+# pool index.
+# ----------------------------
+
+class Board:
+    """Taken flags plus a cursor at the best untaken player, so top(n) rarely scans far."""
+    __slots__ = ("taken", "head")
+
+    def __init__(self, size: int):
+        self.taken = [False] * size
+        self.head = 0
+
+    def take(self, i: int) -> None:
+        self.taken[i] = True
+        while self.head < len(self.taken) and self.taken[self.head]:
+            self.head += 1
+
+    def top(self, n: int) -> list[int]:
+        found = []
+        taken = self.taken
+        for i in range(self.head, len(taken)):
+            if not taken[i]:
+                found.append(i)
+                if len(found) == n:
+                    break
+        return found
+
+
+Strategy = Callable[[list[float], Board, list[int], random.Random], int]
+
+STRATEGIES: dict[str, Strategy] = {}
+
+
+def strategy(name: str):
+    def register(fn: Strategy) -> Strategy:
+        STRATEGIES[name] = fn
+        return fn
+    return register
+
+
+@strategy("best_available")
+def best_available(values, board, roster, rng) -> int:
+    return board.head
+
+
+@strategy("random_top3")
+def random_top3(values, board, roster, rng) -> int:
+    return rng.choice(board.top(3))
+
+
+@strategy("value_noise")
+def value_noise(values, board, roster, rng) -> int:
+    # Rough model of a human drafter: ranks the next 8 by value with +/-15% noise
+    rand = rng.random
+    return max(board.top(8), key=lambda i: values[i] * (0.85 + 0.3 * rand()))
+
+
+# ----------------------------
+# Engine
+# ----------------------------
+
+@dataclass
+class SimDraft:
+    """Same turn fields as the Draft model, so advance_turn drives it."""
+    current_slot: int = 1
+    round: int = 1
+    pick_number: int = 1
+
+
+@dataclass
+class MockDraftResult:
+    simulations: int = 0
+    pick_sum: list[float] = field(default_factory=list)   # per pool index
+    pick_count: list[int] = field(default_factory=list)
+    strength_sum: list[float] = field(default_factory=list)  # per slot (index 0 unused)
+    strength_sumsq: list[float] = field(default_factory=list)
+
+    @classmethod
+    def empty(cls, pool_size: int, member_count: int) -> MockDraftResult:
+        return cls(0, [0.0] * pool_size, [0] * pool_size, [0.0] * (member_count + 1), [0.0] * (member_count + 1))
+
+    def merge(self, other: MockDraftResult) -> None:
+        self.simulations += other.simulations
+        for attr in ("pick_sum", "pick_count", "strength_sum", "strength_sumsq"):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            for i, v in enumerate(theirs):
+                mine[i] += v
+
+
+def simulate_chunk(values: list[float], strategies: dict[int, str], member_count: int,
+                   rounds: int, simulations: int, seed: int) -> MockDraftResult:
+    """
+    Run `simulations` drafts back to back. `values` is the pool sorted best first;
+    `strategies` maps slot -> strategy name.
+    """
+    rng = random.Random(seed)
+    result = MockDraftResult.empty(len(values), member_count)
+    bots = {slot: STRATEGIES[name] for slot, name in strategies.items()}
+    total_picks = min(rounds * member_count, len(values))
+
+    for _ in range(simulations):
+        board = Board(len(values))
+        rosters: dict[int, list[int]] = {slot: [] for slot in range(1, member_count + 1)}
+        draft = SimDraft()
+
+        while draft.pick_number <= total_picks:
+            slot = draft.current_slot
+            choice = bots[slot](values, board, rosters[slot], rng)
+            board.take(choice)
+            rosters[slot].append(choice)
+            result.pick_sum[choice] += draft.pick_number
+            result.pick_count[choice] += 1
+            advance_turn(draft, member_count)
+
+        for slot, roster in rosters.items():
+            strength = sum(values[i] for i in roster)
+            result.strength_sum[slot] += strength
+            result.strength_sumsq[slot] += strength * strength
+        result.simulations += 1
+
+    return result
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def shared_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    One process pool per process, started on first use and reused by every request,
+    so a mock draft doesn't pay for spawning workers. Replaced if the worker count
+    changes; see discard_pool() for a pool broken by a dead worker.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool, _pool_workers = ProcessPoolExecutor(max_workers=workers), workers
+        return _pool
+
+
+def discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop `pool` (a worker died, so it raises BrokenProcessPool for good); the next shared_pool() starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def run_mock_drafts(values: list[float], strategies: dict[int, str], member_count: int, rounds: int,
+                    simulations: int, seed: int = 0, workers: int | None = None,
+                    chunk_size: int = 250) -> MockDraftResult:
+    """
+    Split the simulations into chunks and run them across the shared process pool.
+    Chunk i always uses seed + i, so results depend only on the seed, not on `workers`.
+    """
+    unknown = set(strategies.values()) - STRATEGIES.keys()
+    if unknown:
+        raise ValueError(f"Unknown strategies: {', '.join(sorted(unknown))}")
+
+    chunks = [min(chunk_size, simulations - start) for start in range(0, simulations, chunk_size)]
+    args = [(values, strategies, member_count, rounds, n, seed + i) for i, n in enumerate(chunks)]
+
+    total = MockDraftResult.empty(len(values), member_count)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) == 1:
+        for a in args:
+            total.merge(simulate_chunk(*a))
+        return total
+
+    # A pool another request broke is replaced once; a second break is this request's own
+    for attempt in range(2):
+        pool = shared_pool(workers)
+        try:
+            parts = list(pool.map(simulate_chunk, *zip(*args)))
+        except BrokenProcessPool:
+            discard_pool(pool)
+            if attempt:
+                raise
+        else:
+            break
+    for part in parts:
+        total.merge(part)
+    return total
+
+
+def summarize(result: MockDraftResult, player_ids: list[int], strategies: dict[int, str],
+              top: int = 100) -> dict:
+    n = max(result.simulations, 1)
+    teams = []
+    for slot in sorted(strategies):
+        mean = result.strength_sum[slot] / n
+        variance = max(result.strength_sumsq[slot] / n - mean * mean, 0.0)
+        teams.append({
+            "slot": slot,
+            "strategy": strategies[slot],
+            "avg_strength": round(mean, 2),
+            "std_strength": round(math.sqrt(variance), 2),
+        })
+
+    players = [
+        {
+            "player_id": player_ids[i],
+            "adp": round(result.pick_sum[i] / result.pick_count[i], 2),
+            "draft_rate": round(result.pick_count[i] / n, 3),
+        }
+        for i in range(len(player_ids))
+        if result.pick_count[i]
+    ]
+    players.sort(key=lambda p: p["adp"])
+    return {"simulations": result.simulations, "teams": teams, "players": players[:top]}
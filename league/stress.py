@@ -0,0 +1,359 @@
+# league/stress.py
+#
+# Draft-room stress harness (`manage.py stress_draft`, and league/tests.py).
+#
+# Worker threads post picks, draft starts, resets and joins through the real
+# views, spread over a few leagues so some operations fight over one league's
+# Draft row and others run side by side. A seeded Scheduler decides which
+# workers go at each step: with overlap=1 exactly one operation runs at a
+# time, in an order that depends only on the seed, so a failing seed replays
+# exactly; with overlap=N the same seed admits the same N operations together
+# at every step and they race inside the database.
+#
+# check_league() verifies what the views promise whatever the interleaving:
+# pick numbers 1..n with none repeated or skipped, every pick made by the slot
+# whose turn it was, the Draft row pointing at the next turn, rosters and the
+# ownership bitmap matching the picks, and the league status matching the draft.
+
+from __future__ import annotations
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from django.db import OperationalError, connections
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory
+from players import static_index
+from .models import Draft, DraftPick, League, LeagueMember, RosterPlayer
+from . import ownership, sharding
+
+MEMBERS = 3
+MAX_PLAYERS = 4
+
+# Relative weights of each operation a worker draws
+OP_WEIGHTS = {"pick": 80, "start": 8, "reset": 4, "join": 8}
+
+# Share of picks posted by whoever the draft says is on the clock; the rest
+# come from a random member, as from a client with a stale board
+ON_CLOCK_SHARE = 0.75
+
+
+# ----------------------------
+# Scheduler
+# ----------------------------
+
+class Scheduler:
+    """
+    Admits workers in seeded batches. A batch is drawn only once every live
+    worker is waiting and the previous batch has finished, so the sequence of
+    batches depends on the seed alone, not on thread timing.
+    """
+
+    def __init__(self, seed: int, workers: int, overlap: int = 1):
+        self.rng = random.Random(seed)
+        self.overlap = max(1, overlap)
+        self.steps: list[tuple[int, ...]] = []
+        self._live = set(range(workers))
+        self._waiting: set[int] = set()
+        self._admitted: dict[int, int] = {}
+        self._running = 0
+        self._cond = threading.Condition()
+
+    def enter(self, worker: int) -> int:
+        """Block until the worker is admitted; returns the step number."""
+        with self._cond:
+            self._waiting.add(worker)
+            self._maybe_admit()
+            self._cond.wait_for(lambda: worker in self._admitted)
+            return self._admitted.pop(worker)
+
+    def leave(self, worker: int) -> None:
+        with self._cond:
+            self._running -= 1
+            self._maybe_admit()
+
+    def retire(self, worker: int) -> None:
+        """The worker has no operations left."""
+        with self._cond:
+            self._live.discard(worker)
+            self._maybe_admit()
+
+    def _maybe_admit(self) -> None:
+        if self._running or not self._waiting or self._waiting != self._live:
+            return
+        batch = tuple(self.rng.sample(sorted(self._waiting), min(self.overlap, len(self._waiting))))
+        step = len(self.steps)
+        self.steps.append(batch)
+        for worker in batch:
+            self._waiting.discard(worker)
+            self._admitted[worker] = step
+        self._running = len(batch)
+        self._cond.notify_all()
+
+
+# ----------------------------
+# Leagues
+# ----------------------------
+
+@dataclass
+class StressLeague:
+    id: int
+    join_code: str
+    commissioner: str
+    members: list[str]
+
+
+def create_leagues(count: int, prefix: str = "stress") -> list[StressLeague]:
+    """Leagues with MEMBERS of MAX_PLAYERS slots filled, so joins have room after a reset."""
+    leagues = []
+    for i in range(count):
+        emails = [f"{prefix}{i}-{slot}@test.com" for slot in range(1, MEMBERS + 1)]
+        response = _call("post", "/league/leagues/", {
+            "name": f"{prefix} {i}", "commissioner_email": emails[0], "invite_emails": emails[1:],
+            "max_players": MAX_PLAYERS,
+        })
+        leagues.append(StressLeague(response.data["id"], response.data["join_code"], emails[0], emails))
+    return leagues
+
+
+def delete_leagues(leagues: list[StressLeague]) -> None:
+    for league in leagues:
+        with sharding.use_league(league.id):
+            League.objects.filter(pk=league.id).delete()
+
+
+# ----------------------------
+# Running
+# ----------------------------
+
+_factory = APIRequestFactory()
+
+
+def _call(method: str, path: str, data: dict | None = None):
+    # Straight to the view, so exceptions surface in the calling thread
+    match = resolve(path)
+    request = getattr(_factory, method)(path, data or {}, format="json")
+    return match.func(request, *match.args, **match.kwargs)
+
+
+class _LockTimer:
+    """
+    execute_wrapper timing the statement that takes the draft lock: the
+    SELECT ... FOR UPDATE where the backend has one. SQLite has none and locks
+    the whole database for writing, at BEGIN IMMEDIATE (transaction_mode in
+    settings) or else at the transaction's first write.
+    """
+
+    def __init__(self):
+        self.wait: float | None = None
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.wait is not None:
+            return execute(sql, params, many, context)
+        if context["connection"].features.has_select_for_update:
+            locking = " FOR UPDATE" in sql
+        else:
+            locking = sql.lstrip().upper().startswith(("BEGIN IMMEDIATE", "BEGIN EXCLUSIVE", "INSERT", "UPDATE", "DELETE"))
+        if not locking:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.wait = time.perf_counter() - started
+
+
+@dataclass
+class StressResult:
+    seed: int
+    overlap: int
+    seconds: float = 0.0
+    outcomes: Counter = field(default_factory=Counter)  # "pick:200", "start:409", ...
+    latencies: list[float] = field(default_factory=list)
+    lock_waits: list[float] = field(default_factory=list)
+    lock_errors: int = 0
+    errors: list[str] = field(default_factory=list)
+    violations: list[str] = field(default_factory=list)
+    # (step, worker, league id, op, email, player id, status) in admission order
+    trace: list[tuple] = field(default_factory=list)
+
+    @property
+    def operations(self) -> int:
+        return sum(self.outcomes.values())
+
+
+def _player_pool(size: int) -> list[int]:
+    # Real ids, so picks land in the ownership bitmap
+    index = static_index.get()
+    return [index.player_id(row) for row in range(min(size, index.size))]
+
+
+def _on_clock(league: StressLeague) -> str | None:
+    with sharding.use_league(league.id):
+        slot = Draft.objects.filter(league_id=league.id).values_list("current_slot", flat=True).first()
+        if slot is None:
+            return None
+        return LeagueMember.objects.filter(league_id=league.id, slot=slot).values_list("email", flat=True).first()
+
+
+def _next_op(rng: random.Random, worker: int, n: int, leagues: list[StressLeague], pool: list[int]):
+    league = rng.choice(leagues)
+    kind = rng.choices(list(OP_WEIGHTS), weights=list(OP_WEIGHTS.values()))[0]
+    if kind == "pick":
+        on_clock = rng.random() < ON_CLOCK_SHARE
+        return league, kind, None if on_clock else rng.choice(league.members), rng.choice(pool)
+    if kind == "join":
+        return league, kind, f"w{worker}-{n}@stress.test", None
+    return league, kind, league.commissioner, None
+
+
+def _perform(league: StressLeague, kind: str, email: str | None, player_id: int | None):
+    if kind == "pick":
+        return _call("post", f"/league/leagues/{league.id}/pick/", {"email": email, "player_id": player_id})
+    if kind == "join":
+        return _call("post", f"/league/join/{league.join_code}/", {"email": email})
+    path = "start-draft" if kind == "start" else "reset"
+    return _call("post", f"/league/leagues/{league.id}/{path}/", {"starter_email": email})
+
+
+def run(leagues: list[StressLeague], *, seed: int, workers: int = 8, ops_per_worker: int = 50,
+        overlap: int = 1, players: int = 300, check_every_step: bool = False) -> StressResult:
+    """
+    Run the workers to completion against existing leagues, then check every
+    league. With check_every_step (meant for overlap=1) a league is checked
+    after each operation on it, so a violation names the step that caused it.
+    """
+    scheduler = Scheduler(seed, workers, overlap)
+    pool = _player_pool(players)
+    result = StressResult(seed=seed, overlap=overlap)
+    lock = threading.Lock()
+
+    def work(worker: int) -> None:
+        # One stream per worker, so its choices don't depend on which thread drew first
+        rng = random.Random(f"{seed}:{worker}")
+        try:
+            for n in range(ops_per_worker):
+                league, kind, email, player_id = _next_op(rng, worker, n, leagues, pool)
+                step = scheduler.enter(worker)
+                try:
+                    if kind == "pick" and email is None:
+                        email = _on_clock(league) or league.commissioner
+                    timer = _LockTimer()
+                    started = time.perf_counter()
+                    try:
+                        with connections[sharding.shard_for(league.id)].execute_wrapper(timer):
+                            code = _perform(league, kind, email, player_id).status_code
+                        error = None
+                    except Exception as e:
+                        # What the client would see as a 500
+                        code, error = 500, e
+                    elapsed = time.perf_counter() - started
+                    problems = check_league(league.id) if check_every_step else []
+                finally:
+                    scheduler.leave(worker)
+
+                with lock:
+                    result.outcomes[f"{kind}:{code}"] += 1
+                    result.latencies.append(elapsed)
+                    if timer.wait is not None:
+                        result.lock_waits.append(timer.wait)
+                    if isinstance(error, OperationalError) and "locked" in str(error):
+                        # SQLite's busy timeout ran out, or a deadlock between two deferred transactions
+                        result.lock_errors += 1
+                    elif error is not None:
+                        result.errors.append(f"step {step} worker {worker} {kind} league {league.id}: {error!r}")
+                    result.trace.append((step, worker, league.id, kind, email, player_id, code))
+                    result.violations += [f"after step {step} ({kind} by worker {worker}): {p}" for p in problems]
+        finally:
+            scheduler.retire(worker)
+            connections.close_all()
+
+    threads = [threading.Thread(target=work, args=(w,), name=f"stress-{w}") for w in range(workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    result.seconds = time.perf_counter() - started
+
+    result.trace.sort(key=lambda t: (t[0], t[1]))
+    for league in leagues:
+        result.violations += check_league(league.id)
+    return result
+
+
+# ----------------------------
+# Invariants
+# ----------------------------
+
+def check_league(league_id: int) -> list[str]:
+    """Everything wrong with the league's draft state; empty when consistent."""
+    with sharding.use_league(league_id):
+        league = League.objects.get(pk=league_id)
+        slots = dict(LeagueMember.objects.filter(league=league).values_list("id", "slot"))
+        draft = Draft.objects.filter(league=league).first()
+        picks = list(
+            DraftPick.objects.filter(draft=draft).order_by("pick_number")
+            .values_list("pick_number", "round", "slot", "member_id", "player_id")
+        ) if draft else []
+        drafted_rows = set(
+            RosterPlayer.objects.filter(league=league, source=RosterPlayer.Source.DRAFT)
+            .values_list("member_id", "player_id")
+        )
+        rostered = list(RosterPlayer.objects.filter(league=league).values_list("player_id", flat=True))
+        owned = ownership.owned_bits(league_id)
+
+    prefix = f"league {league_id}:"
+    problems = []
+    n = len(slots)
+    if sorted(slots.values()) != list(range(1, n + 1)):
+        problems.append(f"{prefix} member slots {sorted(slots.values())} are not 1..{n}")
+
+    numbers = [p[0] for p in picks]
+    repeated = sorted(k for k, c in Counter(numbers).items() if c > 1)
+    if repeated:
+        problems.append(f"{prefix} duplicate pick numbers {repeated}")
+    skipped = sorted(set(range(1, max(numbers, default=0) + 1)) - set(numbers))
+    if skipped:
+        problems.append(f"{prefix} skipped pick numbers {skipped}")
+    for number, rnd, slot, member_id, _ in picks:
+        expected = ((number - 1) % n + 1, (number - 1) // n + 1) if n else None
+        if (slot, rnd) != expected or slots.get(member_id) != slot:
+            problems.append(
+                f"{prefix} pick {number} went to slot {slot} (member in slot {slots.get(member_id)}) "
+                f"in round {rnd}; turn order says slot {expected[0] if expected else '?'}, "
+                f"round {expected[1] if expected else '?'}"
+            )
+            break
+
+    if draft is None:
+        if league.status != League.Status.SETUP:
+            problems.append(f"{prefix} status {league.status} with no draft")
+    else:
+        if league.status != League.Status.DRAFTING:
+            problems.append(f"{prefix} status {league.status} with a draft in progress")
+        made = len(picks)
+        expected = (made + 1, made % n + 1, made // n + 1) if n else None
+        if (draft.pick_number, draft.current_slot, draft.round) != expected:
+            problems.append(
+                f"{prefix} draft is at pick {draft.pick_number}, slot {draft.current_slot}, round {draft.round} "
+                f"after {made} picks"
+            )
+
+    if {(member_id, player_id) for *_, member_id, player_id in picks} != drafted_rows:
+        problems.append(f"{prefix} drafted roster rows don't match the picks")
+    if owned != ownership._bitset(rostered)[0]:
+        problems.append(f"{prefix} ownership bitmap doesn't match the rosters")
+    return problems
+
+
+# ----------------------------
+# Metrics
+# ----------------------------
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
@@ -0,0 +1,41 @@
+# league/tasks.py
+#
+# Background tasks for `manage.py run_jobs` (jobs/registry.py). Each wraps the
+# function its management command runs, so cron and the job queue do the same work.
+
+from __future__ import annotations
+from datetime import date
+from jobs.registry import task
+from players import warehouse
+from . import adp, ownership, sharding
+from .lineups import optimize_lineups as _optimize_lineups
+from .outbox import deliver_pending
+from .rosters import process_waivers as _process_waivers
+
+
+@task("league.send_outbox", max_attempts=5, retry_base_seconds=60, priority=10)
+def send_outbox(batch_size: int | None = None):
+    return deliver_pending(batch_size)
+
+
+@task("league.process_waivers", priority=5)
+def process_waivers():
+    return _process_waivers()
+
+
+@task("league.rebuild_adp", priority=-5)
+def rebuild_adp():
+    return {"players": sum(adp.rebuild() for _ in sharding.each_shard())}
+
+
+@task("league.rebuild_ownership", priority=-5)
+def rebuild_ownership():
+    return {"leagues": ownership.rebuild_all()}
+
+
+@task("league.optimize_lineups", lease_seconds=3600)
+def optimize_lineups(day: str | None = None, season: str | None = None):
+    return _optimize_lineups(
+        date.fromisoformat(day) if day else date.today(),
+        season=warehouse.parse_season(season),
+    )
@@ -1,3 +1,1188 @@
-from django.test import TestCase
+import importlib
+import itertools
+import os
+import random
+import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.db import IntegrityError, connections, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.test import APIClient
+
+from accounts.db_router import STICKY_COOKIE, replicate_sqlite
+from league.draft_log import reconstruct
+from league.models import (
+    Draft, DraftEvent, DraftPick, DraftSnapshot, EmailOutbox, FantasyTeam, League, LeagueMember, Lineup, OwnershipBitmap,
+    PlayerDraftStat, TradeItem, WaiverClaim,
+)
+from league.sharding import shard_for
+from league.outbox import deliver_pending
+from league.rosters import process_waivers
+from league import adp, cache as league_cache, joins, lineups, live, ownership, projections, simulation, stress, views
+from players import warehouse
+from players.models import PlayerGameLog, PlayerProfile, PlayerSeasonAggregate
+
+
+class CountingBackend(LocmemBackend):
+    """Locmem backend that counts opened connections and rejects @bounce.test recipients."""
+    opens = 0
+
+    def open(self):
+        type(self).opens += 1
+        return True
+
+    def send_messages(self, messages):
+        for m in messages:
+            if any(to.endswith("@bounce.test") for to in m.to):
+                raise ConnectionError(f"550 mailbox unavailable: {m.to[0]}")
+        return super().send_messages(messages)
+
+
+class UnreachableBackend(LocmemBackend):
+    def open(self):
+        raise ConnectionRefusedError("SMTP server unreachable")
+
+
+def opened_connections() -> int:
+    # The class settings.EMAIL_BACKEND resolves to, which may be a different
+    # module object from this one depending on how the test runner imported it
+    return import_string(settings.EMAIL_BACKEND).opens
+
+
+def create_league(client, invites):
+    return client.post("/league/leagues/", {
+        "name": "Outbox League",
+        "commissioner_email": "boss@test.com",
+        "invite_emails": invites,
+        "max_players": 4,
+    }, format="json")
+
+
+@override_settings(EMAIL_BACKEND="league.tests.CountingBackend", OUTBOX_MAX_ATTEMPTS=3, OUTBOX_RETRY_BASE_SECONDS=60)
+class EmailOutboxTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        import_string(settings.EMAIL_BACKEND).opens = 0
+
+    def test_league_creation_queues_invitations_without_sending(self):
+        res = create_league(self.client, ["a@test.com", "b@test.com", "c@test.com"])
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(opened_connections(), 0)
+        queued = EmailOutbox.objects.filter(kind=EmailOutbox.Kind.INVITE, status=EmailOutbox.Status.PENDING)
+        self.assertEqual(sorted(queued.values_list("to_email", flat=True)), ["a@test.com", "b@test.com", "c@test.com"])
+
+    def test_batch_is_sent_over_one_connection(self):
+        create_league(self.client, ["a@test.com", "b@test.com", "c@test.com"])
+
+        result = deliver_pending()
+
+        self.assertEqual((result.sent, result.retried, result.failed), (3, 0, 0))
+        self.assertEqual(opened_connections(), 1)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["a@test.com", "b@test.com", "c@test.com"])
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.Status.SENT).exists())
+
+        # Nothing is due any more, so a second run sends nothing
+        self.assertEqual(deliver_pending().claimed, 0)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_rejected_recipient_is_retried_with_backoff_then_failed(self):
+        create_league(self.client, ["a@test.com", "x@bounce.test"])
+
+        result = deliver_pending()
+        self.assertEqual((result.sent, result.retried), (1, 1))
+        bounced = EmailOutbox.objects.get(to_email="x@bounce.test")
+        self.assertEqual(bounced.status, EmailOutbox.Status.PENDING)
+        self.assertEqual(bounced.attempts, 1)
+        self.assertIn("550", bounced.last_error)
+        self.assertGreater(bounced.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+        # Not due yet
+        self.assertEqual(deliver_pending().claimed, 0)
+
+        for expected_status in (EmailOutbox.Status.PENDING, EmailOutbox.Status.FAILED):
+            EmailOutbox.objects.filter(pk=bounced.pk).update(next_attempt_at=timezone.now())
+            deliver_pending()
+            bounced.refresh_from_db()
+            self.assertEqual(bounced.status, expected_status)
+
+        self.assertEqual(bounced.attempts, 3)
+        self.assertEqual([m.to[0] for m in mail.outbox], ["a@test.com"])
+
+    @override_settings(EMAIL_BACKEND="league.tests.UnreachableBackend")
+    def test_unreachable_server_reschedules_whole_batch(self):
+        create_league(self.client, ["a@test.com", "b@test.com"])
+
+        result = deliver_pending()
+
+        self.assertEqual((result.claimed, result.sent, result.retried), (2, 0, 2))
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.Status.PENDING).exists())
+        self.assertTrue(all("unreachable" in e for e in EmailOutbox.objects.values_list("last_error", flat=True)))
+
+    def test_draft_turn_notifications(self):
+        league_id = create_league(self.client, ["a@test.com"]).data["id"]
+        self.client.post(f"/league/leagues/{league_id}/start-draft/", {}, format="json")
+        self.client.post(f"/league/leagues/{league_id}/pick/", {"email": "boss@test.com", "player_id": 2544}, format="json")
+
+        turns = EmailOutbox.objects.filter(kind=EmailOutbox.Kind.DRAFT_TURN).order_by("id")
+        self.assertEqual(list(turns.values_list("to_email", flat=True)), ["boss@test.com", "a@test.com"])
+
+        deliver_pending()
+        self.assertEqual(opened_connections(), 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+
+DUMMY_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+@override_settings(
+    DATABASE_ROUTERS=["accounts.db_router.PrimaryReplicaRouter"],
+    CACHES=DUMMY_CACHE,
+    REPLICA_STICKY_SECONDS=5,
+)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    The replica is a second SQLite file that only changes when replicate_sqlite()
+    copies the primary into it, so anything written since is "lagging".
+    """
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.commissioner = APIClient()
+        self.member = APIClient()
+        self.spectator = APIClient()
+
+    def _pick_number(self, client, league_id):
+        return client.get(f"/league/leagues/{league_id}/?fields=draft").data["draft"]["pick_number"]
+
+    def test_reads_use_replica_and_writes_use_primary(self):
+        res = create_league(self.commissioner, ["a@test.com"])
+        self.assertEqual(res.status_code, 201)
+        league_id = res.data["id"]
+
+        # Only on the primary so far
+        self.assertEqual(self.spectator.get(f"/league/leagues/{league_id}/").status_code, 404)
+        self.assertFalse(League.objects.using("replica").filter(pk=league_id).exists())
+        self.assertTrue(League.objects.using("default").filter(pk=league_id).exists())
+
+        # A write request reads from the primary too, so it can start a draft the replica hasn't seen
+        res = self.commissioner.post(f"/league/leagues/{league_id}/start-draft/", {}, format="json")
+        self.assertEqual(res.status_code, 200)
+
+        replicate_sqlite()
+        self.assertEqual(self.spectator.get(f"/league/leagues/{league_id}/").data["draft"]["status"], "IN_PROGRESS")
+
+    def test_member_reads_own_pick_while_replica_lags(self):
+        league_id = create_league(self.commissioner, ["a@test.com"]).data["id"]
+        self.commissioner.post(f"/league/leagues/{league_id}/start-draft/", {}, format="json")
+        replicate_sqlite()
+        self.assertEqual(self._pick_number(self.spectator, league_id), 1)
+
+        res = self.member.post(f"/league/leagues/{league_id}/pick/", {"email": "boss@test.com", "player_id": 2544},
+                               format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(STICKY_COOKIE, res.cookies)
+
+        # The picker reads from the primary; everyone else still sees the replica
+        self.assertEqual(self._pick_number(self.member, league_id), 2)
+        self.assertEqual(self._pick_number(self.spectator, league_id), 1)
+
+        # Stickiness ends with the cookie
+        self.member.cookies[STICKY_COOKIE] = "0"
+        self.assertEqual(self._pick_number(self.member, league_id), 1)
+
+        replicate_sqlite()
+        self.assertEqual(self._pick_number(self.spectator, league_id), 2)
+
+    def test_failed_write_does_not_pin_client(self):
+        league_id = create_league(self.commissioner, ["a@test.com"]).data["id"]
+        res = self.member.post(f"/league/leagues/{league_id}/pick/", {"email": "boss@test.com", "player_id": 2544},
+                               format="json")
+        self.assertEqual(res.status_code, 400)  # draft not started
+        self.assertNotIn(STICKY_COOKIE, res.cookies)
+
+
+@override_settings(
+    DATABASE_ROUTERS=["accounts.db_router.PrimaryReplicaRouter"],
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "replica-cache"}},
+    REPLICA_STICKY_SECONDS=5,
+)
+class ReplicaCacheTests(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def test_replica_payloads_do_not_reach_sticky_readers(self):
+        commissioner, member, spectator = APIClient(), APIClient(), APIClient()
+        league_id = create_league(commissioner, ["a@test.com"]).data["id"]
+        commissioner.post(f"/league/leagues/{league_id}/start-draft/", {}, format="json")
+        replicate_sqlite()
+
+        member.post(f"/league/leagues/{league_id}/pick/", {"email": "boss@test.com", "player_id": 2544}, format="json")
+        # The replica has caught up on the league row (and its cache version) but not on the draft yet
+        version = League.objects.using("default").get(pk=league_id).cache_version
+        League.objects.using("replica").filter(pk=league_id).update(cache_version=version)
+
+        def pick_number(client):
+            return client.get(f"/league/leagues/{league_id}/?fields=draft").data["draft"]["pick_number"]
+
+        self.assertEqual(pick_number(spectator), 1)
+        self.assertEqual(pick_number(member), 2)
+        self.assertEqual(pick_number(spectator), 1)  # served from the replica's entry
+
+        replicate_sqlite()
+        member.post(f"/league/leagues/{league_id}/pick/", {"email": "a@test.com", "player_id": 201939}, format="json")
+        replicate_sqlite()
+        self.assertEqual(pick_number(spectator), 3)
+
+
+SHARDS = ["default", "league_shard_1", "league_shard_2"]
+
+
+@override_settings(
+    LEAGUE_SHARDS=SHARDS,
+    DATABASE_ROUTERS=["league.sharding.LeagueShardRouter"],
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class LeagueShardingTests(TransactionTestCase):
+    """Three SQLite files; a league and all of its rows live on LEAGUE_SHARDS[id % 3]."""
+    databases = set(SHARDS)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.league_ids = [create_league(self.client, [f"m{i}@test.com"]).data["id"] for i in range(6)]
+
+    def test_leagues_are_spread_over_shards_with_global_ids(self):
+        self.assertEqual(len(set(self.league_ids)), 6)
+        for alias in SHARDS:
+            stored = set(League.objects.using(alias).values_list("id", flat=True))
+            self.assertEqual(stored, {i for i in self.league_ids if shard_for(i) == alias})
+            self.assertEqual(len(stored), 2)
+            # Members live with their league
+            self.assertEqual(
+                set(LeagueMember.objects.using(alias).values_list("league_id", flat=True)), stored,
+            )
+
+    def test_views_resolve_the_leagues_shard(self):
+        for league_id in self.league_ids[:3]:
+            self.client.post(f"/league/leagues/{league_id}/start-draft/", {}, format="json")
+            res = self.client.post(f"/league/leagues/{league_id}/pick/", {"email": "boss@test.com", "player_id": 2544},
+                                   format="json")
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.data["draft"]["current_turn"]["email"], self.client.get(
+                f"/league/leagues/{league_id}/").data["members"][1]["email"])
+
+            teams = self.client.get(f"/league/leagues/{league_id}/teams/").data
+            self.assertIn(2544, [p for t in teams["teams"] for p in t["player_ids"]])
+            self.assertEqual(DraftPick.objects.using(shard_for(league_id)).filter(draft__league_id=league_id).count(), 1)
+
+        self.assertEqual(self.client.get("/league/leagues/999999/").status_code, 404)
+
+    def test_listing_merges_every_shard_newest_first(self):
+        res = self.client.get("/league/leagues/?fields=name")
+        self.assertEqual([l["id"] for l in res.data], sorted(self.league_ids, reverse=True))
+
+    def test_adp_is_summed_across_shards(self):
+        first, second = self.league_ids[:2]
+        self.assertNotEqual(shard_for(first), shard_for(second))
+        for league_id in (first, second):
+            self.client.post(f"/league/leagues/{league_id}/start-draft/", {}, format="json")
+        self.client.post(f"/league/leagues/{first}/pick/", {"email": "boss@test.com", "player_id": 2544}, format="json")
+        self.client.post(f"/league/leagues/{second}/pick/", {"email": "boss@test.com", "player_id": 201939},
+                         format="json")
+        self.client.post(f"/league/leagues/{second}/pick/", {"email": "m1@test.com", "player_id": 2544}, format="json")
+
+        res = self.client.get("/league/adp/").data
+        self.assertEqual(res["total_drafts"], 2)
+        by_player = {p["player_id"]: p for p in res["players"]}
+        self.assertEqual(by_player[2544]["times_drafted"], 2)
+        self.assertEqual(by_player[2544]["adp"], 1.5)
+        self.assertEqual([p["player_id"] for p in res["players"]], [201939, 2544])  # ADP 1.0, then 1.5
+
+        board = self.client.get(f"/league/leagues/{first}/draft-board/").data
+        self.assertEqual([p["player_id"] for p in board["players"]], [201939])
+
+    def test_adp_pages_match_a_full_merge(self):
+        # Player 1 is never near the top of a single shard but leads once summed
+        rng = random.Random(5)
+        for alias in SHARDS:
+            rows = {1: (4, 40)}
+            rows.update({pid: (rng.randint(1, 3), rng.randint(1, 60)) for pid in rng.sample(range(2, 120), 60)})
+            rows[1000 + SHARDS.index(alias)] = (10, 10)
+            PlayerDraftStat.objects.using(alias).bulk_create([
+                PlayerDraftStat(player_id=pid, times_drafted=n, pick_sum=n * pick, round_sum=n, adp=pick)
+                for pid, (n, pick) in rows.items()
+            ])
+
+        self.assertEqual(adp.ranked("ownership", limit=1)[0].player_id, 1)
+        for sort in adp.SORTS:
+            full = [(s.player_id, s.times_drafted, s.adp) for s in adp.ranked(sort)]
+            for offset, limit in [(0, 1), (0, 10), (7, 25), (150, 50)]:
+                page = adp.ranked(sort, offset=offset, limit=limit, exclude=[2, 3])
+                expected = [row for row in full if row[0] not in (2, 3)][offset:offset + limit]
+                self.assertEqual([(s.player_id, s.times_drafted, s.adp) for s in page], expected, (sort, offset))
+
+    def test_outbox_is_delivered_from_every_shard(self):
+        self.assertEqual(deliver_pending().sent, 6)
+        self.assertEqual(len(mail.outbox), 6)
+
+
+class JoinCodeTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        res = create_league(self.client, ["a@test.com"])
+        self.league_id, self.code = res.data["id"], res.data["join_code"]
+
+    def join(self, email, code=None):
+        return self.client.post(f"/league/join/{code or self.code}/", {"email": email}, format="json")
+
+    def test_join_fills_the_next_slots_until_full(self):
+        self.assertEqual(self.client.get(f"/league/join/{self.code}/").data["open_slots"], 2)
+
+        res = self.join("c@test.com")
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data["member"]["slot"], 3)
+        self.assertTrue(FantasyTeam.objects.filter(member_id=res.data["member"]["id"]).exists())
+
+        # Joining again returns the existing membership
+        again = self.join("C@test.com ")
+        self.assertEqual((again.status_code, again.data["member"]["id"]), (200, res.data["member"]["id"]))
+
+        self.assertEqual(self.join("d@test.com", code=self.code.lower()).data["member"]["slot"], 4)
+        self.assertEqual(self.join("e@test.com").status_code, 409)
+        self.assertEqual(self.client.get(f"/league/join/{self.code}/").data["open_slots"], 0)
+        self.assertEqual(
+            [m["slot"] for m in self.client.get(f"/league/leagues/{self.league_id}/").data["members"]], [1, 2, 3, 4],
+        )
+
+    def test_no_joining_once_the_draft_started(self):
+        self.client.post(f"/league/leagues/{self.league_id}/start-draft/", {}, format="json")
+        res = self.join("c@test.com")
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(res.data["error"], "Draft has already started")
+
+    def test_code_lookup(self):
+        url = f"/league/leagues/{self.league_id}/join-code/"
+        self.assertEqual(self.client.get(url, {"starter_email": "boss@test.com"}).data["join_code"], self.code)
+        self.assertEqual(self.client.get(url, {"starter_email": "a@test.com"}).status_code, 403)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, {"starter_email": " "}).status_code, 403)
+        self.assertEqual(self.join("c@test.com", code="NOSUCHCD").status_code, 404)
+
+    def test_losing_every_retry_is_a_conflict(self):
+        with mock.patch("league.joins._insert_next_slot", side_effect=IntegrityError("UNIQUE constraint failed")):
+            res = self.join("c@test.com")
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(res.data["error"], "Too many people are joining right now; try again")
+
+    def test_draft_started_after_the_league_was_loaded(self):
+        real_join = joins.join_league
+
+        def start_then_join(league, *args):
+            League.objects.filter(pk=league.pk).update(status=League.Status.DRAFTING)
+            return real_join(league, *args)
+
+        with mock.patch("league.joins.join_league", side_effect=start_then_join):
+            res = self.join("c@test.com")
+        self.assertEqual((res.status_code, res.data["error"]), (409, "Draft has already started"))
+
+
+@override_settings(
+    # Every league on the file-backed league_shard_1, so each thread gets its own connection
+    LEAGUE_SHARDS=["league_shard_1"],
+    DATABASE_ROUTERS=["league.sharding.LeagueShardRouter"],
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class ConcurrentJoinTests(TransactionTestCase):
+    """Bursts of simultaneous joins never give two members the same slot or overfill a league."""
+    databases = {"default", "league_shard_1"}
+
+    LEAGUES = 3
+    JOINERS = 8
+
+    def test_concurrent_joins_get_distinct_slots(self):
+        client = APIClient()
+        leagues = [create_league(client, []).data for _ in range(self.LEAGUES)]
+
+        start = threading.Barrier(self.LEAGUES * self.JOINERS)
+        results: list[tuple[int, int]] = []
+        errors: list[BaseException] = []
+
+        def join(league, i):
+            try:
+                start.wait()
+                res = APIClient().post(f"/league/join/{league['join_code']}/", {"email": f"j{i}@test.com"},
+                                       format="json")
+                results.append((league["id"], res.status_code))
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=join, args=(league, i)) for league in leagues for i in range(self.JOINERS)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        for league in leagues:
+            statuses = Counter(code for league_id, code in results if league_id == league["id"])
+            self.assertEqual(statuses, {201: 3, 409: self.JOINERS - 3})
+            members = LeagueMember.objects.using("league_shard_1").filter(league_id=league["id"])
+            self.assertEqual(sorted(members.values_list("slot", flat=True)), [1, 2, 3, 4])
+            self.assertEqual(FantasyTeam.objects.using("league_shard_1").filter(league_id=league["id"]).count(), 4)
+
+
+class OwnershipIndexTests(TestCase):
+    LEBRON, CURRY, DURANT = 2544, 201939, 201142
+
+    def setUp(self):
+        self.client = APIClient()
+        self.league_id = create_league(self.client, ["a@test.com"]).data["id"]
+        self.other_id = create_league(self.client, ["a@test.com"]).data["id"]
+        for league_id in (self.league_id, self.other_id):
+            self.client.post(f"/league/leagues/{league_id}/start-draft/", {}, format="json")
+
+    def pick(self, league_id, email, player_id):
+        res = self.client.post(f"/league/leagues/{league_id}/pick/", {"email": email, "player_id": player_id},
+                               format="json")
+        self.assertEqual(res.status_code, 200)
+
+    def available(self, league_id, *player_ids):
+        res = self.client.get(f"/league/leagues/{league_id}/availability/",
+                              {"player_ids": ",".join(map(str, player_ids))})
+        return {p["player_id"]: p["available"] for p in res.data["players"]}
+
+    def test_pick_undo_and_reset_update_the_bitmap(self):
+        self.pick(self.league_id, "boss@test.com", self.LEBRON)
+        self.pick(self.league_id, "a@test.com", self.CURRY)
+        self.assertTrue(OwnershipBitmap.objects.filter(league_id=self.league_id).exists())
+        self.assertEqual(self.available(self.league_id, self.LEBRON, self.CURRY, self.DURANT),
+                         {self.LEBRON: False, self.CURRY: False, self.DURANT: True})
+        # Other leagues are unaffected
+        self.assertEqual(self.available(self.other_id, self.LEBRON), {self.LEBRON: True})
+
+        self.client.post(f"/league/leagues/{self.league_id}/undo-pick/", {}, format="json")
+        self.assertEqual(self.available(self.league_id, self.LEBRON, self.CURRY), {self.LEBRON: False, self.CURRY: True})
+
+        self.client.post(f"/league/leagues/{self.league_id}/reset/", {}, format="json")
+        self.assertEqual(self.available(self.league_id, self.LEBRON), {self.LEBRON: True})
+
+    def test_free_agent_search_skips_owned_players(self):
+        url = f"/league/leagues/{self.league_id}/free-agents/"
+        self.assertIn(self.CURRY, [p["id"] for p in self.client.get(url, {"q": "stephen curry"}).data["players"]])
+
+        self.pick(self.league_id, "boss@test.com", self.CURRY)
+        self.assertNotIn(self.CURRY, [p["id"] for p in self.client.get(url, {"q": "stephen curry"}).data["players"]])
+
+    def test_leagues_owning_a_player(self):
+        self.pick(self.league_id, "boss@test.com", self.LEBRON)
+        self.pick(self.other_id, "boss@test.com", self.LEBRON)
+        # One indexed RosterPlayer lookup, whatever the bitmaps hold
+        OwnershipBitmap.objects.filter(league_id=self.other_id).delete()
+        with self.assertNumQueries(1):
+            self.assertEqual(ownership.leagues_owning(self.LEBRON), sorted([self.league_id, self.other_id]))
+
+        res = self.client.get(f"/league/players/{self.LEBRON}/leagues/")
+        self.assertEqual(res.data["league_ids"], sorted([self.league_id, self.other_id]))
+        self.assertEqual(self.client.get(f"/league/players/{self.DURANT}/leagues/").data["league_ids"], [])
+
+    def test_waivers_update_the_bitmap(self):
+        self.pick(self.league_id, "boss@test.com", self.LEBRON)
+        member = LeagueMember.objects.get(league_id=self.league_id, email="boss@test.com")
+        WaiverClaim.objects.create(league_id=self.league_id, member=member, add_player_id=self.DURANT, priority=1,
+                                   drop_player_id=self.LEBRON)
+
+        process_waivers()
+
+        self.assertEqual(self.available(self.league_id, self.LEBRON, self.DURANT),
+                         {self.LEBRON: True, self.DURANT: False})
+
+
+@override_settings(
+    LEAGUE_SHARDS=["league_shard_1"],
+    DATABASE_ROUTERS=["league.sharding.LeagueShardRouter"],
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class DraftStressTests(TransactionTestCase):
+    """The stress harness: seeded schedules replay, and contention never breaks the draft invariants."""
+    databases = {"default", "league_shard_1"}
+
+    def run_stress(self, **kwargs):
+        leagues = stress.create_leagues(2)
+        result = stress.run(leagues, seed=11, workers=4, ops_per_worker=15, **kwargs)
+        # League ids differ between runs; compare positions
+        position = {league.id: i for i, league in enumerate(leagues)}
+        return result, [(t[0], t[1], position[t[2]], *t[3:]) for t in result.trace]
+
+    def test_serial_schedule_replays_exactly(self):
+        first, first_trace = self.run_stress(overlap=1, check_every_step=True)
+        second, second_trace = self.run_stress(overlap=1, check_every_step=True)
+
+        self.assertEqual(first.violations + first.errors, [])
+        self.assertEqual(first_trace, second_trace)
+        self.assertGreater(first.outcomes["pick:200"], 0)
+
+    def test_concurrent_operations_keep_invariants(self):
+        result, _ = self.run_stress(overlap=4)
+
+        self.assertEqual(result.violations, [])
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.lock_errors, 0)
+        self.assertEqual(result.operations, 4 * 15)
+
+    def test_checker_reports_a_skipped_pick(self):
+        league = stress.create_leagues(1)[0]
+        client = APIClient()
+        client.post(f"/league/leagues/{league.id}/start-draft/", {}, format="json")
+        for email, player_id in zip(league.members, (2544, 201939, 201142)):
+            client.post(f"/league/leagues/{league.id}/pick/", {"email": email, "player_id": player_id}, format="json")
+        self.assertEqual(stress.check_league(league.id), [])
+
+        DraftPick.objects.using("league_shard_1").filter(draft__league_id=league.id, pick_number=2).delete()
+        self.assertIn(f"league {league.id}: skipped pick numbers [2]", stress.check_league(league.id))
+
+
+class DraftLogTests(TestCase):
+    """The event log replays to exactly the live draft, with and without snapshots in between."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.league_id = create_league(self.client, ["a@test.com", "b@test.com"]).data["id"]
+        self.league = League.objects.get(pk=self.league_id)
+        self.history = []
+
+    def post(self, path, data=None):
+        res = self.client.post(f"/league/leagues/{self.league_id}/{path}/", data or {}, format="json")
+        self.assertEqual(res.status_code, 200, res.data)
+        self.history.append((reconstruct(self.league).seq, self.live_state()))
+
+    def live_state(self):
+        draft = Draft.objects.filter(league=self.league).first()
+        if draft is None:
+            return (Draft.Status.NOT_STARTED, 1, 1, 1, [])
+        picks = [list(p) for p in draft.picks.order_by("pick_number")
+                 .values_list("pick_number", "round", "slot", "member_id", "player_id")]
+        return (draft.status, draft.current_slot, draft.round, draft.pick_number, picks)
+
+    def drive(self):
+        self.post("start-draft")
+        emails = ["boss@test.com", "a@test.com", "b@test.com"]
+        for i, player_id in enumerate([2544, 201939, 201142, 203999, 1629029]):
+            self.post("pick", {"email": emails[i % 3], "player_id": player_id})
+        self.post("undo-pick")
+        self.post("pick", {"email": "a@test.com", "player_id": 203507})
+        self.post("undo-pick")
+        self.post("reset")
+        self.post("start-draft")
+        self.post("pick", {"email": "boss@test.com", "player_id": 2544})
+
+    def assert_replays(self):
+        for seq, live in self.history:
+            s = reconstruct(self.league, seq=seq)
+            self.assertEqual((s.status, s.current_slot, s.round, s.pick_number, s.picks), live, f"seq {seq}")
+
+    def test_replay_without_snapshots(self):
+        self.drive()
+        self.assertEqual(DraftSnapshot.objects.filter(league=self.league).count(), 0)
+        self.assert_replays()
+
+    @override_settings(DRAFT_SNAPSHOT_INTERVAL=4)
+    def test_replay_across_snapshots(self):
+        self.drive()
+        seqs = list(DraftEvent.objects.filter(league=self.league).order_by("seq").values_list("seq", flat=True))
+        self.assertEqual(seqs, list(range(1, 13)))
+        self.assertEqual(list(DraftSnapshot.objects.filter(league=self.league).values_list("seq", flat=True)),
+                         [4, 8, 12])
+        self.assert_replays()
+
+    def test_undo_refused_after_the_player_was_traded(self):
+        self.post("start-draft")
+        self.post("pick", {"email": "boss@test.com", "player_id": 2544})
+        self.post("pick", {"email": "a@test.com", "player_id": 201939})
+        trade = self.client.post(f"/league/leagues/{self.league_id}/trades/", {
+            "email": "a@test.com", "to_email": "boss@test.com",
+            "give_player_ids": [201939], "receive_player_ids": [2544],
+        }, format="json").data
+        self.client.post(f"/league/leagues/{self.league_id}/trades/{trade['id']}/respond/",
+                         {"email": "boss@test.com", "action": "accept"}, format="json")
+
+        res = self.client.post(f"/league/leagues/{self.league_id}/undo-pick/", {}, format="json")
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(DraftPick.objects.filter(draft__league=self.league).count(), 2)
+
+
+class LeagueCacheTests(TestCase):
+    """Cached league payloads are keyed by League.cache_version, which every write bumps in its transaction."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.league_id = create_league(self.client, ["a@test.com"]).data["id"]
+
+    def test_writes_invalidate_cached_payloads(self):
+        url = f"/league/leagues/{self.league_id}/"
+        self.assertEqual(self.client.get(url).data["status"], "SETUP")
+        with self.assertNumQueries(1):
+            # Only the version lookup; the payload comes from the cache
+            self.client.get(url)
+
+        self.client.post(f"/league/leagues/{self.league_id}/start-draft/", {}, format="json")
+        self.assertEqual(self.client.get(url).data["status"], "DRAFTING")
+        self.client.post(f"/league/leagues/{self.league_id}/pick/", {"email": "boss@test.com", "player_id": 2544},
+                         format="json")
+        teams = self.client.get(f"/league/leagues/{self.league_id}/teams/").data["teams"]
+        self.assertEqual(teams[0]["player_ids"], [2544])
+
+    def test_every_invalidation_counts(self):
+        before = league_cache.league_version(self.league_id)
+        league_cache.invalidate_league(self.league_id)
+        league_cache.invalidate_leagues([self.league_id, self.league_id])
+        self.assertEqual(league_cache.league_version(self.league_id), before + 2)
+
+    def test_rolled_back_write_keeps_the_version(self):
+        before = league_cache.league_version(self.league_id)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            league_cache.invalidate_league(self.league_id)
+            raise RuntimeError
+        self.assertEqual(league_cache.league_version(self.league_id), before)
+
+
+class LeagueFieldsTests(TestCase):
+    """?fields= trims the league payload and its queries; ?compact=1 drops nulls and sends member keys once."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.league_id = create_league(self.client, ["a@test.com"]).data["id"]
+
+    def test_list_returns_only_requested_fields(self):
+        with self.assertNumQueries(1):
+            res = self.client.get("/league/leagues/?fields=name,status")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data, [{"id": self.league_id, "name": "Outbox League", "status": "SETUP"}])
+
+        with self.assertNumQueries(2):
+            # All fields: the league rows plus the member prefetch
+            res = self.client.get("/league/leagues/")
+        self.assertEqual(tuple(res.data[0]), views.LEAGUE_FIELDS)
+
+    def test_unknown_field_is_rejected(self):
+        for url in ("/league/leagues/?fields=name,password", f"/league/leagues/{self.league_id}/?fields=password"):
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, 400)
+            self.assertIn("Unknown fields: password", res.data["error"])
+
+    def test_detail_fields(self):
+        res = self.client.get(f"/league/leagues/{self.league_id}/?fields=max_players,draft")
+        self.assertEqual(res.data, {"id": self.league_id, "max_players": 4, "draft": None})
+
+        self.client.post(f"/league/leagues/{self.league_id}/start-draft/", {}, format="json")
+        draft = self.client.get(f"/league/leagues/{self.league_id}/?fields=draft").data["draft"]
+        self.assertEqual(draft["status"], "IN_PROGRESS")
+        self.assertEqual(draft["current_turn"], {"slot": 1, "email": "boss@test.com"})
+
+    def test_compact_layout(self):
+        full = self.client.get(f"/league/leagues/{self.league_id}/").data
+        res = self.client.get(f"/league/leagues/{self.league_id}/?fields=members,draft&compact=1")
+        self.assertEqual(res.status_code, 200)
+        # The draft has not been created yet, so the null key is dropped
+        self.assertEqual(set(res.data), {"id", "members"})
+        members = res.data["members"]
+        self.assertEqual(members["columns"], list(full["members"][0]))
+        self.assertEqual(members["rows"], [list(m.values()) for m in full["members"]])
+
+        rows = self.client.get("/league/leagues/?fields=name&compact=true").data
+        self.assertEqual(rows, {"columns": ["id", "name"], "rows": [[self.league_id, "Outbox League"]]})
+        self.assertEqual(self.client.get("/league/leagues/?fields=name&compact=0").data,
+                         [{"id": self.league_id, "name": "Outbox League"}])
+
+
+class AdpTests(TestCase):
+    """PlayerDraftStat is kept current pick by pick; it must always equal a rebuild from DraftPick."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.leagues = [create_league(self.client, ["a@test.com", "b@test.com"]).data["id"] for _ in range(2)]
+
+    def post(self, league_id, path, data=None):
+        return self.client.post(f"/league/leagues/{league_id}/{path}/", data or {}, format="json")
+
+    def draft(self, league_id, player_ids):
+        emails = ["boss@test.com", "a@test.com", "b@test.com"]
+        for i, player_id in enumerate(player_ids):
+            res = self.post(league_id, "pick", {"email": emails[i % 3], "player_id": player_id})
+            self.assertEqual(res.status_code, 200)
+
+    def stats(self):
+        # Undone players keep a zeroed row until a rebuild; like ranked(), ignore them
+        return sorted(PlayerDraftStat.objects.filter(times_drafted__gt=0)
+                      .values_list("player_id", "times_drafted", "pick_sum", "round_sum", "adp"))
+
+    def assertMatchesRebuild(self):
+        incremental = self.stats()
+        adp.rebuild()
+        self.assertEqual(incremental, self.stats())
+
+    def test_pick_undo_and_reset_match_a_rebuild(self):
+        first, second = self.leagues
+        for league_id in self.leagues:
+            self.post(league_id, "start-draft")
+        self.draft(first, [2544, 201939, 201142, 203999])
+        self.draft(second, [201939, 2544, 203954])
+        self.assertMatchesRebuild()
+
+        # Undo twice (Jokic, then Durant), and redraft Durant later
+        self.post(first, "undo-pick")
+        self.post(first, "undo-pick")
+        self.assertMatchesRebuild()
+        self.post(first, "pick", {"email": "b@test.com", "player_id": 203954})
+        self.post(first, "pick", {"email": "boss@test.com", "player_id": 201142})
+        self.assertMatchesRebuild()
+        self.assertNotIn(203999, [row[0] for row in self.stats()])
+        self.assertEqual(PlayerDraftStat.objects.get(player_id=201142).pick_sum, 4)
+
+        # Reset recomputes only the first league's players; the second league's picks stay counted
+        self.post(first, "reset")
+        self.assertMatchesRebuild()
+        self.assertEqual(PlayerDraftStat.objects.get(player_id=2544).times_drafted, 1)
+        self.assertEqual(PlayerDraftStat.objects.get(player_id=2544).adp, 2.0)
+
+    def test_migration_seeds_existing_drafts(self):
+        self.post(self.leagues[0], "start-draft")
+        self.draft(self.leagues[0], [2544, 201939, 201142])
+        expected = self.stats()
+        # As deployed before 0013: empty, then a partial count from a later pick
+        PlayerDraftStat.objects.all().delete()
+        adp.record_pick(2544, 9, 3)
+
+        migration = importlib.import_module("league.migrations.0013_seed_player_draft_stats")
+        migration.rebuild_draft_stats(django_apps, SimpleNamespace(connection=connections["default"]))
+        self.assertEqual(self.stats(), expected)
+
+
+@override_settings(LEAGUE_ROSTER_SIZE=2)
+class TradeAndWaiverTests(TestCase):
+    LEBRON, CURRY, DURANT, EMBIID, JOKIC, TATUM = 2544, 201939, 201142, 203954, 203999, 1628369
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.league_id = create_league(self.client, ["a@test.com", "b@test.com"]).data["id"]
+        self.post("start-draft", {})
+        # boss: LeBron, Jokic; a: Curry; b: Durant
+        for email, player_id in [("boss@test.com", self.LEBRON), ("a@test.com", self.CURRY),
+                                 ("b@test.com", self.DURANT), ("boss@test.com", self.JOKIC)]:
+            self.assertEqual(self.post("pick", {"email": email, "player_id": player_id}).status_code, 200)
+
+    def post(self, path, data):
+        return self.client.post(f"/league/leagues/{self.league_id}/{path}/", data, format="json")
+
+    def rosters(self):
+        teams = self.client.get(f"/league/leagues/{self.league_id}/teams/").data["teams"]
+        return {t["member"]["email"]: sorted(t["player_ids"]) for t in teams}
+
+    def trade(self, give, receive, email="a@test.com", to_email="boss@test.com"):
+        return self.post("trades", {"email": email, "to_email": to_email,
+                                    "give_player_ids": give, "receive_player_ids": receive})
+
+    def respond(self, trade_id, email="boss@test.com"):
+        return self.post(f"trades/{trade_id}/respond", {"email": email, "action": "accept"})
+
+    def claim(self, email, add, drop=None):
+        return self.post("waivers", {"email": email, "add_player_id": add, "drop_player_id": drop})
+
+    def test_accepted_trade_moves_players_and_refreshes_the_cached_rosters(self):
+        self.assertEqual(self.rosters()["a@test.com"], [self.CURRY])
+        trade = self.trade([self.CURRY], [self.LEBRON]).data
+
+        self.assertEqual(self.respond(trade["id"]).status_code, 200)
+        rosters = self.rosters()
+        self.assertEqual(rosters["a@test.com"], [self.LEBRON])
+        self.assertEqual(rosters["boss@test.com"], sorted([self.CURRY, self.JOKIC]))
+        # Still owned within the league, so still unavailable
+        res = self.client.get(f"/league/leagues/{self.league_id}/availability/",
+                              {"player_ids": f"{self.LEBRON},{self.CURRY}"})
+        self.assertEqual([p["available"] for p in res.data["players"]], [False, False])
+
+    def test_trade_over_the_roster_limit_fails(self):
+        trade = self.trade([], [self.LEBRON, self.JOKIC], email="a@test.com").data
+        res = self.respond(trade["id"])
+        self.assertEqual(res.status_code, 409)
+        self.assertIn("roster limit", res.data["result"])
+        self.assertEqual(self.rosters()["a@test.com"], [self.CURRY])
+
+    def test_repeated_player_ids(self):
+        self.assertEqual(self.trade([self.CURRY, self.CURRY], [self.LEBRON]).status_code, 400)
+
+        # A stored trade with a repeated item still counts the player once against the limit
+        trade = self.trade([self.CURRY], [self.LEBRON]).data
+        TradeItem.objects.create(trade_id=trade["id"], from_member_id=TradeItem.objects.get(
+            trade_id=trade["id"], player_id=self.LEBRON).from_member_id, player_id=self.LEBRON)
+        self.assertEqual(self.respond(trade["id"]).status_code, 200)
+        self.assertEqual(self.rosters()["a@test.com"], [self.LEBRON])
+
+    def test_waivers_roll(self):
+        # Order starts b (slot 3), a, boss. b wins Embiid and goes to the back, so a's
+        # Tatum claim now comes before b's, even though b claimed Tatum too
+        self.assertEqual(self.claim("a@test.com", self.EMBIID).data["priority"], 2)
+        self.claim("a@test.com", self.TATUM)
+        self.assertEqual(self.claim("b@test.com", self.EMBIID).data["priority"], 1)
+        self.claim("b@test.com", self.TATUM, drop=self.DURANT)
+        # boss's roster is full and names no drop
+        self.claim("boss@test.com", 1629029)
+        self.rosters()
+
+        result = process_waivers()
+
+        self.assertEqual((result.claims, result.awarded, result.failed), (5, 2, 3))
+        outcomes = {(c.member.email, c.add_player_id): (c.status, c.result) for c in WaiverClaim.objects.all()}
+        self.assertEqual(outcomes[("a@test.com", self.EMBIID)], ("FAILED", "Player is not available"))
+        self.assertEqual(outcomes[("b@test.com", self.TATUM)], ("FAILED", "Player is not available"))
+        self.assertEqual(outcomes[("boss@test.com", 1629029)],
+                         ("FAILED", "Roster is full (2); include a drop_player_id"))
+        # The cached rosters were invalidated, and the ownership bitmap follows
+        rosters = self.rosters()
+        self.assertEqual(rosters["a@test.com"], sorted([self.CURRY, self.TATUM]))
+        self.assertEqual(rosters["b@test.com"], sorted([self.DURANT, self.EMBIID]))
+        res = self.client.get(f"/league/leagues/{self.league_id}/availability/",
+                              {"player_ids": f"{self.LEBRON},{self.EMBIID},1629029"})
+        self.assertEqual([p["available"] for p in res.data["players"]], [False, False, True])
+
+        # The new order (boss, b, a) carries over to the next run
+        self.assertEqual(self.claim("boss@test.com", 1629029, drop=self.JOKIC).data["priority"], 1)
+        self.assertEqual(self.claim("b@test.com", 1629029, drop=self.DURANT).data["priority"], 2)
+        self.assertEqual(self.claim("a@test.com", 1629029, drop=self.CURRY).data["priority"], 3)
+        process_waivers()
+        self.assertIn(1629029, self.rosters()["boss@test.com"])
+
+    def test_drop_must_be_on_the_claimants_roster(self):
+        res = self.claim("a@test.com", self.EMBIID, drop=self.LEBRON)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data["error"], "Drop player is not on your roster")
+        self.assertEqual(self.claim("a@test.com", self.EMBIID, drop=self.CURRY).status_code, 201)
+
+    def test_waiver_claim_needs_a_real_player(self):
+        res = self.claim("a@test.com", 999999999)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data["error"], "Unknown player id 999999999")
+
+
+class MockDraftTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.league_id = create_league(self.client, ["a@test.com", "b@test.com"]).data["id"]
+        PlayerSeasonAggregate.objects.bulk_create([
+            PlayerSeasonAggregate(season="2024-25", player_id=pid, games=70, fantasy_points_avg=60 - pid)
+            for pid in range(1, 41)
+        ])
+
+    def mock(self, data):
+        return self.client.post(f"/league/leagues/{self.league_id}/mock-drafts/", data, format="json")
+
+    def test_explicit_zero_is_rejected_not_defaulted(self):
+        self.assertEqual(self.mock({"simulations": 0}).status_code, 400)
+        self.assertEqual(self.mock({"rounds": 0}).status_code, 400)
+        self.assertEqual(self.mock({"season": "2024-25", "rounds": 2}).data["simulations"], 500)
+
+    def test_requests_share_one_pool_and_match_the_serial_result(self):
+        data = {"season": "2024-25", "rounds": 3, "simulations": 600, "seed": 7}
+        with override_settings(MOCK_DRAFT_WORKERS=1):
+            serial = self.mock(data).data
+        with override_settings(MOCK_DRAFT_WORKERS=2):
+            first = self.mock(data).data
+            pool = simulation._pool
+            second = self.mock(data).data
+
+        self.assertIs(simulation._pool, pool)
+        for payload in (first, second):
+            self.assertEqual(payload["teams"], serial["teams"])
+            self.assertEqual(payload["players"], serial["players"])
+
+    def test_broken_pool_is_replaced(self):
+        data = {"season": "2024-25", "rounds": 3, "simulations": 600, "seed": 7}
+        with override_settings(MOCK_DRAFT_WORKERS=2):
+            expected = self.mock(data).data
+            broken = simulation.shared_pool(2)
+            # A worker that dies takes the whole pool down with it
+            with self.assertRaises(BrokenProcessPool):
+                broken.submit(os._exit, 1).result()
+
+            self.assertEqual(self.mock(data).data["teams"], expected["teams"])
+        self.assertIsNot(simulation._pool, broken)
+
+
+class ProjectionTests(TestCase):
+
+    def test_round_robin_meets_everyone_once_with_byes_for_odd_counts(self):
+        schedule = projections.round_robin(5, 5)
+        for team in range(5):
+            opponents = [int(o) for o in schedule[:, team]]
+            self.assertEqual(opponents.count(-1), 1)
+            self.assertEqual(sorted(o for o in opponents if o >= 0), [t for t in range(5) if t != team])
+        # Opponents are mutual
+        for week in schedule:
+            for team, opp in enumerate(week):
+                if opp >= 0:
+                    self.assertEqual(week[opp], team)
+
+    def test_distributions(self):
+        # Team 0 always scores 30 a game, team 1 always 10, team 2 has an empty roster, team 3 flips 0/40
+        result = projections.project_season(
+            [[30.0], [10.0], [0.0, 40.0]], [0, 1, 3], 4, simulations=2000, weeks=6, games_per_week=3, seed=1,
+        )
+        self.assertEqual(result["wins"].shape, (2000, 4))
+        self.assertTrue((result["points"][:, 0] == 30 * 3 * 6).all())
+        self.assertTrue((result["points"][:, 2] == 0).all())
+        self.assertAlmostEqual(float(result["points"][:, 3].mean()) / (20 * 3 * 6), 1, delta=0.02)
+        self.assertTrue((result["wins"] >= 0).all() and (result["wins"] <= 6).all())
+        # Team 0 beats 1 and 2 every time they meet, so it wins at least 4 of its 6 weeks
+        self.assertTrue((result["wins"][:, 0] >= 4).all())
+        self.assertEqual(int(result["titles"].sum()), 2000)
+        self.assertGreater(result["titles"][0], result["titles"][3])
+
+        again = projections.project_season(
+            [[30.0], [10.0], [0.0, 40.0]], [0, 1, 3], 4, simulations=2000, weeks=6, games_per_week=3, seed=1,
+        )
+        self.assertTrue((again["wins"] == result["wins"]).all())
+
+        summary = projections.summarize(result)
+        self.assertEqual(summary[0]["expected_points"], 540.0)
+        self.assertEqual(summary[0]["points_interval"], [540.0, 540.0])
+        self.assertAlmostEqual(sum(t["title_probability"] for t in summary), 1.0, places=3)
+
+    def test_exact_ties_share_the_title(self):
+        titles = projections.project_season([], [], 4, simulations=4000, weeks=4, seed=3)["titles"]
+        self.assertEqual(int(titles.sum()), 4000)
+        for t in titles:
+            self.assertAlmostEqual(t / 4000, 0.25, delta=0.04)
+
+    def test_endpoint_rejects_zero_simulations(self):
+        client = APIClient()
+        league_id = create_league(client, ["a@test.com"]).data["id"]
+        res = client.get(f"/league/leagues/{league_id}/projections/", {"simulations": 0})
+        self.assertEqual(res.status_code, 400)
+        res = client.get(f"/league/leagues/{league_id}/projections/", {"simulations": 200, "weeks": 4})
+        self.assertEqual(res.status_code, 200)
+        self.assertAlmostEqual(sum(t["title_probability"] for t in res.data["teams"]), 1.0, places=3)
+        self.assertTrue(all(t["title_probability"] > 0 for t in res.data["teams"]))
+
+
+class LineupOptimizerTests(SimpleTestCase):
+    SLOTS = ["G", "F", "C", "UTIL", "UTIL"]
+
+    def brute_force(self, players, slots):
+        best = 0.0
+        for choice in itertools.product([None, *range(len(slots))], repeat=len(players)):
+            used = [c for c in choice if c is not None]
+            if len(used) != len(set(used)):
+                continue
+            if any(c is not None and slots[c] != lineups.UTIL and slots[c] not in codes
+                   for c, (_, codes, _) in zip(choice, players)):
+                continue
+            best = max(best, sum(points for c, (_, _, points) in zip(choice, players) if c is not None))
+        return best
+
+    def check(self, players, slots):
+        total, assignment = lineups.optimize(players, slots)
+        self.assertAlmostEqual(total, self.brute_force(players, slots))
+        # The assignment is a legal lineup worth the reported total
+        by_id = {pid: (codes, points) for pid, codes, points in players}
+        for slot in set(slots):
+            self.assertLessEqual(list(assignment.values()).count(slot), slots.count(slot))
+        for pid, slot in assignment.items():
+            self.assertTrue(slot == lineups.UTIL or slot in by_id[pid][0])
+        self.assertAlmostEqual(sum(by_id[pid][1] for pid in assignment), total)
+        return total, assignment
+
+    def test_overlapping_eligibility(self):
+        # The G/F swingman is worth most at F, which frees G for the next guard,
+        # and the big man must take C rather than UTIL
+        players = [
+            (1, frozenset({"G", "F"}), 40.0),
+            (2, frozenset({"G"}), 35.0),
+            (3, frozenset({"F", "C"}), 30.0),
+            (4, frozenset({"C"}), 25.0),
+            (5, frozenset({"F"}), 20.0),
+            (6, frozenset(), 10.0),
+        ]
+        total, assignment = self.check(players, self.SLOTS)
+        self.assertEqual(total, 150.0)
+        self.assertNotIn(6, assignment)
+
+    def test_ties(self):
+        players = [
+            (1, frozenset({"G", "F", "C"}), 20.0),
+            (2, frozenset({"G"}), 20.0),
+            (3, frozenset({"G"}), 20.0),
+            (4, frozenset({"G"}), 20.0),
+            (5, frozenset({"G"}), 20.0),
+        ]
+        total, assignment = self.check(players, self.SLOTS)
+        # Four equal guards for G and the two UTILs, and the swingman alone can take F or C
+        self.assertEqual(total, 80.0)
+        self.assertEqual(len(assignment), 4)
+
+    def test_random_pools_match_brute_force(self):
+        rng = random.Random(7)
+        for _ in range(40):
+            players = [
+                (pid, frozenset(rng.sample(["G", "F", "C"], rng.randint(0, 2))), float(rng.randint(0, 5) * 5))
+                for pid in range(rng.randint(1, 7))
+            ]
+            self.check(players, self.SLOTS)
+
+
+@override_settings(LINEUP_SLOTS=["F", "UTIL"])
+class LineupScheduleTests(TestCase):
+    LEBRON, CURRY, TATUM = 2544, 201939, 1628369
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.league_id = create_league(self.client, ["a@test.com"]).data["id"]
+        self.client.post(f"/league/leagues/{self.league_id}/start-draft/", {}, format="json")
+        for email, player_id in [("boss@test.com", self.LEBRON), ("a@test.com", 201142),
+                                 ("boss@test.com", self.CURRY), ("a@test.com", 203954),
+                                 ("boss@test.com", self.TATUM)]:
+            self.client.post(f"/league/leagues/{self.league_id}/pick/", {"email": email, "player_id": player_id},
+                             format="json")
+        PlayerProfile.objects.bulk_create([
+            PlayerProfile(player_id=self.LEBRON, position="F", team_abbreviation="LAL"),
+            PlayerProfile(player_id=self.CURRY, position="G", team_abbreviation="GSW"),
+            PlayerProfile(player_id=self.TATUM, position="F", team_abbreviation="BOS"),
+        ])
+        PlayerSeasonAggregate.objects.bulk_create([
+            PlayerSeasonAggregate(season="2024-25", player_id=pid, games=50, fantasy_points_avg=avg)
+            for pid, avg in [(self.LEBRON, 50), (self.CURRY, 45), (self.TATUM, 40)]
+        ])
+        # Jan 1: Lakers at Warriors. Jan 2: only Boston plays.
+        PlayerGameLog.objects.bulk_create([
+            PlayerGameLog(season="2024-25", player_id=1, game_id="g1", game_date=date(2025, 1, 1), matchup="LAL @ GSW"),
+            PlayerGameLog(season="2024-25", player_id=2, game_id="g1", game_date=date(2025, 1, 1), matchup="GSW vs. LAL"),
+            PlayerGameLog(season="2024-25", player_id=3, game_id="g2", game_date=date(2025, 1, 2), matchup="BOS vs. NYK"),
+        ])
+
+    def boss_lineup(self, day):
+        res = self.client.post(f"/league/leagues/{self.league_id}/lineups/", {"date": day, "season": "2024-25"},
+                               format="json")
+        lineup = next(l for l in res.data["lineups"] if l["member"]["email"] == "boss@test.com")
+        return {s["player_id"]: s["projected_points"] for s in lineup["starters"]}, lineup["projected_points"]
+
+    def test_players_without_a_game_project_zero(self):
+        self.assertEqual(self.boss_lineup("2025-01-01"), ({self.LEBRON: 50.0, self.CURRY: 45.0}, 95.0))
+        self.assertEqual(self.boss_lineup("2025-01-02")[1], 40.0)
+        self.assertEqual(self.boss_lineup("2025-01-02")[0][self.TATUM], 40.0)
+
+    def test_future_days_use_the_scoreboard_and_fall_back_to_everyone(self):
+        day = date.today() + timedelta(days=3)
+        scoreboard = SimpleNamespace(line_score=SimpleNamespace(get_dict=lambda: {
+            "headers": ["GAME_ID", "TEAM_ABBREVIATION"], "data": [["g9", "GSW"], ["g9", "BOS"]],
+        }))
+        with mock.patch("players.upstream.endpoints",
+                        return_value=SimpleNamespace(ScoreboardV2=lambda **kwargs: scoreboard)):
+            self.assertEqual(self.boss_lineup(day.isoformat()), ({self.TATUM: 40.0, self.CURRY: 45.0}, 85.0))
+
+        cache.clear()
+        with mock.patch("players.upstream.endpoints", side_effect=ConnectionError("offline")):
+            self.assertEqual(self.boss_lineup(day.isoformat())[1], 95.0)
+
+    def test_league_ids_past_the_sqlite_variable_limit(self):
+        # 999 is the limit SQLite builds before 3.32 were compiled with
+        connections["default"].ensure_connection()
+        raw = connections["default"].connection
+        limit = raw.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        self.addCleanup(raw.setlimit, sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, limit)
+
+        league_ids = [*range(10**6, 10**6 + 2000), self.league_id]
+        result = lineups.optimize_lineups(date(2025, 1, 1), season="2024-25", league_ids=league_ids)
+        self.assertEqual((result.leagues, result.teams), (1, 2))
+        self.assertEqual(Lineup.objects.filter(league_id=self.league_id, date=date(2025, 1, 1)).count(), 2)
+
+
+class LiveScoringTests(TestCase):
+    LEBRON, CURRY, DURANT = 2544, 201939, 201142
+    DAY = date(2025, 1, 15)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.league_id = create_league(self.client, ["a@test.com"]).data["id"]
+        self.client.post(f"/league/leagues/{self.league_id}/start-draft/", {}, format="json")
+        for email, player_id in [("boss@test.com", self.LEBRON), ("a@test.com", self.DURANT),
+                                 ("boss@test.com", self.CURRY)]:
+            self.client.post(f"/league/leagues/{self.league_id}/pick/", {"email": email, "player_id": player_id},
+                             format="json")
+
+    def line(self, player_id, pts, day=DAY, game_id="g1"):
+        stats = dict.fromkeys(warehouse.STAT_COLUMNS, 0.0)
+        stats["pts"] = float(pts)
+        return live.BoxScoreLine(game_id, day, player_id, "LAL vs. BOS", stats)
+
+    def points(self):
+        teams = self.client.get(f"/league/leagues/{self.league_id}/teams/").data["teams"]
+        return {t["member"]["email"]: t["points"] for t in teams}
+
+    def test_cumulative_lines_credit_the_owning_teams_once(self):
+        self.assertEqual(live.apply_lines([self.line(self.LEBRON, 10), self.line(self.CURRY, 4)], "2024-25").teams, 1)
+        self.assertEqual(self.points(), {"boss@test.com": 14.0, "a@test.com": 0.0})
+
+        self.assertEqual(live.apply_lines([self.line(self.LEBRON, 10)], "2024-25").changed, 0)
+        live.apply_lines([self.line(self.LEBRON, 16), self.line(self.DURANT, 7)], "2024-25")
+        self.assertEqual(self.points(), {"boss@test.com": 20.0, "a@test.com": 7.0})
+
+        self.client.post(f"/league/leagues/{self.league_id}/reset/", {}, format="json")
+        self.assertEqual(self.points(), {"boss@test.com": 0.0, "a@test.com": 0.0})
+        self.assertIsNone(FantasyTeam.objects.get(member__email="boss@test.com").points_updated_at)
+
+    @override_settings(LINEUP_SLOTS=["UTIL"])
+    def test_only_the_days_starters_score_when_a_lineup_is_set(self):
+        PlayerSeasonAggregate.objects.bulk_create([
+            PlayerSeasonAggregate(season="2024-25", player_id=self.LEBRON, games=50, fantasy_points_avg=50),
+            PlayerSeasonAggregate(season="2024-25", player_id=self.CURRY, games=50, fantasy_points_avg=40),
+        ])
+        with mock.patch("players.upstream.endpoints", side_effect=ConnectionError("offline")):
+            self.client.post(f"/league/leagues/{self.league_id}/lineups/",
+                             {"date": self.DAY.isoformat(), "season": "2024-25"}, format="json")
+
+        # Curry is benched on DAY; the next day boss has no lineup, so everyone counts
+        live.apply_lines([self.line(self.LEBRON, 10), self.line(self.CURRY, 4)], "2024-25")
+        self.assertEqual(self.points()["boss@test.com"], 10.0)
+        next_day = self.DAY + timedelta(days=1)
+        live.apply_lines([self.line(self.CURRY, 6, day=next_day, game_id="g2")], "2024-25")
+        self.assertEqual(self.points()["boss@test.com"], 16.0)
+
+    def test_live_lines_do_not_mark_the_season_fetched(self):
+        fetched = timezone.now() - timedelta(hours=1)
+        PlayerSeasonAggregate.objects.create(season="2024-25", player_id=self.LEBRON, games=1, fetched_at=fetched,
+                                             updated_at=fetched)
+        live.apply_lines([self.line(self.LEBRON, 10), self.line(self.CURRY, 4)], "2024-25")
+
+        lebron = PlayerSeasonAggregate.objects.get(player_id=self.LEBRON)
+        self.assertEqual(lebron.fetched_at, fetched)
+        self.assertGreater(lebron.updated_at, fetched)
+        # A player seen only live still needs the full season fetched on first read
+        self.assertEqual(PlayerSeasonAggregate.objects.get(player_id=self.CURRY).fetched_at, warehouse.NEVER_FETCHED)
+        with override_settings(NBA_CURRENT_SEASON="2024-25"):
+            self.assertTrue(warehouse._is_stale(PlayerSeasonAggregate.objects.get(player_id=self.CURRY)))
+
+    def test_live_games_are_dated_in_eastern_time(self):
+        self.assertEqual(live.NbaLiveFeed._game_day("2025-01-16T00:30:00Z"), date(2025, 1, 15))
+        self.assertEqual(live.NbaLiveFeed._game_day("2025-07-01T17:00:00Z"), date(2025, 7, 1))
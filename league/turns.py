@@ -0,0 +1,24 @@
+# league/turns.py
+
+from __future__ import annotations
+from typing import Any
+
+
+def advance_turn(draft: Any, member_count: int) -> None:
+    """
+    Simple turn order: 1..N, wrap back to 1.
+    Increments round when wrapping.
+
+    Works on anything with current_slot/round/pick_number attributes, so the
+    Draft model, the replayed DraftState and simulated drafts share one rule.
+    """
+    if member_count <= 0:
+        return
+
+    if draft.current_slot >= member_count:
+        draft.current_slot = 1
+        draft.round += 1
+    else:
+        draft.current_slot += 1
+
+    draft.pick_number += 1
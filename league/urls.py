@@ -8,7 +8,22 @@ from .views import (
     StartDraft,
     MakePick,
     LeagueTeams,
+    LeagueJoinCode,
+    JoinLeague,
     ResetLeague,
+    UndoPick,
+    DraftHistory,
+    LeagueTrades,
+    RespondTrade,
+    LeagueWaivers,
+    MockDrafts,
+    PlayerADP,
+    DraftBoard,
+    PlayerAvailability,
+    FreeAgents,
+    PlayerLeagues,
+    LeagueProjections,
+    LeagueLineups,
 )
 
 urlpatterns = [
@@ -24,8 +39,51 @@ urlpatterns = [
     # /league/leagues/<id>/pick/
     path("leagues/<int:league_id>/pick/", MakePick.as_view(), name="league-make-pick"),
 
+    # /league/leagues/<id>/join-code/
+    path("leagues/<int:league_id>/join-code/", LeagueJoinCode.as_view(), name="league-join-code"),
+
+    # /league/join/<code>/
+    path("join/<str:join_code>/", JoinLeague.as_view(), name="league-join"),
+
     # /league/leagues/<id>/teams/
     path("leagues/<int:league_id>/teams/", LeagueTeams.as_view(), name="league-teams"),
 
     path("leagues/<int:league_id>/reset/", ResetLeague.as_view(), name="league-reset"),
+
+    # /league/leagues/<id>/undo-pick/
+    path("leagues/<int:league_id>/undo-pick/", UndoPick.as_view(), name="league-undo-pick"),
+
+    # /league/leagues/<id>/draft/history/
+    path("leagues/<int:league_id>/draft/history/", DraftHistory.as_view(), name="league-draft-history"),
+
+    # /league/leagues/<id>/trades/
+    path("leagues/<int:league_id>/trades/", LeagueTrades.as_view(), name="league-trades"),
+    path("leagues/<int:league_id>/trades/<int:trade_id>/respond/", RespondTrade.as_view(), name="league-trade-respond"),
+
+    # /league/leagues/<id>/waivers/
+    path("leagues/<int:league_id>/waivers/", LeagueWaivers.as_view(), name="league-waivers"),
+
+    # /league/leagues/<id>/mock-drafts/
+    path("leagues/<int:league_id>/mock-drafts/", MockDrafts.as_view(), name="league-mock-drafts"),
+
+    # /league/leagues/<id>/draft-board/
+    path("leagues/<int:league_id>/draft-board/", DraftBoard.as_view(), name="league-draft-board"),
+
+    # /league/leagues/<id>/availability/
+    path("leagues/<int:league_id>/availability/", PlayerAvailability.as_view(), name="league-availability"),
+
+    # /league/leagues/<id>/free-agents/
+    path("leagues/<int:league_id>/free-agents/", FreeAgents.as_view(), name="league-free-agents"),
+
+    # /league/leagues/<id>/projections/
+    path("leagues/<int:league_id>/projections/", LeagueProjections.as_view(), name="league-projections"),
+
+    # /league/leagues/<id>/lineups/
+    path("leagues/<int:league_id>/lineups/", LeagueLineups.as_view(), name="league-lineups"),
+
+    # /league/players/<player_id>/leagues/
+    path("players/<int:player_id>/leagues/", PlayerLeagues.as_view(), name="player-leagues"),
+
+    # /league/adp/
+    path("adp/", PlayerADP.as_view(), name="player-adp"),
 ]
\ No newline at end of file
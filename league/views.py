@@ -1,15 +1,31 @@
 # league/views.py
 
 from __future__ import annotations
+import time
 from dataclasses import dataclass
+from datetime import date
 from typing import Any
-from django.db import transaction
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import OuterRef, Prefetch, Subquery
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import League, LeagueMember, FantasyTeam, Draft, DraftPick
+from .models import (
+    League, LeagueMember, FantasyTeam, Draft, DraftPick, DraftEvent,
+    RosterPlayer, Trade, TradeItem, WaiverClaim, LineupEntry,
+)
+from . import adp
+from . import cache as league_cache
+from .draft_log import record_event, reconstruct, reconstruct_at_pick, serialize_event
+from .turns import advance_turn
+from .rosters import accept_trade, waiver_position
+from . import joins, lineups, outbox, ownership, sharding, simulation
+from .sharding import ShardedViewMixin
+from players import static_index, warehouse
+from players.models import PlayerGameLog, PlayerProfile
 
 
 # ----------------------------
@@ -41,50 +57,142 @@ def _serialize_member(m: LeagueMember) -> dict[str, Any]:
     }
 
 
-def _serialize_league(league: League) -> dict[str, Any]:
-    draft = getattr(league, "draft", None)
-    members = list(league.members.order_by("slot"))
+# Top-level keys of a serialized league; the first six are League columns
+LEAGUE_FIELDS = ("id", "name", "commissioner_email", "max_players", "status", "created_at", "members", "draft")
+_LEAGUE_COLUMNS = LEAGUE_FIELDS[:6]
+_DRAFT_COLUMNS = ("status", "current_slot", "round", "pick_number", "started_at")
 
-    current_turn = None
-    if draft and draft.status == Draft.Status.IN_PROGRESS:
-        current_member = next((m for m in members if m.slot == draft.current_slot), None)
-        if current_member:
-            current_turn = {"slot": draft.current_slot, "email": current_member.email}
 
-    return {
-        "id": league.id,
-        "name": league.name,
-        "commissioner_email": league.commissioner_email,
-        "max_players": league.max_players,
-        "status": league.status,
-        "created_at": league.created_at,
-        "members": [_serialize_member(m) for m in members],
-        "draft": None if not draft else {
-            "status": draft.status,
-            "current_slot": draft.current_slot,
-            "round": draft.round,
-            "pick_number": draft.pick_number,
-            "started_at": draft.started_at,
+def _serialize_league(league: League, fields: tuple[str, ...] = LEAGUE_FIELDS,
+                      members: list[LeagueMember] | None = None) -> dict[str, Any]:
+    """
+    `fields` limits the keys (see _parse_fields). Members are loaded only when
+    requested; pass them in when they were prefetched. A league annotated with
+    current_turn_email (see _league_queryset) needs no member rows for the
+    draft's current_turn.
+    """
+    payload: dict[str, Any] = {f: getattr(league, f) for f in _LEAGUE_COLUMNS if f in fields}
+
+    if "members" in fields or ("draft" in fields and not hasattr(league, "current_turn_email")):
+        if members is None:
+            members = list(league.members.order_by("slot"))
+    if "members" in fields:
+        payload["members"] = [_serialize_member(m) for m in members]
+
+    if "draft" in fields:
+        draft = getattr(league, "draft", None)
+        current_turn = None
+        if draft and draft.status == Draft.Status.IN_PROGRESS:
+            if hasattr(league, "current_turn_email"):
+                email = league.current_turn_email
+            else:
+                email = next((m.email for m in members if m.slot == draft.current_slot), None)
+            if email:
+                current_turn = {"slot": draft.current_slot, "email": email}
+
+        payload["draft"] = None if not draft else {
+            **{f: getattr(draft, f) for f in _DRAFT_COLUMNS},
             "current_turn": current_turn,
         }
+    return payload
+
+
+def _parse_fields(request) -> tuple[str, ...]:
+    """?fields=name,status -> ("id", "name", "status"); id is always included. Raises ValueError."""
+    raw = request.query_params.get("fields")
+    if not raw:
+        return LEAGUE_FIELDS
+    wanted = {f.strip() for f in raw.split(",") if f.strip()}
+    unknown = wanted - set(LEAGUE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(LEAGUE_FIELDS)}")
+    return tuple(f for f in LEAGUE_FIELDS if f in wanted or f == "id")
+
+
+def _league_queryset(fields: tuple[str, ...]):
+    """League rows trimmed to what `fields` needs: deferred columns, draft join and member prefetch only on demand."""
+    columns = [f for f in _LEAGUE_COLUMNS if f in fields or f in ("id", "created_at")]
+    qs = League.objects.all()
+    if "draft" in fields:
+        columns += [f"draft__{f}" for f in _DRAFT_COLUMNS]
+        qs = qs.select_related("draft").annotate(
+            current_turn_email=Subquery(
+                LeagueMember.objects
+                .filter(league=OuterRef("pk"), slot=OuterRef("draft__current_slot"))
+                .values("email")[:1]
+            ),
+        )
+    if "members" in fields:
+        qs = qs.prefetch_related(Prefetch("members", queryset=LeagueMember.objects.order_by("slot")))
+    return qs.only(*columns)
+
+
+def _wants_compact(request) -> bool:
+    return request.query_params.get("compact", "").lower() in ("1", "true", "yes")
+
+
+def _compact(value: Any) -> Any:
+    """
+    Compact response layout: null fields are dropped from objects, and a list
+    of objects becomes {"columns": [...], "rows": [[...], ...]} so keys are
+    sent once instead of once per row.
+    """
+    if isinstance(value, dict):
+        return {k: _compact(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+        columns = list(value[0])
+        return {"columns": columns, "rows": [[_compact(v.get(c)) for c in columns] for v in value]}
+    return value
+
+
+def _serialize_trade(t: Trade) -> dict[str, Any]:
+    return {
+        "id": t.id,
+        "status": t.status,
+        "result": t.result,
+        "proposer_id": t.proposer_id,
+        "recipient_id": t.recipient_id,
+        "items": [{"from_member_id": i.from_member_id, "player_id": i.player_id} for i in t.items.all()],
+        "created_at": t.created_at,
+        "resolved_at": t.resolved_at,
     }
 
 
-def _advance_turn(draft: Draft, member_count: int) -> None:
-    """
-    Simple turn order: 1..N, wrap back to 1.
-    Increments round when wrapping.
-    """
-    if member_count <= 0:
-        return
+def _serialize_waiver_claim(c: WaiverClaim) -> dict[str, Any]:
+    return {
+        "id": c.id,
+        "member_id": c.member_id,
+        "add_player_id": c.add_player_id,
+        "drop_player_id": c.drop_player_id,
+        "priority": c.priority,
+        "status": c.status,
+        "result": c.result,
+        "created_at": c.created_at,
+        "processed_at": c.processed_at,
+    }
+
 
-    if draft.current_slot >= member_count:
-        draft.current_slot = 1
-        draft.round += 1
-    else:
-        draft.current_slot += 1
+def _int_list(raw: Any) -> list[int] | None:
+    if not isinstance(raw, list):
+        return None
+    try:
+        return [int(x) for x in raw]
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_known_player(player_id: int) -> bool:
+    # The static index, or a stored profile for players newer than the installed nba_api
+    return (static_index.get().row_of(player_id) is not None
+            or PlayerProfile.objects.filter(player_id=player_id).exists())
 
-    draft.pick_number += 1
+
+def _is_commissioner_request(league: League, starter_email: str, required: bool = False) -> bool:
+    # Draft actions accept a missing starter_email; anything that reveals a secret passes required=True
+    starter_email = _normalize_email(starter_email)
+    if not starter_email:
+        return not required
+    return starter_email == _normalize_email(league.commissioner_email)
 
 
 # ----------------------------
@@ -93,6 +201,7 @@ def _advance_turn(draft: Draft, member_count: int) -> None:
 
 class LeagueListCreate(APIView):
     """
+    GET  /league/leagues/?fields=name,status&compact=1
     POST /league/leagues/
     Body:
     {
@@ -102,11 +211,27 @@ class LeagueListCreate(APIView):
       "max_players": 4
     }
 
+    GET returns the 50 newest leagues. `fields` picks the keys to return
+    (id, name, commissioner_email, max_players, status, created_at, members,
+    draft); `compact=1` drops nulls and returns {"columns", "rows"}.
+    POST also returns the new league's join_code (see JoinLeague).
     """
 
     def get(self, request):
-        leagues = League.objects.order_by("-created_at")[:50]
-        return Response([_serialize_league(l) for l in leagues], status=status.HTTP_200_OK)
+        try:
+            fields = _parse_fields(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Newest 50 of each shard, then the newest 50 of those
+        rows = []
+        for _ in sharding.each_shard():
+            for l in _league_queryset(fields).order_by("-created_at")[:50]:
+                members = list(l.members.all()) if "members" in fields else None
+                rows.append((l.created_at, l.id, _serialize_league(l, fields, members=members)))
+        rows.sort(key=lambda r: r[:2], reverse=True)
+        payload = [p for _, _, p in rows[:50]]
+        return Response(_compact(payload) if _wants_compact(request) else payload, status=status.HTTP_200_OK)
 
     def post(self, request):
         name = (request.data.get("name") or "").strip()
@@ -138,8 +263,11 @@ class LeagueListCreate(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        with transaction.atomic():
+        # A global id, which also picks the shard the league lives on
+        league_id = sharding.allocate_league_id()
+        with sharding.use_league(league_id), sharding.atomic():
             league = League.objects.create(
+                id=league_id,
                 name=name,
                 commissioner_email=commissioner_email,
                 max_players=max_players,
@@ -158,6 +286,7 @@ class LeagueListCreate(APIView):
 
             # Invites get slots 2..N
             slot = 2
+            invited = []
             for email in normalized_invites:
                 member = LeagueMember.objects.create(
                     league=league,
@@ -167,22 +296,38 @@ class LeagueListCreate(APIView):
                     is_commissioner=False,
                 )
                 FantasyTeam.objects.create(league=league, member=member, name=f"{member.display_name}'s Team")
+                invited.append(member)
                 slot += 1
 
-        return Response(_serialize_league(league), status=status.HTTP_201_CREATED)
+            # Queued, not sent: delivery happens in `manage.py send_outbox`
+            outbox.enqueue_invitations(league, invited)
 
+        payload = _serialize_league(league)
+        payload["join_code"] = joins.code_for(league.id)
+        return Response(payload, status=status.HTTP_201_CREATED)
 
-class LeagueDetail(APIView):
+
+class LeagueDetail(ShardedViewMixin, APIView):
     """
     GET /league/leagues/<league_id>/
+    GET /league/leagues/<league_id>/?fields=name,status,draft&compact=1
     """
 
     def get(self, request, league_id: int):
-        league = get_object_or_404(League, pk=league_id)
-        return Response(_serialize_league(league), status=status.HTTP_200_OK)
+        try:
+            fields = _parse_fields(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        variant = "detail" if fields == LEAGUE_FIELDS else "detail:" + ",".join(fields)
+        payload = league_cache.get_or_build(
+            league_id, variant,
+            lambda: _serialize_league(get_object_or_404(_league_queryset(fields), pk=league_id), fields),
+        )
+        return Response(_compact(payload) if _wants_compact(request) else payload, status=status.HTTP_200_OK)
 
-class StartDraft(APIView):
+
+class StartDraft(ShardedViewMixin, APIView):
     """
     POST /league/leagues/<league_id>/start-draft/
     Body: { "starter_email": "example@test.com" }
@@ -197,12 +342,13 @@ class StartDraft(APIView):
             return Response({"error": "Only commissioner can start draft (starter_email mismatch)"},
                             status=status.HTTP_403_FORBIDDEN)
 
-        member_count = _league_member_count(league)
-        if member_count < 2:
-            return Response({"error": "Need at least 2 members to start draft"},
-                            status=status.HTTP_400_BAD_REQUEST)
+        with sharding.atomic():
+            # Counted in the transaction that starts the draft, like MakePick's turn order
+            member_count = _league_member_count(league)
+            if member_count < 2:
+                return Response({"error": "Need at least 2 members to start draft"},
+                                status=status.HTTP_400_BAD_REQUEST)
 
-        with transaction.atomic():
             # If draft exists, don't recreate it
             draft, created = Draft.objects.select_for_update().get_or_create(
                 league=league,
@@ -226,14 +372,20 @@ class StartDraft(APIView):
             draft.started_at = timezone.now()
             draft.save()
 
+            record_event(league, DraftEvent.Kind.START, member_count=member_count, actor_email=starter_email)
+            first = league.members.filter(slot=1).first()
+            if first:
+                outbox.enqueue_draft_turn(league, first, draft.round, draft.pick_number)
+
             league.status = League.Status.DRAFTING
             league.save(update_fields=["status"])
+            league_cache.invalidate_league(league.id)
 
         league.refresh_from_db()
         return Response(_serialize_league(league), status=status.HTTP_200_OK)
 
 
-class MakePick(APIView):
+class MakePick(ShardedViewMixin, APIView):
     """
     POST /league/leagues/<league_id>/pick/
     Body:
@@ -258,19 +410,21 @@ class MakePick(APIView):
         except Exception:
             return Response({"error": "player_id must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
 
-        member = _get_member_by_email(league, email)
-        if not member:
-            return Response({"error": "That email is not a member of this league"}, status=status.HTTP_400_BAD_REQUEST)
-
-        member_count = _league_member_count(league)
-
-        with transaction.atomic():
+        with sharding.atomic():
             # Lock draft row to avoid 2 picks at once
             try:
                 draft = Draft.objects.select_for_update().get(league=league)
             except Draft.DoesNotExist:
                 return Response({"error": "Draft not started"}, status=status.HTTP_400_BAD_REQUEST)
 
+            # Read under the lock: a reset, join and restart could otherwise land between
+            # these reads and the pick, leaving a stale member count to advance the turn with
+            member = _get_member_by_email(league, email)
+            if not member:
+                return Response({"error": "That email is not a member of this league"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            member_count = _league_member_count(league)
+
             if draft.status != Draft.Status.IN_PROGRESS:
                 return Response({"error": f"Draft status is {draft.status}, not in progress"},
                                 status=status.HTTP_400_BAD_REQUEST)
@@ -289,8 +443,9 @@ class MakePick(APIView):
                     status=status.HTTP_409_CONFLICT,
                 )
 
-            # Prevent duplicate player picks
-            if DraftPick.objects.filter(draft=draft, player_id=player_id).exists():
+            # Prevent duplicate player picks (rosters also cover players taken off waivers)
+            if (DraftPick.objects.filter(draft=draft, player_id=player_id).exists()
+                    or RosterPlayer.objects.filter(league=league, player_id=player_id).exists()):
                 return Response({"error": "Player already drafted"}, status=status.HTTP_409_CONFLICT)
 
             # Create pick
@@ -302,31 +457,113 @@ class MakePick(APIView):
                 member=member,
                 player_id=player_id,
             )
+            RosterPlayer.objects.create(league=league, member=member, player_id=player_id)
+            ownership.update(league.id, add=[player_id])
+            adp.record_pick(player_id, draft.pick_number, draft.round)
+            record_event(
+                league, DraftEvent.Kind.PICK,
+                pick_number=draft.pick_number, round=draft.round, slot=member.slot,
+                member=member, player_id=player_id, actor_email=email,
+            )
 
             # Advance turn
-            _advance_turn(draft, member_count)
+            advance_turn(draft, member_count)
             draft.save()
+            on_clock = league.members.filter(slot=draft.current_slot).first()
+            if on_clock:
+                outbox.enqueue_draft_turn(league, on_clock, draft.round, draft.pick_number)
+            league_cache.invalidate_league(league.id)
 
         league.refresh_from_db()
         return Response(_serialize_league(league), status=status.HTTP_200_OK)
 
 
-class LeagueTeams(APIView):
+class LeagueJoinCode(ShardedViewMixin, APIView):
+    """
+    GET /league/leagues/<league_id>/join-code/?starter_email=commissioner@test.com
+    The code others use to join the league (see JoinLeague).
+    """
+
+    def get(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+        if not _is_commissioner_request(league, request.query_params.get("starter_email") or "", required=True):
+            return Response({"error": "Only commissioner can see the join code"}, status=status.HTTP_403_FORBIDDEN)
+        return Response({"league_id": league.id, "join_code": joins.code_for(league.id)}, status=status.HTTP_200_OK)
+
+
+class JoinLeague(APIView):
+    """
+    GET  /league/join/<join_code>/
+    POST /league/join/<join_code>/
+    Body: { "email": "me@test.com", "display_name": "Me" }
+
+    GET shows the league behind a code. POST joins it in the lowest free slot
+    (201), or returns the existing membership (200). 409 once the league is
+    full or its draft has started, or if every retry lost its slot to another joiner.
+    """
+
+    def get(self, request, join_code: str):
+        league_id = joins.league_for_code(join_code)
+        if league_id is None:
+            return Response({"error": "Unknown join code"}, status=status.HTTP_404_NOT_FOUND)
+        with sharding.use_league(league_id):
+            league = get_object_or_404(League, pk=league_id)
+            member_count = _league_member_count(league)
+        return Response({
+            "league_id": league.id,
+            "name": league.name,
+            "status": league.status,
+            "max_players": league.max_players,
+            "open_slots": max(league.max_players - member_count, 0) if league.status == League.Status.SETUP else 0,
+        }, status=status.HTTP_200_OK)
+
+    def post(self, request, join_code: str):
+        email = _normalize_email(request.data.get("email") or "")
+        display_name = (request.data.get("display_name") or "").strip()
+        if not email:
+            return Response({"error": "email is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        league_id = joins.league_for_code(join_code)
+        if league_id is None:
+            return Response({"error": "Unknown join code"}, status=status.HTTP_404_NOT_FOUND)
+        with sharding.use_league(league_id):
+            league = get_object_or_404(League, pk=league_id)
+            try:
+                member, joined = joins.join_league(league, email, display_name)
+            except IntegrityError:
+                return Response({"error": "Too many people are joining right now; try again"},
+                                status=status.HTTP_409_CONFLICT)
+            if member is None:
+                # The draft may have started since the league was loaded
+                league.refresh_from_db(fields=["status"])
+
+        if member is None:
+            reason = "League is full" if league.status == League.Status.SETUP else "Draft has already started"
+            return Response({"error": reason}, status=status.HTTP_409_CONFLICT)
+        return Response(
+            {"league_id": league.id, "member": _serialize_member(member)},
+            status=status.HTTP_201_CREATED if joined else status.HTTP_200_OK,
+        )
+
+
+class LeagueTeams(ShardedViewMixin, APIView):
     """
     GET /league/leagues/<league_id>/teams/
-    Returns each member + drafted player_ids (from picks).
+    Returns each member + rostered player_ids (draft picks, then trades/waivers).
     """
 
     def get(self, request, league_id: int):
+        payload = league_cache.get_or_build(league_id, "teams", lambda: self._build(league_id))
+        return Response(payload, status=status.HTTP_200_OK)
+
+    def _build(self, league_id: int) -> dict[str, Any]:
         league = get_object_or_404(League, pk=league_id)
 
-        draft = getattr(league, "draft", None)
-        members = list(league.members.order_by("slot"))
+        members = list(league.members.select_related("team").order_by("slot"))
 
         picks_by_member: dict[int, list[int]] = {m.id: [] for m in members}
-        if draft:
-            for p in draft.picks.order_by("pick_number").all():
-                picks_by_member[p.member_id].append(p.player_id)
+        for member_id, player_id in league.roster_players.order_by("id").values_list("member_id", "player_id"):
+            picks_by_member[member_id].append(player_id)
 
         payload = {
             "league_id": league.id,
@@ -334,14 +571,15 @@ class LeagueTeams(APIView):
                 {
                     "member": _serialize_member(m),
                     "team_name": getattr(getattr(m, "team", None), "name", ""),
+                    "points": round(getattr(getattr(m, "team", None), "points", 0.0), 2),
                     "player_ids": picks_by_member.get(m.id, []),
                 }
                 for m in members
             ],
         }
-        return Response(payload, status=status.HTTP_200_OK)
+        return payload
     
-class ResetLeague(APIView):
+class ResetLeague(ShardedViewMixin, APIView):
     """
     POST /league/leagues/<league_id>/reset/
     Body (optional): {"starter_email": "me@test.com"}
@@ -354,7 +592,7 @@ class ResetLeague(APIView):
         if starter_email and starter_email != league.commissioner_email.lower():
             return Response({"error": "Only commissioner can reset league"}, status=status.HTTP_403_FORBIDDEN)
 
-        with transaction.atomic():
+        with sharding.atomic():
             # If there's a draft, delete picks then draft
             try:
                 draft = Draft.objects.select_for_update().get(league=league)
@@ -362,11 +600,578 @@ class ResetLeague(APIView):
                 draft = None
 
             if draft:
+                drafted_ids = list(draft.picks.values_list("player_id", flat=True))
                 DraftPick.objects.filter(draft=draft).delete()
                 draft.delete()
+                adp.rebuild(player_ids=drafted_ids)
+            RosterPlayer.objects.filter(league=league).delete()
+            ownership.clear(league.id)
+            FantasyTeam.objects.filter(league=league).update(points=0, points_updated_at=None)
+            league.members.update(waiver_priority=0)
+
+            # The event log is kept, so the reset draft can still be replayed
+            record_event(league, DraftEvent.Kind.RESET, actor_email=starter_email)
 
             league.status = League.Status.SETUP
             league.save(update_fields=["status"])
+            league_cache.invalidate_league(league.id)
+
+        league.refresh_from_db()
+        return Response(_serialize_league(league), status=status.HTTP_200_OK)
+
+
+class UndoPick(ShardedViewMixin, APIView):
+    """
+    POST /league/leagues/<league_id>/undo-pick/
+    Body (optional): {"starter_email": "me@test.com"}
+
+    Removes only the most recent pick and hands the turn back to that slot.
+    Refused (409) once the picked player has been traded or dropped.
+    """
+
+    def post(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+
+        starter_email = _normalize_email(request.data.get("starter_email") or "")
+        if not _is_commissioner_request(league, starter_email):
+            return Response({"error": "Only commissioner can undo picks"}, status=status.HTTP_403_FORBIDDEN)
+
+        with sharding.atomic():
+            try:
+                draft = Draft.objects.select_for_update().get(league=league)
+            except Draft.DoesNotExist:
+                return Response({"error": "Draft not started"}, status=status.HTTP_400_BAD_REQUEST)
+
+            last_pick = draft.picks.order_by("-pick_number").first()
+            if not last_pick:
+                return Response({"error": "No picks to undo"}, status=status.HTTP_400_BAD_REQUEST)
+
+            drafted = RosterPlayer.objects.filter(
+                league=league, member_id=last_pick.member_id, player_id=last_pick.player_id,
+                source=RosterPlayer.Source.DRAFT,
+            )
+            if not drafted.exists():
+                # Traded or dropped since: undoing would leave the player on someone's roster
+                return Response({"error": "The picked player has changed teams since the pick; it can't be undone"},
+                                status=status.HTTP_409_CONFLICT)
+
+            record_event(
+                league, DraftEvent.Kind.UNDO,
+                pick_number=last_pick.pick_number, round=last_pick.round, slot=last_pick.slot,
+                member_id=last_pick.member_id, player_id=last_pick.player_id, actor_email=starter_email,
+            )
+            last_pick.delete()
+            adp.remove_pick(last_pick.player_id, last_pick.pick_number, last_pick.round)
+            drafted.delete()
+            ownership.update(league.id, remove=[last_pick.player_id])
+
+            draft.status = Draft.Status.IN_PROGRESS
+            draft.pick_number = last_pick.pick_number
+            draft.round = last_pick.round
+            draft.current_slot = last_pick.slot
+            draft.save()
+            league_cache.invalidate_league(league.id)
 
         league.refresh_from_db()
-        return Response(_serialize_league(league), status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(_serialize_league(league), status=status.HTTP_200_OK)
+
+
+class DraftHistory(ShardedViewMixin, APIView):
+    """
+    GET /league/leagues/<league_id>/draft/history/
+    GET /league/leagues/<league_id>/draft/history/?pick_number=12
+    GET /league/leagues/<league_id>/draft/history/?seq=40
+
+    Without parameters returns the full audit log plus the current replayed state.
+    With pick_number/seq returns the draft as it was at that point.
+    """
+
+    def get(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+
+        pick_number_raw = request.query_params.get("pick_number")
+        seq_raw = request.query_params.get("seq")
+
+        try:
+            pick_number = int(pick_number_raw) if pick_number_raw else None
+            seq = int(seq_raw) if seq_raw else None
+        except ValueError:
+            return Response({"error": "pick_number and seq must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if pick_number is not None:
+            state = reconstruct_at_pick(league, pick_number)
+            if state is None:
+                return Response({"error": f"No pick {pick_number} in draft history"},
+                                status=status.HTTP_404_NOT_FOUND)
+            return Response({"league_id": league.id, "state": state.to_dict()}, status=status.HTTP_200_OK)
+
+        if seq is not None:
+            return Response({"league_id": league.id, "state": reconstruct(league, seq=seq).to_dict()},
+                            status=status.HTTP_200_OK)
+
+        events = league.draft_events.order_by("seq")
+        return Response(
+            {
+                "league_id": league.id,
+                "state": reconstruct(league).to_dict(),
+                "events": [serialize_event(e) for e in events],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class LeagueTrades(ShardedViewMixin, APIView):
+    """
+    GET  /league/leagues/<league_id>/trades/
+    POST /league/leagues/<league_id>/trades/
+    Body:
+    {
+      "email": "a@test.com",
+      "to_email": "b@test.com",
+      "give_player_ids": [201939],
+      "receive_player_ids": [2544]
+    }
+    """
+
+    def get(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+        trades = league.trades.order_by("-created_at").prefetch_related("items")
+        return Response([_serialize_trade(t) for t in trades], status=status.HTTP_200_OK)
+
+    def post(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+
+        proposer = _get_member_by_email(league, request.data.get("email") or "")
+        recipient = _get_member_by_email(league, request.data.get("to_email") or "")
+        if not proposer or not recipient:
+            return Response({"error": "email and to_email must both be members of this league"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if proposer.id == recipient.id:
+            return Response({"error": "Cannot trade with yourself"}, status=status.HTTP_400_BAD_REQUEST)
+
+        give = _int_list(request.data.get("give_player_ids") or [])
+        receive = _int_list(request.data.get("receive_player_ids") or [])
+        if give is None or receive is None:
+            return Response({"error": "give_player_ids and receive_player_ids must be lists of integers"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not give and not receive:
+            return Response({"error": "A trade needs at least one player"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(set(give + receive)) != len(give) + len(receive):
+            return Response({"error": "Each player can only appear once in a trade"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # One lookup for every player in the proposal
+        owners = dict(
+            RosterPlayer.objects
+            .filter(league=league, player_id__in=give + receive)
+            .values_list("player_id", "member_id")
+        )
+        if any(owners.get(pid) != proposer.id for pid in give):
+            return Response({"error": "You can only give players on your roster"}, status=status.HTTP_400_BAD_REQUEST)
+        if any(owners.get(pid) != recipient.id for pid in receive):
+            return Response({"error": "You can only ask for players on their roster"}, status=status.HTTP_400_BAD_REQUEST)
+
+        with sharding.atomic():
+            trade = Trade.objects.create(league=league, proposer=proposer, recipient=recipient)
+            TradeItem.objects.bulk_create(
+                [TradeItem(trade=trade, from_member=proposer, player_id=pid) for pid in give]
+                + [TradeItem(trade=trade, from_member=recipient, player_id=pid) for pid in receive]
+            )
+
+        return Response(_serialize_trade(trade), status=status.HTTP_201_CREATED)
+
+
+class RespondTrade(ShardedViewMixin, APIView):
+    """
+    POST /league/leagues/<league_id>/trades/<trade_id>/respond/
+    Body: { "email": "b@test.com", "action": "accept" | "reject" | "cancel" }
+
+    The recipient accepts or rejects; the proposer can cancel.
+    """
+
+    def post(self, request, league_id: int, trade_id: int):
+        league = get_object_or_404(League, pk=league_id)
+        member = _get_member_by_email(league, request.data.get("email") or "")
+        action = (request.data.get("action") or "").strip().lower()
+
+        if not member:
+            return Response({"error": "That email is not a member of this league"}, status=status.HTTP_400_BAD_REQUEST)
+        if action not in ("accept", "reject", "cancel"):
+            return Response({"error": "action must be accept, reject or cancel"}, status=status.HTTP_400_BAD_REQUEST)
+
+        with sharding.atomic():
+            trade = get_object_or_404(Trade.objects.select_for_update(), pk=trade_id, league=league)
+            if trade.status != Trade.Status.PROPOSED:
+                return Response({"error": f"Trade is already {trade.status}"}, status=status.HTTP_409_CONFLICT)
+
+            allowed_member_id = trade.proposer_id if action == "cancel" else trade.recipient_id
+            if member.id != allowed_member_id:
+                return Response({"error": f"You cannot {action} this trade"}, status=status.HTTP_403_FORBIDDEN)
+
+            if action == "accept":
+                error = accept_trade(trade)
+                trade.status = Trade.Status.FAILED if error else Trade.Status.ACCEPTED
+                trade.result = error or ""
+            elif action == "reject":
+                trade.status = Trade.Status.REJECTED
+            else:
+                trade.status = Trade.Status.CANCELLED
+
+            trade.resolved_at = timezone.now()
+            trade.save(update_fields=["status", "result", "resolved_at"])
+
+        code = status.HTTP_409_CONFLICT if trade.status == Trade.Status.FAILED else status.HTTP_200_OK
+        return Response(_serialize_trade(trade), status=code)
+
+
+class LeagueWaivers(ShardedViewMixin, APIView):
+    """
+    GET  /league/leagues/<league_id>/waivers/
+    POST /league/leagues/<league_id>/waivers/
+    Body: { "email": "a@test.com", "add_player_id": 2544, "drop_player_id": 201939 }
+
+    Claims are queued and resolved together by `python manage.py process_waivers`.
+    Waivers roll: members later in the draft order start with better priority,
+    and a member whose claim is awarded moves to the back of the order.
+    """
+
+    def get(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+        claims = league.waiver_claims.order_by("status", "priority", "created_at")
+        return Response([_serialize_waiver_claim(c) for c in claims], status=status.HTTP_200_OK)
+
+    def post(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+        member = _get_member_by_email(league, request.data.get("email") or "")
+        if not member:
+            return Response({"error": "That email is not a member of this league"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            add_player_id = int(request.data.get("add_player_id"))
+            drop_raw = request.data.get("drop_player_id")
+            drop_player_id = int(drop_raw) if drop_raw not in (None, "") else None
+        except (TypeError, ValueError):
+            return Response({"error": "add_player_id/drop_player_id must be integers"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not _is_known_player(add_player_id):
+            return Response({"error": f"Unknown player id {add_player_id}"}, status=status.HTTP_400_BAD_REQUEST)
+        # Checked again when claims are processed, in case a trade moves the player first
+        if drop_player_id is not None and not member.roster_players.filter(player_id=drop_player_id).exists():
+            return Response({"error": "Drop player is not on your roster"}, status=status.HTTP_400_BAD_REQUEST)
+
+        claim = WaiverClaim.objects.create(
+            league=league,
+            member=member,
+            add_player_id=add_player_id,
+            drop_player_id=drop_player_id,
+            priority=waiver_position(member),
+        )
+        return Response(_serialize_waiver_claim(claim), status=status.HTTP_201_CREATED)
+
+
+class MockDrafts(ShardedViewMixin, APIView):
+    """
+    POST /league/leagues/<league_id>/mock-drafts/
+    Body (all optional):
+    {
+      "simulations": 500,
+      "rounds": 13,
+      "season": "2024-25",
+      "seed": 0,
+      "strategies": {"1": "best_available", "2": "value_noise"}
+    }
+
+    Runs in-memory drafts with the league's member slots and the normal turn order.
+    Players are valued by stored season fantasy points; slots without a strategy
+    use value_noise. Nothing is written to the database.
+    """
+
+    def post(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+        members = list(league.members.order_by("slot"))
+        if len(members) < 2:
+            return Response({"error": "Need at least 2 members to mock draft"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # Defaults only for missing keys, so an explicit 0 is rejected rather than replaced
+            simulations = int(request.data.get("simulations", 500))
+            rounds = int(request.data.get("rounds", settings.LEAGUE_ROSTER_SIZE))
+            seed = int(request.data.get("seed") or 0)
+            season = warehouse.parse_season(request.data.get("season"))
+        except (TypeError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_sims = settings.MOCK_DRAFT_MAX_SIMULATIONS
+        if not 1 <= simulations <= max_sims:
+            return Response({"error": f"simulations must be between 1 and {max_sims}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if rounds < 1:
+            return Response({"error": "rounds must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+
+        raw_strategies = request.data.get("strategies") or {}
+        if not isinstance(raw_strategies, dict):
+            return Response({"error": "strategies must be an object of slot -> strategy"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        strategies = {m.slot: str(raw_strategies.get(str(m.slot), "value_noise")) for m in members}
+
+        # A few spare players per pick so late-round strategies still have choices
+        pool = warehouse.ranked_pool(season, limit=rounds * len(members) + 8 * len(members))
+        if len(pool) < len(members):
+            return Response({"error": f"No stored player data for {season}; run backfill_season first"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        player_ids = [pid for pid, _ in pool]
+        values = [float(v) for _, v in pool]
+
+        started = time.perf_counter()
+        try:
+            result = simulation.run_mock_drafts(
+                values, strategies, len(members), rounds, simulations,
+                seed=seed, workers=settings.MOCK_DRAFT_WORKERS,
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        payload = simulation.summarize(result, player_ids, strategies)
+        email_by_slot = {m.slot: m.email for m in members}
+        for team in payload["teams"]:
+            team["email"] = email_by_slot[team["slot"]]
+        payload["seconds"] = round(time.perf_counter() - started, 3)
+        payload["season"] = season
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class PlayerADP(APIView):
+    """
+    GET /league/adp/?sort=adp&limit=50&offset=0
+    GET /league/adp/?player_ids=2544,201939
+
+    Cross-league average draft position and ownership (share of drafts the
+    player went in). sort: adp | -adp | ownership | -ownership
+    """
+
+    def get(self, request):
+        sort = request.query_params.get("sort") or "adp"
+        if sort not in adp.SORTS:
+            return Response({"error": f"sort must be one of: {', '.join(adp.SORTS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get("limit") or 50), 500)
+            offset = max(int(request.query_params.get("offset") or 0), 0)
+            raw_ids = request.query_params.get("player_ids")
+            player_ids = [int(x) for x in raw_ids.split(",") if x.strip()] if raw_ids else None
+        except ValueError:
+            return Response({"error": "limit, offset and player_ids must be integers"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if player_ids is not None:
+            stats = adp.ranked(sort, player_ids=player_ids)
+        else:
+            stats = adp.ranked(sort, offset=offset, limit=limit)
+
+        total_drafts = adp.total_drafts()
+        return Response(
+            {"total_drafts": total_drafts, "players": [adp.serialize_stat(s, total_drafts) for s in stats]},
+            status=status.HTTP_200_OK,
+        )
+
+
+class DraftBoard(ShardedViewMixin, APIView):
+    """
+    GET /league/leagues/<league_id>/draft-board/?limit=50
+    Players not yet on a roster in this league, ranked by cross-league ADP.
+    """
+
+    def get(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+        try:
+            limit = min(int(request.query_params.get("limit") or 50), 500)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        owned = list(league.roster_players.values_list("player_id", flat=True))
+        stats = adp.ranked("adp", exclude=owned, limit=limit)
+        total_drafts = adp.total_drafts()
+        return Response(
+            {"league_id": league.id, "players": [adp.serialize_stat(s, total_drafts) for s in stats]},
+            status=status.HTTP_200_OK,
+        )
+
+
+class PlayerAvailability(ShardedViewMixin, APIView):
+    """
+    GET /league/leagues/<league_id>/availability/?player_ids=2544,201939
+    Whether each player is still available (on no roster) in this league.
+    """
+
+    def get(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+        try:
+            raw_ids = request.query_params.get("player_ids") or ""
+            player_ids = list(dict.fromkeys(int(x) for x in raw_ids.split(",") if x.strip()))
+        except ValueError:
+            return Response({"error": "player_ids must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        if not player_ids or len(player_ids) > 1000:
+            return Response({"error": "player_ids must list 1 to 1000 players"}, status=status.HTTP_400_BAD_REQUEST)
+
+        available = ownership.availability(league.id, player_ids)
+        return Response(
+            {"league_id": league.id, "players": [{"player_id": p, "available": available[p]} for p in player_ids]},
+            status=status.HTTP_200_OK,
+        )
+
+
+class FreeAgents(ShardedViewMixin, APIView):
+    """
+    GET /league/leagues/<league_id>/free-agents/?q=curry&limit=25
+    Player name search limited to players no one in this league owns.
+    """
+
+    def get(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+        query = (request.query_params.get("q") or "").strip()
+        if not query:
+            return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get("limit") or 25), 100)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {"league_id": league.id, "players": ownership.free_agents(league.id, query, limit)},
+            status=status.HTTP_200_OK,
+        )
+
+
+class PlayerLeagues(APIView):
+    """
+    GET /league/players/<player_id>/leagues/
+    Ids of every league the player is rostered in.
+    """
+
+    def get(self, request, player_id: int):
+        return Response({"player_id": player_id, "league_ids": ownership.leagues_owning(player_id)},
+                        status=status.HTTP_200_OK)
+
+
+class LeagueProjections(ShardedViewMixin, APIView):
+    """
+    GET /league/leagues/<league_id>/projections/?simulations=10000&seed=0&season=2024-25&weeks=20
+
+    Monte Carlo season outlook per team, sampling each rostered player's games
+    from the stored game log for the season. Same seed, same answer.
+    """
+
+    def get(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+        try:
+            season = warehouse.parse_season(request.query_params.get("season"))
+            simulations = int(request.query_params.get("simulations", 10_000))
+            seed = int(request.query_params.get("seed") or 0)
+            weeks = int(request.query_params.get("weeks", settings.PROJECTION_WEEKS))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not 1 <= simulations <= settings.PROJECTION_MAX_SIMULATIONS:
+            return Response({"error": f"simulations must be between 1 and {settings.PROJECTION_MAX_SIMULATIONS}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= weeks <= 52:
+            return Response({"error": "weeks must be between 1 and 52"}, status=status.HTTP_400_BAD_REQUEST)
+
+        members = list(league.members.order_by("slot"))
+        if len(members) < 2:
+            return Response({"error": "Need at least 2 members to project a season"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        team_of_member = {m.id: t for t, m in enumerate(members)}
+        roster = list(league.roster_players.values_list("player_id", "member_id"))
+
+        logs: dict[int, list[float]] = {pid: [] for pid, _ in roster}
+        for pid, fpts in (
+            PlayerGameLog.objects
+            .filter(season=season, season_type=warehouse.REGULAR_SEASON, player_id__in=list(logs))
+            .values_list("player_id", "fantasy_points")
+        ):
+            logs[pid].append(fpts)
+
+        from . import projections  # imports NumPy; kept off the startup path
+
+        started = time.perf_counter()
+        result = projections.project_season(
+            [logs[pid] for pid, _ in roster],
+            [team_of_member[member_id] for _, member_id in roster],
+            len(members),
+            simulations=simulations,
+            weeks=weeks,
+            games_per_week=settings.PROJECTION_GAMES_PER_WEEK,
+            seed=seed,
+        )
+        teams = projections.summarize(result)
+
+        payload = {
+            "league_id": league.id,
+            "season": season,
+            "simulations": simulations,
+            "weeks": weeks,
+            "seed": seed,
+            "teams": [{"member": _serialize_member(m), **teams[t]} for t, m in enumerate(members)],
+            "players_without_games": sorted(pid for pid, g in logs.items() if not g),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class LeagueLineups(ShardedViewMixin, APIView):
+    """
+    GET  /league/leagues/<league_id>/lineups/?date=2025-01-15
+    POST /league/leagues/<league_id>/lineups/
+    Body: { "date": "2025-01-15", "season": "2024-25" }
+
+    GET returns the stored lineups for the day (default today); POST re-optimizes
+    this league's lineups now. All leagues are optimized nightly by
+    `python manage.py optimize_lineups`.
+    """
+
+    def get(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+        try:
+            day = date.fromisoformat(request.query_params.get("date") or date.today().isoformat())
+        except ValueError:
+            return Response({"error": "date must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self._payload(league, day), status=status.HTTP_200_OK)
+
+    def post(self, request, league_id: int):
+        league = get_object_or_404(League, pk=league_id)
+        try:
+            day = date.fromisoformat(request.data.get("date") or date.today().isoformat())
+            season = warehouse.parse_season(request.data.get("season"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        lineups.optimize_lineups(day, season=season, league_ids=[league.id])
+        return Response(self._payload(league, day), status=status.HTTP_200_OK)
+
+    def _payload(self, league: League, day: date) -> dict[str, Any]:
+        stored = (
+            league.lineups.filter(date=day)
+            .select_related("member")
+            .prefetch_related("entries")
+            .order_by("member__slot")
+        )
+        return {
+            "league_id": league.id,
+            "date": day.isoformat(),
+            "slots": lineups.lineup_slots(),
+            "lineups": [
+                {
+                    "member": _serialize_member(l.member),
+                    "projected_points": l.projected_points,
+                    "optimized_at": l.optimized_at.isoformat(),
+                    "starters": [
+                        {"slot": e.slot, "player_id": e.player_id, "projected_points": e.projected_points}
+                        for e in l.entries.all() if e.slot != LineupEntry.BENCH
+                    ],
+                    "bench": [e.player_id for e in l.entries.all() if e.slot == LineupEntry.BENCH],
+                }
+                for l in stored
+            ],
+        }
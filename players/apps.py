@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class PlayersConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
     name = 'players'
+
+    def ready(self):
+        if settings.PLAYERS_WARM_REFERENCE:
+            from . import reference
+            reference.warm()
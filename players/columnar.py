@@ -0,0 +1,230 @@
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from .models import PlayerGameLog
+
+# Columnar, memory-mapped copy of PlayerGameLog for analytics.
+#
+# One directory per (season, season_type) with one .npy file per column. Rows
+# are sorted by (player_id, game_date), so a player's games are one contiguous
+# slice: player_ids.npy holds the sorted ids and offsets.npy (players + 1) the
+# start of each player's rows. Files are opened with mmap_mode="r", so every
+# worker process shares the same page-cache pages, opening a season costs a
+# few stat() calls, and a slice of a column is a view, not a copy.
+#
+# The store is a snapshot: `manage.py build_columnar <season>` (or the
+# players.build_columnar job) rewrites it from the database after backfills.
+# Each build goes to its own `<season>-<type>.v<n>` directory, and
+# `<season>-<type>` is a symlink to the current one, switched with one
+# rename(), so there is always a complete store to open. A reader resolves the
+# link once and maps every column of that build.
+
+STATS = ("minutes", "pts", "reb", "ast", "stl", "blk", "tov", "fg3m", "fgm", "fga", "ftm", "fta", "fantasy_points")
+
+
+def _slug(season_type: str) -> str:
+    return season_type.lower().replace(" ", "-")
+
+
+def default_dir() -> Path:
+    from django.conf import settings
+
+    return Path(getattr(settings, "COLUMNAR_DIR", settings.BASE_DIR / ".cache" / "columnar"))
+
+
+def season_path(season: str, season_type: str, directory: Path | None = None) -> Path:
+    return (directory or default_dir()) / f"{season}-{_slug(season_type)}"
+
+
+# ---------- Build ----------
+
+def build(season: str, season_type: str, directory: Path | None = None) -> Path:
+    """
+    Write the season's columns from PlayerGameLog and swap them in.
+    Raises LookupError if no games are stored for the season.
+    """
+    rows = list(
+        PlayerGameLog.objects
+        .filter(season=season, season_type=season_type)
+        .order_by("player_id", "game_date", "game_id")
+        .values_list("player_id", "game_date", "matchup", "wl", *STATS)
+    )
+    if not rows:
+        raise LookupError(f"No stored {season} {season_type} games; run `manage.py backfill_season {season}` first")
+
+    player_col, dates, matchups, wls, *stat_cols = zip(*rows)
+    players = np.array(player_col, dtype=np.int64)
+    player_ids, starts = np.unique(players, return_index=True)
+    columns = {
+        "player_ids": player_ids,
+        "offsets": np.append(starts, len(rows)).astype(np.int64),
+        "game_date": np.array(dates, dtype="datetime64[D]"),
+        # "LAL vs. BOS" is a home game, "LAL @ BOS" an away game
+        "home": np.array(["@" not in m for m in matchups], dtype=np.bool_),
+        "win": np.array([wl == "W" for wl in wls], dtype=np.bool_),
+        **{stat: np.array(values, dtype=np.float32) for stat, values in zip(STATS, stat_cols)},
+    }
+
+    path = season_path(season, season_type, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    version = f"{path.name}.v{time.time_ns()}-{os.getpid()}"
+    target = path.with_name(version)
+    target.mkdir()
+    for name, values in columns.items():
+        np.save(target / f"{name}.npy", values)
+    (target / "meta.json").write_text(json.dumps({
+        "season": season,
+        "season_type": season_type,
+        "rows": len(rows),
+        "players": len(player_ids),
+        "built_at": datetime.now(timezone.utc).isoformat(),
+    }))
+
+    _switch(path, version)
+    return path
+
+
+def _switch(path: Path, version: str) -> None:
+    """Point the season's link at `version` atomically, then drop all but it and the build it replaced."""
+    previous = None
+    if path.is_symlink():
+        previous = os.readlink(path)
+    elif path.is_dir():
+        # A store from before versioned builds: move it aside so the link can take its name
+        previous = f"{path.name}.v0-{os.getpid()}"
+        os.replace(path, path.with_name(previous))
+
+    link = path.with_name(f"{path.name}.link{os.getpid()}")
+    link.unlink(missing_ok=True)
+    os.symlink(version, link)  # relative, so the directory can be moved as a whole
+    os.replace(link, path)
+
+    # The replaced build stays for readers that resolved the link just before the switch;
+    # older ones are unmapped from disk, but processes that mapped them keep their pages
+    keep = {version, previous, os.readlink(path)}
+    for old in path.parent.glob(f"{path.name}.v*"):
+        if old.name not in keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+# ---------- Read ----------
+
+class SeasonColumns:
+    def __init__(self, path: Path):
+        # Resolved once and mapped in full, so every column comes from the same build
+        # even if a rebuild switches the link (or removes this build) later
+        self.path = path.resolve()
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        self._columns = {f.stem: np.load(f, mmap_mode="r") for f in self.path.glob("*.npy")}
+        self.player_ids = self._columns["player_ids"]
+        self.offsets = self._columns["offsets"]
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def span(self, player_id: int, date_from: date | None = None, date_to: date | None = None,
+             last: int | None = None) -> slice | None:
+        """Row range of the player's games (oldest first), optionally narrowed by date or to the last N."""
+        i = int(np.searchsorted(self.player_ids, player_id))
+        if i == len(self.player_ids) or self.player_ids[i] != player_id:
+            return None
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        if date_from or date_to:
+            dates = self.column("game_date")[start:end]
+            if date_from:
+                start += int(np.searchsorted(dates, np.datetime64(date_from, "D"), side="left"))
+            if date_to:
+                end = int(self.offsets[i]) + int(np.searchsorted(dates, np.datetime64(date_to, "D"), side="right"))
+        if last:
+            start = max(start, end - last)
+        return slice(start, max(start, end))
+
+
+_open: dict[tuple[str, str], tuple[str, SeasonColumns]] = {}
+_lock = threading.Lock()
+
+
+def get(season: str, season_type: str) -> SeasonColumns | None:
+    """The season's mapped columns, or None if it hasn't been built. Reopened after a rebuild."""
+    path = season_path(season, season_type)
+    try:
+        version = os.readlink(path)
+    except FileNotFoundError:
+        return None
+    except OSError:
+        # A plain directory from before versioned builds, until its next rebuild
+        version = path.name
+    key = (season, season_type)
+    cached = _open.get(key)
+    if cached is None or cached[0] != version:
+        with _lock:
+            cached = _open.get(key)
+            if cached is None or cached[0] != version:
+                cached = _open[key] = (version, SeasonColumns(path.with_name(version)))
+    return cached[1]
+
+
+# ---------- Analytics ----------
+
+def _mean(values: np.ndarray) -> float:
+    return round(float(values.mean(dtype=np.float64)), 2) if len(values) else 0.0
+
+
+def averages(store: SeasonColumns, rows: slice, stats: tuple[str, ...] = STATS) -> dict:
+    return {"games": rows.stop - rows.start, **{f"{s}_avg": _mean(store.column(s)[rows]) for s in stats}}
+
+
+def splits(store: SeasonColumns, rows: slice, stats: tuple[str, ...] = STATS) -> dict:
+    """Per-game averages at home/away, in wins/losses and by calendar month."""
+    home = np.asarray(store.column("home")[rows])
+    win = np.asarray(store.column("win")[rows])
+    months = store.column("game_date")[rows].astype("datetime64[M]")
+    columns = {s: store.column(s)[rows] for s in stats}
+
+    def split(mask: np.ndarray) -> dict:
+        return {"games": int(mask.sum()), **{f"{s}_avg": _mean(v[mask]) for s, v in columns.items()}}
+
+    return {
+        "home": split(home),
+        "away": split(~home),
+        "wins": split(win),
+        "losses": split(~win),
+        "months": {str(m): split(months == m) for m in np.unique(months)},
+    }
+
+
+def rolling(store: SeasonColumns, rows: slice, stat: str, window: int) -> list[dict]:
+    """Each game's value and the average of the `window` games ending with it (once there are that many)."""
+    values = store.column(stat)[rows]
+    sums = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    dates = store.column("game_date")[rows]
+    return [
+        {
+            "game_date": str(dates[i]),
+            stat: float(values[i]),
+            "rolling_avg": round((sums[i + 1] - sums[i + 1 - window]) / window, 2) if i + 1 >= window else None,
+        }
+        for i in range(len(values))
+    ]
+
+
+def leaders(store: SeasonColumns, stat: str, min_games: int = 1, limit: int = 25) -> list[dict]:
+    """Every player's per-game average of `stat` in one pass over the column, best first."""
+    values = store.column(stat)
+    offsets = np.asarray(store.offsets)
+    games = np.diff(offsets)
+    # Each player has at least one row, so no reduceat segment is empty
+    avgs = np.add.reduceat(values, offsets[:-1], dtype=np.float64) / games
+    eligible = np.flatnonzero(games >= min_games)
+    order = eligible[np.lexsort((store.player_ids[eligible], -avgs[eligible]))][:limit]
+    return [
+        {"player_id": int(store.player_ids[i]), "games": int(games[i]), f"{stat}_avg": round(float(avgs[i]), 2)}
+        for i in order
+    ]
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from players import warehouse
+
+
+class Command(BaseCommand):
+    help = "Load a season of player game logs into the local store. Safe to interrupt; reruns resume."
+
+    def add_arguments(self, parser):
+        parser.add_argument("season", help='Season like "2023-24"')
+        parser.add_argument("--season-type", default=warehouse.REGULAR_SEASON)
+        parser.add_argument("--window-days", type=int, default=7, help="Days of games per upstream call")
+        parser.add_argument("--pause", type=float, default=0.6, help="Seconds between upstream calls")
+        parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over")
+
+    def handle(self, *args, **options):
+        try:
+            season = warehouse.parse_season(options["season"])
+            season_type = warehouse.parse_season_type(options["season_type"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        backfill = warehouse.backfill_season(
+            season,
+            season_type,
+            window_days=max(1, options["window_days"]),
+            restart=options["restart"],
+            pause=options["pause"],
+            log=self.stdout.write,
+        )
+        self.stdout.write(
+            f"{season} {season_type}: status={backfill.status} through={backfill.last_date} "
+            f"rows={backfill.rows_loaded}"
+        )
@@ -0,0 +1,51 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+DEFAULT_PATHS = "/api/teams/,/api/players/search/?q=james,/league/leagues/"
+COMPRESSION = "accounts.middleware.CompressionMiddleware"
+
+
+class Command(BaseCommand):
+    help = "Bytes on the wire and response time per endpoint: plain, gzip, brotli and conditional (304) GETs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--paths", default=DEFAULT_PATHS, help="Comma separated URLs to request")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per variant")
+
+    def handle(self, *args, **options):
+        paths = [p.strip() for p in options["paths"].split(",") if p.strip()]
+        uncompressed = [m for m in settings.MIDDLEWARE if m != COMPRESSION]
+
+        # The API throttle would cut the benchmark short
+        with override_settings(API_THROTTLE_BURST=0):
+            for path in paths:
+                self.stdout.write(path)
+                with override_settings(MIDDLEWARE=uncompressed):
+                    self._variant("before (identity)", path, {}, options["requests"])
+                self._variant("gzip", path, {"HTTP_ACCEPT_ENCODING": "gzip"}, options["requests"])
+                self._variant("br", path, {"HTTP_ACCEPT_ENCODING": "br, gzip"}, options["requests"])
+
+                etag = Client(HTTP_HOST="localhost").get(path, HTTP_ACCEPT_ENCODING="gzip").get("ETag")
+                if etag:
+                    self._variant("if-none-match", path, {"HTTP_ACCEPT_ENCODING": "gzip", "HTTP_IF_NONE_MATCH": etag},
+                                  options["requests"])
+
+    def _variant(self, label: str, path: str, headers: dict, n: int) -> None:
+        client = Client(HTTP_HOST="localhost")
+        client.get(path, **headers)  # warm caches
+
+        times = []
+        for _ in range(n):
+            started = time.perf_counter()
+            response = client.get(path, **headers)
+            times.append(time.perf_counter() - started)
+
+        encoding = response.get("Content-Encoding", "identity")
+        self.stdout.write(
+            f"  {label:<18} status={response.status_code} bytes={len(response.content):>7} "
+            f"encoding={encoding:<8} median={statistics.median(times) * 1000:7.3f}ms"
+        )
@@ -0,0 +1,74 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+HEAVY_MODULES = ("nba_api.stats.endpoints", "pandas", "numpy")
+
+
+def parse_importtime(stderr: str) -> tuple[int, dict[str, int]]:
+    """
+    Parse `python -X importtime` output.
+    Returns (total microseconds of top-level imports, cumulative microseconds per module).
+    """
+    total = 0
+    modules: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header line
+        cumulative = int(parts[1])
+        name = parts[2]
+        modules[name.strip()] = cumulative
+        # Nested imports are indented two spaces per level after the separator
+        if not name.startswith("   "):
+            total += cumulative
+    return total, modules
+
+
+class Command(BaseCommand):
+    help = "Measure startup import cost with `python -X importtime manage.py <command>`."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--command", default="check", help="manage.py command to time (default: check)")
+        parser.add_argument("--warmup", action="store_true", help="Time `import accounts.wsgi` with PLAYERS_WARMUP=1")
+        parser.add_argument("--top", type=int, default=10, help="Show the N slowest modules")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        if options["warmup"]:
+            env["PLAYERS_WARMUP"] = "1"
+            cmd = [sys.executable, "-X", "importtime", "-c", "import accounts.wsgi"]
+        else:
+            cmd = [sys.executable, "-X", "importtime", "manage.py", options["command"]]
+
+        totals, walls, modules = [], [], {}
+        for _ in range(max(1, options["runs"])):
+            started = time.perf_counter()
+            proc = subprocess.run(cmd, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+            walls.append(time.perf_counter() - started)
+            total, modules = parse_importtime(proc.stderr)
+            totals.append(total / 1e6)
+
+        self.stdout.write(f"$ {' '.join(cmd[1:])}")
+        self.stdout.write(
+            f"imports: median={statistics.median(totals):.3f}s  "
+            f"wall: median={statistics.median(walls):.3f}s  runs={len(totals)}  modules={len(modules)}"
+        )
+        for name in HEAVY_MODULES:
+            # Packages imported via importlib may only show up through their submodules
+            hits = [us for mod, us in modules.items() if mod == name or mod.startswith(name + ".")]
+            loaded = f"{max(hits) / 1e6:.3f}s ({len(hits)} modules)" if hits else "not imported"
+            self.stdout.write(f"  {name:<26} {loaded}")
+
+        self.stdout.write(f"slowest {options['top']} (cumulative):")
+        for name, us in sorted(modules.items(), key=lambda kv: kv[1], reverse=True)[:options["top"]]:
+            self.stdout.write(f"  {us / 1e6:8.3f}s  {name}")
+
@@ -0,0 +1,96 @@
+import json
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from players import static_index
+
+# Each variant runs in a fresh interpreter so its heap starts clean. It loads the
+# tables, then reports Python heap growth (tracemalloc), private memory growth
+# (/proc/self/smaps_rollup: pages no other worker can share) and lookup timings.
+PROBE = r"""
+import json, re, sys, time, tracemalloc
+
+def private_kib():
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            return sum(int(line.split()[1]) for line in f if line.startswith(("Private_Clean", "Private_Dirty")))
+    except OSError:
+        return 0
+
+variant, queries = sys.argv[1], json.loads(sys.argv[2])
+before_private = private_kib()
+tracemalloc.start()
+started = time.perf_counter()
+
+if variant == "nba_api":
+    from nba_api.stats.static import players, teams
+    table = players.get_players()
+    team_rows = teams.get_teams()
+    by_id = {p["id"]: p for p in table}
+    lookup = by_id.get
+    search = players.find_players_by_full_name
+    team = teams.find_team_by_abbreviation
+else:
+    from players.static_index import StaticIndex
+    index = StaticIndex(sys.argv[3])
+    lookup = index.player_by_id
+    search = lambda q: index.search(q, limit=index.size)
+    team = index.team_by_abbreviation
+
+load = time.perf_counter() - started
+heap, _ = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+private = private_kib() - before_private
+
+if variant == "nba_api":
+    ids = [p["id"] for p in table]
+else:
+    ids = [index.player(row)["id"] for row in range(index.size)]
+started = time.perf_counter()
+for pid in ids:
+    lookup(pid)
+lookups = (time.perf_counter() - started) / len(ids)
+
+started = time.perf_counter()
+hits = sum(len(search(q)) for q in queries)
+searches = (time.perf_counter() - started) / len(queries)
+
+started = time.perf_counter()
+for _ in range(1000):
+    team("LAL")
+teams_t = (time.perf_counter() - started) / 1000
+
+print(json.dumps({"load": load, "heap": heap, "private": private, "lookup": lookups,
+                  "search": searches, "hits": hits, "team": teams_t}))
+"""
+
+DEFAULT_QUERIES = "james,curry,antetokounmpo,jokic,smith,davis,zz,doncic,o'neal,williams"
+
+
+class Command(BaseCommand):
+    help = "Per-process memory and lookup speed: nba_api's static tables vs the mapped static index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", default=DEFAULT_QUERIES, help="Comma separated search strings")
+
+    def handle(self, *args, **options):
+        path = static_index.default_path()
+        if not path.exists():
+            static_index.build(path)
+        queries = [q for q in options["queries"].split(",") if q]
+        self.stdout.write(f"index file: {path} ({path.stat().st_size / 1024:.1f} KiB, shared by every worker)")
+
+        for variant in ("nba_api", "static_index"):
+            proc = subprocess.run(
+                [sys.executable, "-c", PROBE, variant, json.dumps(queries), str(path)],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            )
+            r = json.loads(proc.stdout)
+            self.stdout.write(
+                f"{variant:<13} load={r['load'] * 1000:7.2f}ms  heap={r['heap'] / 1024:8.1f} KiB  "
+                f"private={r['private']:6d} KiB  by_id={r['lookup'] * 1e6:6.2f}us  "
+                f"search={r['search'] * 1000:7.3f}ms ({r['hits']} hits)  team={r['team'] * 1e6:5.2f}us"
+            )
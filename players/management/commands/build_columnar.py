@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from players import columnar, warehouse
+
+
+class Command(BaseCommand):
+    help = "Write a season's stored game logs as memory-mapped columns for the analytics endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("season", help='Season like "2023-24"')
+        parser.add_argument("--season-type", default=warehouse.REGULAR_SEASON)
+
+    def handle(self, *args, **options):
+        try:
+            season = warehouse.parse_season(options["season"])
+            season_type = warehouse.parse_season_type(options["season_type"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started = time.perf_counter()
+        try:
+            path = columnar.build(season, season_type)
+        except LookupError as e:
+            raise CommandError(str(e))
+        built = time.perf_counter() - started
+
+        # What a request pays: open the mapped season, then reduce a full column
+        started = time.perf_counter()
+        store = columnar.SeasonColumns(path)
+        opened = time.perf_counter() - started
+        started = time.perf_counter()
+        columnar.leaders(store, "fantasy_points")
+        reduced = time.perf_counter() - started
+
+        size = sum(f.stat().st_size for f in store.path.iterdir())
+        self.stdout.write(f"path={store.path}")
+        self.stdout.write(f"rows={store.meta['rows']} players={store.meta['players']} bytes={size}")
+        self.stdout.write(f"build_s={built:.2f} open_ms={opened * 1000:.2f} full_season_leaders_ms={reduced * 1000:.2f}")
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from players import static_index
+
+
+class Command(BaseCommand):
+    help = "Write the memory-mapped static player/team index for the installed nba_api version."
+
+    def handle(self, *args, **options):
+        path = static_index.default_path()
+        started = time.perf_counter()
+        static_index.build(path)
+        index = static_index.StaticIndex(path)
+        self.stdout.write(
+            f"{path}: {index.size} players, {len(index.teams)} teams, "
+            f"{path.stat().st_size / 1024:.1f} KiB in {time.perf_counter() - started:.2f}s"
+        )
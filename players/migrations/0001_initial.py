@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerGameLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=7)),
+                ('season_type', models.CharField(default='Regular Season', max_length=20)),
+                ('player_id', models.IntegerField()),
+                ('game_id', models.CharField(max_length=12)),
+                ('game_date', models.DateField()),
+                ('matchup', models.CharField(max_length=20)),
+                ('wl', models.CharField(blank=True, max_length=1)),
+                ('minutes', models.FloatField(default=0)),
+                ('pts', models.IntegerField(default=0)),
+                ('reb', models.IntegerField(default=0)),
+                ('ast', models.IntegerField(default=0)),
+                ('stl', models.IntegerField(default=0)),
+                ('blk', models.IntegerField(default=0)),
+                ('tov', models.IntegerField(default=0)),
+                ('fg3m', models.IntegerField(default=0)),
+                ('fgm', models.IntegerField(default=0)),
+                ('fga', models.IntegerField(default=0)),
+                ('ftm', models.IntegerField(default=0)),
+                ('fta', models.IntegerField(default=0)),
+                ('fantasy_points', models.FloatField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['season', 'season_type', 'player_id', 'game_date'], name='players_pla_season_5af662_idx')],
+                'unique_together': {('season', 'season_type', 'player_id', 'game_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PlayerSeasonAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=7)),
+                ('season_type', models.CharField(default='Regular Season', max_length=20)),
+                ('player_id', models.IntegerField()),
+                ('games', models.PositiveIntegerField(default=0)),
+                ('minutes_avg', models.FloatField(default=0)),
+                ('pts_avg', models.FloatField(default=0)),
+                ('reb_avg', models.FloatField(default=0)),
+                ('ast_avg', models.FloatField(default=0)),
+                ('stl_avg', models.FloatField(default=0)),
+                ('blk_avg', models.FloatField(default=0)),
+                ('tov_avg', models.FloatField(default=0)),
+                ('fg3m_avg', models.FloatField(default=0)),
+                ('fantasy_points_avg', models.FloatField(default=0)),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'unique_together': {('season', 'season_type', 'player_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SeasonBackfill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=7)),
+                ('season_type', models.CharField(default='Regular Season', max_length=20)),
+                ('status', models.CharField(choices=[('RUNNING', 'Running'), ('COMPLETE', 'Complete')], default='RUNNING', max_length=20)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('rows_loaded', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'unique_together': {('season', 'season_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_id', models.IntegerField(unique=True)),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('position', models.CharField(blank=True, max_length=20)),
+                ('team_abbreviation', models.CharField(blank=True, max_length=5)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
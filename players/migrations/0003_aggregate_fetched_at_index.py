@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0002_player_profile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='playerseasonaggregate',
+            index=models.Index(fields=['fetched_at'], name='players_pla_fetched_5c9113_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_fetched_at(apps, schema_editor):
+    PlayerSeasonAggregate = apps.get_model('players', 'PlayerSeasonAggregate')
+    PlayerSeasonAggregate.objects.using(schema_editor.connection.alias).update(updated_at=models.F('fetched_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0003_aggregate_fetched_at_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='playerseasonaggregate',
+            name='players_pla_fetched_5c9113_idx',
+        ),
+        migrations.AddField(
+            model_name='playerseasonaggregate',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(copy_fetched_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='playerseasonaggregate',
+            index=models.Index(fields=['updated_at'], name='players_pla_updated_a9b45f_idx'),
+        ),
+    ]
@@ -1,3 +1,88 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+# Historical store for nba_api game logs.
+# SQLite has no native partitioning, so every table here leads with
+# (season, season_type) in its keys and indexes and every query filters on them;
+# each season is an independent slice that can be backfilled or dropped on its own.
+
+class PlayerGameLog(models.Model):
+    season = models.CharField(max_length=7)  # "2024-25"
+    season_type = models.CharField(max_length=20, default="Regular Season")
+    player_id = models.IntegerField()
+    game_id = models.CharField(max_length=12)
+    game_date = models.DateField()
+    matchup = models.CharField(max_length=20)
+    wl = models.CharField(max_length=1, blank=True)
+    minutes = models.FloatField(default=0)
+    pts = models.IntegerField(default=0)
+    reb = models.IntegerField(default=0)
+    ast = models.IntegerField(default=0)
+    stl = models.IntegerField(default=0)
+    blk = models.IntegerField(default=0)
+    tov = models.IntegerField(default=0)
+    fg3m = models.IntegerField(default=0)
+    fgm = models.IntegerField(default=0)
+    fga = models.IntegerField(default=0)
+    ftm = models.IntegerField(default=0)
+    fta = models.IntegerField(default=0)
+    fantasy_points = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = [("season", "season_type", "player_id", "game_id")]
+        indexes = [models.Index(fields=["season", "season_type", "player_id", "game_date"])]
+
+
+class PlayerSeasonAggregate(models.Model):
+    """Per-player, per-season averages precomputed from PlayerGameLog."""
+    season = models.CharField(max_length=7)
+    season_type = models.CharField(max_length=20, default="Regular Season")
+    player_id = models.IntegerField()
+    games = models.PositiveIntegerField(default=0)
+    minutes_avg = models.FloatField(default=0)
+    pts_avg = models.FloatField(default=0)
+    reb_avg = models.FloatField(default=0)
+    ast_avg = models.FloatField(default=0)
+    stl_avg = models.FloatField(default=0)
+    blk_avg = models.FloatField(default=0)
+    tov_avg = models.FloatField(default=0)
+    fg3m_avg = models.FloatField(default=0)
+    fantasy_points_avg = models.FloatField(default=0)
+    fetched_at = models.DateTimeField(default=timezone.now)  # last full pull of the underlying logs
+    updated_at = models.DateTimeField(default=timezone.now)  # last recompute, live updates included
+
+    class Meta:
+        unique_together = [("season", "season_type", "player_id")]
+        indexes = [models.Index(fields=["updated_at"])]  # players/similarity.py polls for refreshed rows
+
+
+class SeasonBackfill(models.Model):
+    """Checkpoint for `manage.py backfill_season`; a rerun resumes after last_date."""
+    class Status(models.TextChoices):
+        RUNNING = "RUNNING"
+        COMPLETE = "COMPLETE"
+
+    season = models.CharField(max_length=7)
+    season_type = models.CharField(max_length=20, default="Regular Season")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.RUNNING)
+    last_date = models.DateField(null=True, blank=True)  # backfilled through this date
+    rows_loaded = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = [("season", "season_type")]
+
+
+class PlayerProfile(models.Model):
+    """
+    Position and team as last seen from nba_api (CommonPlayerInfo or CommonTeamRoster).
+    Lets league code check position eligibility without an upstream call.
+    """
+    player_id = models.IntegerField(unique=True)
+    name = models.CharField(max_length=100, blank=True)
+    position = models.CharField(max_length=20, blank=True)  # "Guard-Forward" or "G-F"
+    team_abbreviation = models.CharField(max_length=5, blank=True)
+    updated_at = models.DateTimeField(default=timezone.now)
@@ -0,0 +1,81 @@
+import hashlib
+import json
+from functools import cache
+from importlib import metadata
+
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import static_index
+
+
+# Reference data (teams, player search, rosters of finished seasons) changes
+# rarely, so these endpoints send a content-hash ETag and Cache-Control, and
+# answer If-None-Match with an empty 304.
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+@cache
+def nba_api_version() -> str:
+    try:
+        return metadata.version("nba_api")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+@cache
+def team_list() -> tuple[list[dict], str]:
+    """
+    The sorted /api/teams/ payload and its ETag, built once per process: by
+    warm() at startup, or on the first request if the static index had not
+    been built yet then.
+    """
+    payload = sorted(
+        (
+            {"team_id": t.id, "abbreviation": t.abbreviation, "name": t.full_name}
+            for t in static_index.get().teams
+        ),
+        key=lambda x: x["name"],
+    )
+    return payload, make_etag(payload)
+
+
+def warm() -> bool:
+    """
+    Build team_list() now if the static index file exists, so the first request
+    doesn't pay for it. Without the file, building it would import nba_api, so
+    that is left to the first request (or PLAYERS_WARMUP). Returns whether it warmed.
+    """
+    if static_index.default_path().exists():
+        team_list()
+        return True
+    return False
+
+
+def not_modified(request, etag: str) -> bool:
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    # Weak comparison: compression rewrites our ETags as W/"..."
+    wanted = {tag.removeprefix("W/") for tag in parse_etags(header)}
+    return "*" in wanted or etag in wanted
+
+
+def reference_response(request, etag: str, max_age: int, build) -> Response:
+    """
+    304 when the client already has `etag`, otherwise 200 with build()'s payload.
+    build is only called on a miss, so a revalidation skips the work entirely.
+    """
+    if not_modified(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(build(), status=status.HTTP_200_OK)
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
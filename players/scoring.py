@@ -0,0 +1,15 @@
+# Fantasy scoring shared by the game-log store and anything that ranks players.
+# Keys are the lowercase stat names used on PlayerGameLog.
+
+FANTASY_SCORING = {
+    "pts": 1.0,
+    "reb": 1.2,
+    "ast": 1.5,
+    "stl": 3.0,
+    "blk": 3.0,
+    "tov": -1.0,
+}
+
+
+def fantasy_points(stats: dict) -> float:
+    return round(sum(weight * float(stats.get(stat) or 0) for stat, weight in FANTASY_SCORING.items()), 2)
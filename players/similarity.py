@@ -0,0 +1,180 @@
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+from django.conf import settings
+
+from . import warehouse
+from .models import PlayerSeasonAggregate
+
+
+# Per-game averages that make up a player's stat vector
+FEATURES = ("minutes_avg", "pts_avg", "reb_avg", "ast_avg", "stl_avg", "blk_avg", "tov_avg", "fg3m_avg")
+
+
+# (updated_at, pk) of a PlayerSeasonAggregate row
+Watermark = tuple[datetime, int]
+
+
+def min_games() -> int:
+    return int(getattr(settings, "SIMILARITY_MIN_GAMES", 10))
+
+
+# ---------- Index ----------
+
+@dataclass
+class SimilarityIndex:
+    """
+    One row per (player, season) with enough games: per-game averages z-scored
+    with the pool's mean/std, then L2-normalized so a dot product is the cosine.
+
+    The mean/std are fixed at build time. New or refreshed aggregates are
+    folded in with update(), which only touches the changed rows; a full
+    rebuild happens once the updates grow past a fraction of the pool.
+    """
+    matrix: np.ndarray                      # (rows, features) float32, unit rows
+    player_ids: np.ndarray                  # (rows,) int64
+    seasons: np.ndarray                     # (rows,) season strings
+    mean: np.ndarray
+    std: np.ndarray
+    built_through: Watermark | None         # newest PlayerSeasonAggregate seen (see _watermark)
+    rows: dict[tuple[int, str], int] = field(default_factory=dict)
+    updated_rows: int = 0
+
+    @classmethod
+    def build(cls) -> "SimilarityIndex":
+        # Read first: a row written while building is folded in again by the next update()
+        through = _watermark()
+        aggregates = list(_aggregate_rows())
+        raw = np.array([[a[f] for f in FEATURES] for a in aggregates], dtype=np.float64).reshape(-1, len(FEATURES))
+        mean = raw.mean(axis=0) if len(raw) else np.zeros(len(FEATURES))
+        std = raw.std(axis=0) if len(raw) else np.ones(len(FEATURES))
+        std[std == 0] = 1.0
+
+        index = cls(
+            matrix=np.empty((0, len(FEATURES)), dtype=np.float32),
+            player_ids=np.empty(0, dtype=np.int64),
+            seasons=np.empty(0, dtype="<U7"),
+            mean=mean,
+            std=std,
+            built_through=through,
+        )
+        index.matrix = index._vectors(raw)
+        index.player_ids = np.array([a["player_id"] for a in aggregates], dtype=np.int64)
+        index.seasons = np.array([a["season"] for a in aggregates], dtype="<U7")
+        index.rows = {(a["player_id"], a["season"]): i for i, a in enumerate(aggregates)}
+        return index
+
+    def _vectors(self, raw: np.ndarray) -> np.ndarray:
+        z = (raw - self.mean) / self.std
+        norms = np.linalg.norm(z, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (z / norms).astype(np.float32)
+
+    def update(self, aggregates: list[dict], through: Watermark) -> None:
+        """Replace or append rows for aggregates fetched since the last build/update."""
+        self.built_through = through
+        if not aggregates:
+            return
+        raw = np.array([[a[f] for f in FEATURES] for a in aggregates], dtype=np.float64)
+        vectors = self._vectors(raw)
+
+        appended = []
+        for a, vec in zip(aggregates, vectors):
+            key = (a["player_id"], a["season"])
+            row = self.rows.get(key)
+            if row is None:
+                appended.append((key, vec))
+            else:
+                self.matrix[row] = vec
+        if appended:
+            start = len(self.seasons)
+            self.matrix = np.vstack([self.matrix, np.array([v for _, v in appended])])
+            self.player_ids = np.concatenate([self.player_ids, np.array([k[0] for k, _ in appended], dtype=np.int64)])
+            self.seasons = np.concatenate([self.seasons, np.array([k[1] for k, _ in appended], dtype="<U7")])
+            for offset, (key, _) in enumerate(appended):
+                self.rows[key] = start + offset
+        self.updated_rows += len(aggregates)
+
+    def vector(self, player_id: int, season: str) -> np.ndarray | None:
+        row = self.rows.get((player_id, season))
+        return None if row is None else self.matrix[row]
+
+    def nearest(self, player_id: int, season: str, k: int = 10, within_season: str | None = None) -> list[dict]:
+        """Top-k player-seasons by cosine similarity, excluding every season of the player itself."""
+        query = self.vector(player_id, season)
+        if query is None:
+            return []
+
+        scores = self.matrix @ query
+        scores[self.player_ids == player_id] = -np.inf
+        if within_season is not None:
+            scores[self.seasons != within_season] = -np.inf
+
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {"player_id": int(self.player_ids[i]), "season": str(self.seasons[i]), "similarity": round(float(scores[i]), 4)}
+            for i in top
+        ]
+
+
+def _watermark() -> Watermark | None:
+    """(updated_at, pk) of the newest aggregate, on the updated_at index. The pk breaks timestamp ties."""
+    return PlayerSeasonAggregate.objects.order_by("-updated_at", "-pk").values_list("updated_at", "pk").first()
+
+
+def _aggregate_rows(since: Watermark | None = None):
+    qs = PlayerSeasonAggregate.objects.filter(season_type=warehouse.REGULAR_SEASON, games__gte=min_games())
+    if since is not None:
+        updated_at, pk = since
+        qs = qs.filter(updated_at__gte=updated_at).exclude(updated_at=updated_at, pk__lte=pk)
+    return qs.order_by("season", "player_id").values("player_id", "season", "updated_at", *FEATURES)
+
+
+# ---------- Process-wide index ----------
+
+_index: SimilarityIndex | None = None
+_lock = threading.Lock()
+
+# Rebuild from scratch (fresh mean/std) once this fraction of rows has been updated in place
+REBUILD_FRACTION = 0.25
+
+
+def get_index() -> SimilarityIndex:
+    """
+    The index for this process, built on first use. Each call checks for
+    aggregates refreshed since the index was last brought up to date (one
+    query on the updated_at index) and folds just those rows in, so newly
+    ingested game logs show up without a rebuild. The check runs without the
+    lock; only building and updating take it.
+    """
+    global _index
+    index = _index
+    if index is not None:
+        newest = _watermark()
+        if newest is None or (index.built_through is not None and newest <= index.built_through):
+            return index
+
+    with _lock:
+        if _index is None:
+            _index = SimilarityIndex.build()
+            return _index
+
+        # Another request may have brought it up to date while this one waited
+        newest = _watermark()
+        if newest is not None and (_index.built_through is None or newest > _index.built_through):
+            _index.update(list(_aggregate_rows(since=_index.built_through)), through=newest)
+            if _index.updated_rows > REBUILD_FRACTION * max(len(_index.seasons), 1):
+                _index = SimilarityIndex.build()
+        return _index
+
+
+def reset_index() -> None:
+    global _index
+    with _lock:
+        _index = None
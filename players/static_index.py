@@ -0,0 +1,249 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import unicodedata
+from array import array
+from pathlib import Path
+
+# Compact, read-only copy of nba_api's static player and team tables.
+#
+# nba_api keeps ~5,000 players as Python lists and builds a dict per row on
+# every search, scanning the whole table with a regex. Here the players are
+# parallel arrays (ids, active flags, name offsets) plus two UTF-8 blobs,
+# written once to a file and memory-mapped: every worker maps the same pages,
+# so the table costs each process almost nothing and needs no nba_api import.
+#
+# Layout: MAGIC, u32 header length, JSON header, then 8-byte aligned sections.
+#   ids             int64[n]
+#   active          uint8[n]
+#   name_offsets    int32[n+1]  into names (display names)
+#   search_offsets  int32[n+1]  into search (accent-stripped, lowercased, "\n"-joined)
+#   id_table        int32[m]    open-addressing hash of id -> row + 1 (0 = empty)
+# Teams (30 rows) are small enough to live in the header.
+
+MAGIC = b"NBAIDX1\n"
+_HASH_MULT = 2654435761
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents, the same normalisation nba_api's search uses."""
+    decomposed = unicodedata.normalize("NFD", text)
+    return "".join(c for c in decomposed if unicodedata.category(c) != "Mn").lower()
+
+
+def _slot(player_id: int, size: int) -> int:
+    return (player_id * _HASH_MULT) % size
+
+
+# ---------- Build ----------
+
+def build(path: Path) -> Path:
+    """Write the index from nba_api's bundled data (the only nba_api import here)."""
+    from nba_api.stats.library import data
+
+    from .reference import nba_api_version
+
+    rows = data.players
+    n = len(rows)
+    ids = array("q", (r[data.player_index_id] for r in rows))
+    active = array("B", (1 if r[data.player_index_is_active] else 0 for r in rows))
+
+    names = bytearray()
+    search = bytearray()
+    name_offsets = array("i", [0])
+    search_offsets = array("i", [0])
+    for r in rows:
+        names += r[data.player_index_full_name].encode()
+        name_offsets.append(len(names))
+        search += fold(r[data.player_index_full_name]).encode() + b"\n"
+        search_offsets.append(len(search))
+
+    size = 1
+    while size < 2 * n:
+        size *= 2
+    id_table = array("i", bytes(4 * size))
+    for row, pid in enumerate(ids):
+        slot = _slot(pid, size)
+        while id_table[slot]:
+            slot = (slot + 1) % size
+        id_table[slot] = row + 1
+
+    sections = {
+        "ids": ids.tobytes(),
+        "active": active.tobytes(),
+        "name_offsets": name_offsets.tobytes(),
+        "search_offsets": search_offsets.tobytes(),
+        "id_table": id_table.tobytes(),
+        "names": bytes(names),
+        "search": bytes(search),
+    }
+    teams = [
+        {
+            "id": t[data.team_index_id],
+            "abbreviation": t[data.team_index_abbreviation],
+            "nickname": t[data.team_index_nickname],
+            "city": t[data.team_index_city],
+            "full_name": t[data.team_index_full_name],
+            "state": t[data.team_index_state],
+            "year_founded": t[data.team_index_year_founded],
+        }
+        for t in data.teams
+    ]
+
+    # Offsets are relative to the end of the header, so they don't depend on its length
+    layout, body = {}, bytearray()
+    for name, blob in sections.items():
+        body += bytes(-len(body) % 8)
+        layout[name] = [len(body), len(blob)]
+        body += blob
+    header = json.dumps({
+        "nba_api": nba_api_version(),
+        "players": n,
+        "table_size": size,
+        "sections": layout,
+        "teams": teams,
+    }).encode()
+    header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".tmp{os.getpid()}")
+    tmp.write_bytes(MAGIC + struct.pack("<I", len(header)) + header + body)
+    os.replace(tmp, path)
+    return path
+
+
+# ---------- Read ----------
+
+class Team:
+    __slots__ = ("id", "abbreviation", "nickname", "city", "full_name", "state", "year_founded")
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class StaticIndex:
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a static player index")
+        (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mm[start:start + header_len])
+        base = start + header_len
+
+        view = memoryview(self._mm)
+
+        def section(name: str, fmt: str | None = None):
+            offset, length = header["sections"][name]
+            part = view[base + offset:base + offset + length]
+            return part.cast(fmt) if fmt else part
+
+        self.nba_api_version = header["nba_api"]
+        self.size = header["players"]
+        self._table_size = header["table_size"]
+        self._ids = section("ids", "q")
+        self._active = section("active", "B")
+        self._name_offsets = section("name_offsets", "i")
+        self._search_offsets = section("search_offsets", "i")
+        self._id_table = section("id_table", "i")
+        self._names = section("names")
+        self._search_base = base + header["sections"]["search"][0]
+        self._search_end = self._search_base + header["sections"]["search"][1]
+
+        self.teams = [Team(**t) for t in header["teams"]]
+        self._team_by_abbr = {t.abbreviation: t for t in self.teams}
+        self._team_by_id = {t.id: t for t in self.teams}
+
+    # ---- players ----
+
+    def player(self, row: int) -> dict:
+        start, end = self._name_offsets[row], self._name_offsets[row + 1]
+        return {
+            "id": self._ids[row],
+            "full_name": bytes(self._names[start:end]).decode(),
+            "is_active": bool(self._active[row]),
+        }
+
+    def player_id(self, row: int) -> int:
+        return self._ids[row]
+
+    def row_of(self, player_id: int) -> int | None:
+        """The player's dense row number (0..size-1), or None if not in the table."""
+        slot = _slot(player_id, self._table_size)
+        while True:
+            row = self._id_table[slot] - 1
+            if row < 0:
+                return None
+            if self._ids[row] == player_id:
+                return row
+            slot = (slot + 1) % self._table_size
+
+    def player_by_id(self, player_id: int) -> dict | None:
+        row = self.row_of(player_id)
+        return None if row is None else self.player(row)
+
+    def search(self, query: str, limit: int = 25, exclude: int = 0) -> list[dict]:
+        """
+        Players whose full name contains `query`, ignoring case and accents,
+        in nba_api's table order. One C-level find() per hit over the mapped blob.
+        `exclude` is a bitset of rows to skip (e.g. players owned in a league).
+        """
+        needle = fold(query.replace("\n", " ")).encode()
+        if not needle:
+            return []
+        found: list[dict] = []
+        pos = self._mm.find(needle, self._search_base, self._search_end)
+        while pos != -1 and len(found) < limit:
+            row = bisect.bisect_right(self._search_offsets, pos - self._search_base) - 1
+            if not exclude >> row & 1:
+                found.append(self.player(row))
+            # Skip to the next name so one player is never reported twice
+            pos = self._mm.find(needle, self._search_base + self._search_offsets[row + 1], self._search_end)
+        return found
+
+    # ---- teams ----
+
+    def team_by_abbreviation(self, abbreviation: str) -> Team | None:
+        return self._team_by_abbr.get(abbreviation.upper())
+
+    def team_by_id(self, team_id: int) -> Team | None:
+        return self._team_by_id.get(team_id)
+
+
+# ---------- Process-wide instance ----------
+
+_index: StaticIndex | None = None
+_lock = threading.Lock()
+
+
+def default_path() -> Path:
+    from django.conf import settings
+
+    from .reference import nba_api_version
+
+    directory = Path(getattr(settings, "STATIC_INDEX_DIR", settings.BASE_DIR / ".cache"))
+    return directory / f"nba_static-{nba_api_version()}.idx"
+
+
+def get() -> StaticIndex:
+    """
+    The mapped index, building the file first if this nba_api version has none.
+    Run `manage.py build_static_index` at deploy time so workers only ever map it.
+    """
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                path = default_path()
+                if not path.exists():
+                    build(path)
+                _index = StaticIndex(path)
+    return _index
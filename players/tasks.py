@@ -0,0 +1,34 @@
+# Background tasks for `manage.py run_jobs` (jobs/registry.py)
+
+from jobs.queue import enqueue
+from jobs.registry import task
+
+from . import warehouse
+from .models import SeasonBackfill
+
+
+@task("players.backfill_season", max_attempts=5, retry_base_seconds=300, lease_seconds=6 * 60 * 60, priority=-10)
+def backfill_season(season: str, season_type: str = warehouse.REGULAR_SEASON, window_days: int = 7,
+                    pause: float = 0.6):
+    # Checkpointed per date window, so a retry resumes where the failed attempt stopped
+    backfill = warehouse.backfill_season(
+        warehouse.parse_season(season), warehouse.parse_season_type(season_type),
+        window_days=max(1, window_days), pause=pause,
+    )
+    if backfill.status == SeasonBackfill.Status.COMPLETE:
+        # Analytics read the columnar copy; refresh it now that the season is loaded
+        enqueue("players.build_columnar", {"season": backfill.season, "season_type": backfill.season_type})
+    return {"status": backfill.status, "last_date": backfill.last_date, "rows_loaded": backfill.rows_loaded}
+
+
+@task("players.load_team_profiles", lease_seconds=60 * 60, priority=-10)
+def load_team_profiles(season: str | None = None):
+    return {"profiles": warehouse.load_team_profiles(warehouse.parse_season(season))}
+
+
+@task("players.build_columnar", lease_seconds=30 * 60, priority=-5)
+def build_columnar(season: str, season_type: str = warehouse.REGULAR_SEASON):
+    from . import columnar
+
+    path = columnar.build(warehouse.parse_season(season), warehouse.parse_season_type(season_type))
+    return {"path": str(path)}
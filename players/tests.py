@@ -1,3 +1,496 @@
-from django.test import TestCase
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from players import columnar, reference, similarity, static_index, warehouse
+from players.management.commands import bench_startup
+from players.models import PlayerGameLog, PlayerSeasonAggregate, SeasonBackfill
+from players.singleflight import SingleFlight
+
+
+class SingleFlightTests(SimpleTestCase):
+
+    def test_waiters_share_the_leaders_exception(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError("upstream down")
+
+        def call():
+            try:
+                flight.do("k", fail)
+            except RuntimeError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=call) for _ in range(5)]
+        for t in followers:
+            t.start()
+        for t in [leader, *followers]:
+            t.join()
+
+        self.assertEqual(len(errors), 6)
+        self.assertEqual(len({id(e) for e in errors}), 1)
+        self.assertEqual(flight.in_flight(), 0)
+
+
+class FakeRoster:
+    """Stands in for nba_api's CommonTeamRoster: slow, and counts how often it is built."""
+    calls = 0
+    lock = threading.Lock()
+
+    def __init__(self, team_id, season, timeout):
+        with FakeRoster.lock:
+            FakeRoster.calls += 1
+        time.sleep(0.3)
+        self.common_team_roster = SimpleNamespace(get_dict=lambda: {
+            "headers": ["PLAYER_ID", "PLAYER", "POSITION", "NUM"],
+            "data": [[2544, "LeBron James", "F", "23"]],
+        })
+
+
+@override_settings(API_THROTTLE_BURST=1000)
+class TeamRosterCoalescingTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        FakeRoster.calls = 0
+
+    def test_concurrent_identical_requests_make_one_upstream_call(self):
+        barrier = threading.Barrier(100)
+        statuses = []
+
+        def request():
+            try:
+                barrier.wait()
+                response = APIClient().get("/api/teams/LAL/roster/?season=2019-20")
+                statuses.append((response.status_code, response.data["players"][0]["player_id"]))
+            finally:
+                connections.close_all()
+
+        with mock.patch("players.upstream.endpoints", return_value=SimpleNamespace(CommonTeamRoster=FakeRoster)):
+            threads = [threading.Thread(target=request) for _ in range(100)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(FakeRoster.calls, 1)
+        self.assertEqual(statuses, [(200, 2544)] * 100)
+
+
+@override_settings(API_THROTTLE_BURST=3, API_THROTTLE_RATE=1.0)
+class TokenBucketThrottleTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_burst_then_429_with_retry_after(self):
+        client = APIClient()
+        codes = [client.get("/api/teams/").status_code for _ in range(4)]
+
+        self.assertEqual(codes, [200, 200, 200, 429])
+        self.assertIn("Retry-After", client.get("/api/teams/").headers)
+
+    def test_clients_have_separate_buckets(self):
+        for _ in range(3):
+            APIClient(REMOTE_ADDR="10.0.0.1").get("/api/teams/")
+
+        self.assertEqual(APIClient(REMOTE_ADDR="10.0.0.1").get("/api/teams/").status_code, 429)
+        self.assertEqual(APIClient(REMOTE_ADDR="10.0.0.2").get("/api/teams/").status_code, 200)
+
+
+@override_settings(API_THROTTLE_BURST=1000)
+class ColumnarStoreTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.enterContext(override_settings(COLUMNAR_DIR=Path(tmp.name)))
+        games = [
+            # player, day, matchup, wl, pts
+            (2, 1, "BOS vs. NYK", "W", 30),
+            (1, 3, "LAL @ BOS", "L", 10),
+            (1, 1, "LAL vs. GSW", "W", 20),
+            (1, 2, "LAL vs. PHX", "W", 30),
+            (1, 5, "LAL @ DEN", "W", 40),
+        ]
+        PlayerGameLog.objects.bulk_create([
+            PlayerGameLog(season="2024-25", player_id=pid, game_id=f"g{i}", game_date=date(2025, 1, day),
+                          matchup=matchup, wl=wl, pts=pts, fantasy_points=pts)
+            for i, (pid, day, matchup, wl, pts) in enumerate(games)
+        ])
+
+    def test_endpoints_read_built_columns(self):
+        client = APIClient()
+        self.assertEqual(client.get("/api/players/1/analytics/?season=2024-25").status_code, 404)
+        call_command("build_columnar", "2024-25", stdout=StringIO())
+
+        data = client.get("/api/players/1/analytics/?season=2024-25").data
+        self.assertEqual(data["averages"]["games"], 4)
+        self.assertEqual(data["averages"]["pts_avg"], 25.0)
+        self.assertEqual((data["splits"]["home"]["games"], data["splits"]["home"]["pts_avg"]), (2, 25.0))
+        self.assertEqual((data["splits"]["losses"]["games"], data["splits"]["losses"]["pts_avg"]), (1, 10.0))
+        self.assertEqual(
+            client.get("/api/players/1/analytics/?season=2024-25&last=2").data["averages"]["pts_avg"], 25.0,
+        )
+        self.assertEqual(
+            client.get("/api/players/1/analytics/?season=2024-25&date_from=2025-01-02&date_to=2025-01-03")
+            .data["averages"]["pts_avg"], 20.0,
+        )
+
+        rolling = client.get("/api/players/1/rolling/?season=2024-25&stat=pts&window=2").data["games"]
+        self.assertEqual([g["pts"] for g in rolling], [20.0, 30.0, 10.0, 40.0])
+        self.assertEqual([g["rolling_avg"] for g in rolling], [None, 25.0, 20.0, 25.0])
+
+        leaders = client.get("/api/players/leaders/?season=2024-25&stat=pts").data["leaders"]
+        self.assertEqual([(p["player_id"], p["pts_avg"]) for p in leaders], [(2, 30.0), (1, 25.0)])
+        leaders = client.get("/api/players/leaders/?season=2024-25&stat=pts&min_games=2").data["leaders"]
+        self.assertEqual([p["player_id"] for p in leaders], [1])
+
+
+    def test_rebuild_switches_the_whole_store_at_once(self):
+        columnar.build("2024-25", "Regular Season")
+        before = columnar.get("2024-25", "Regular Season")
+        path = columnar.season_path("2024-25", "Regular Season")
+        self.assertTrue(path.is_symlink())
+
+        PlayerGameLog.objects.filter(player_id=1).update(pts=0)
+        for _ in range(3):
+            columnar.build("2024-25", "Regular Season")
+            # The link always names a complete build
+            self.assertTrue((path / "meta.json").exists())
+
+        after = columnar.get("2024-25", "Regular Season")
+        self.assertIsNot(after, before)
+        self.assertEqual(columnar.averages(after, after.span(1), ("pts",))["pts_avg"], 0.0)
+        # A reader that opened the first build keeps reading it, even though its directory is gone
+        self.assertFalse(before.path.exists())
+        self.assertEqual(columnar.averages(before, before.span(1), ("pts",))["pts_avg"], 25.0)
+        # Only the current build and the one it replaced stay on disk
+        self.assertEqual(len(list(path.parent.glob(f"{path.name}.v*"))), 2)
+
+    def test_store_from_before_versioned_builds(self):
+        columnar.build("2024-25", "Regular Season")
+        path = columnar.season_path("2024-25", "Regular Season")
+        legacy = path.with_name("legacy")
+        shutil.copytree(path.resolve(), legacy)
+        path.unlink()
+        legacy.rename(path)
+
+        self.assertEqual(columnar.get("2024-25", "Regular Season").meta["rows"], 5)
+        columnar.build("2024-25", "Regular Season")
+        self.assertTrue(path.is_symlink())
+        self.assertEqual(columnar.get("2024-25", "Regular Season").meta["rows"], 5)
+
+class FakeLeagueGameLog:
+    """Stands in for nba_api's LeagueGameLog; serves `games` filtered to the requested window."""
+    games: list[dict] = []
+    windows: list[tuple[date, date]] = []
+
+    def __init__(self, date_from_nullable, date_to_nullable, **kwargs):
+        date_from = datetime.strptime(date_from_nullable, "%m/%d/%Y").date()
+        date_to = datetime.strptime(date_to_nullable, "%m/%d/%Y").date()
+        FakeLeagueGameLog.windows.append((date_from, date_to))
+        rows = [g for g in FakeLeagueGameLog.games if date_from <= date.fromisoformat(g["GAME_DATE"]) <= date_to]
+        self.get_normalized_dict = lambda: {"LeagueGameLog": rows}
+
+
+class SeasonBackfillTests(TestCase):
+
+    def setUp(self):
+        FakeLeagueGameLog.windows = []
+        FakeLeagueGameLog.games = [
+            {"PLAYER_ID": 1, "GAME_ID": "g1", "GAME_DATE": "2026-10-18", "MATCHUP": "LAL vs. GSW", "PTS": 20},
+        ]
+        self.enterContext(mock.patch("players.upstream.endpoints",
+                                     return_value=SimpleNamespace(LeagueGameLog=FakeLeagueGameLog)))
+
+    def backfill(self, today):
+        class Today(date):
+            @classmethod
+            def today(cls):
+                return today
+
+        with mock.patch("players.warehouse.date", Today):
+            return warehouse.backfill_season("2026-27", window_days=30, pause=0)
+
+    def test_current_season_refetches_today_on_the_next_run(self):
+        backfill = self.backfill(date(2026, 10, 19))
+        self.assertEqual(backfill.last_date, date(2026, 10, 18))
+        self.assertEqual(backfill.status, SeasonBackfill.Status.RUNNING)
+
+        # A game played later on the 19th is picked up by the next run
+        FakeLeagueGameLog.games.append(
+            {"PLAYER_ID": 1, "GAME_ID": "g2", "GAME_DATE": "2026-10-19", "MATCHUP": "LAL @ PHX", "PTS": 30},
+        )
+        FakeLeagueGameLog.windows = []
+        backfill = self.backfill(date(2026, 10, 20))
+
+        self.assertEqual(FakeLeagueGameLog.windows, [(date(2026, 10, 19), date(2026, 10, 20))])
+        self.assertEqual(backfill.last_date, date(2026, 10, 19))
+        self.assertEqual(sorted(PlayerGameLog.objects.values_list("game_id", flat=True)), ["g1", "g2"])
+
+
+@override_settings(API_THROTTLE_BURST=1000)
+class ReferenceCachingTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_team_list_is_built_at_startup_when_the_index_exists(self):
+        reference.team_list.cache_clear()
+        with mock.patch("players.static_index.default_path", return_value=Path(tempfile.gettempdir()) / "missing.idx"):
+            self.assertFalse(reference.warm())
+        self.assertEqual(reference.team_list.cache_info().currsize, 0)
+
+        with mock.patch("players.static_index.default_path", return_value=Path(__file__)):
+            apps.get_app_config("players").ready()
+        self.assertEqual(reference.team_list.cache_info().currsize, 1)
+
+    def test_etag_revalidation(self):
+        client = APIClient()
+        first = client.get("/api/teams/")
+        etag = first.headers["ETag"]
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("max-age=86400", first.headers["Cache-Control"])
+
+        for header in (etag, "W/" + etag, f'"other", {etag}', "*"):
+            res = client.get("/api/teams/", HTTP_IF_NONE_MATCH=header)
+            self.assertEqual((res.status_code, res.content, res.headers["ETag"]), (304, b"", etag), header)
+        self.assertEqual(client.get("/api/teams/", HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_compression_negotiation(self):
+        client = APIClient()
+        plain = client.get("/api/teams/")
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertIn("Accept-Encoding", plain.headers["Vary"])
+
+        zipped = client.get("/api/teams/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(zipped.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(zipped.content), plain.content)
+        self.assertEqual(zipped.headers["ETag"], "W/" + plain.headers["ETag"])
+        self.assertEqual(int(zipped.headers["Content-Length"]), len(zipped.content))
+        # The weakened tag still revalidates
+        res = client.get("/api/teams/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=zipped.headers["ETag"])
+        self.assertEqual(res.status_code, 304)
+
+        self.assertNotIn("Content-Encoding", client.get("/api/teams/", HTTP_ACCEPT_ENCODING="identity").headers)
+        with override_settings(COMPRESS_MIN_BYTES=10**9):
+            self.assertNotIn("Content-Encoding", APIClient().get("/api/teams/", HTTP_ACCEPT_ENCODING="gzip").headers)
+
+
+class StaticIndexTests(SimpleTestCase):
+    """The mapped index answers the same as nba_api's own tables."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.mkdtemp()
+        with override_settings(STATIC_INDEX_DIR=cls.tmp):
+            cls.path = static_index.build(static_index.default_path())
+        cls.index = static_index.StaticIndex(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_file_is_versioned_and_checked(self):
+        self.assertEqual(self.path.name, f"nba_static-{reference.nba_api_version()}.idx")
+        self.assertEqual(self.index.nba_api_version, reference.nba_api_version())
+        bad = Path(self.tmp) / "bad.idx"
+        bad.write_bytes(b"not an index")
+        with self.assertRaises(ValueError):
+            static_index.StaticIndex(bad)
+
+    def test_rows_match_nba_api(self):
+        from nba_api.stats.static import players as nba_players, teams as nba_teams
+
+        expected = nba_players.get_players()
+        self.assertEqual(self.index.size, len(expected))
+        for row, p in enumerate(expected):
+            self.assertEqual(self.index.row_of(p["id"]), row)
+            self.assertEqual(self.index.player(row),
+                             {"id": p["id"], "full_name": p["full_name"], "is_active": p["is_active"]})
+        self.assertIsNone(self.index.row_of(1))
+        self.assertIsNone(self.index.player_by_id(1))
+
+        self.assertEqual([t.as_dict() for t in self.index.teams], nba_teams.get_teams())
+        self.assertEqual(self.index.team_by_abbreviation("gsw").full_name, "Golden State Warriors")
+        self.assertIsNone(self.index.team_by_id(1))
+
+    def test_search_matches_nba_api(self):
+        from nba_api.stats.static import players as nba_players
+
+        for query in ("james", "JOKIC", "Dončić", "o'n", "a"):
+            expected = [p["id"] for p in nba_players.find_players_by_full_name(query)]
+            found = [p["id"] for p in self.index.search(query, limit=10_000)]
+            self.assertEqual(found, expected, query)
+        self.assertEqual(self.index.search("jokic"), [self.index.player_by_id(203999)])
+        self.assertEqual(self.index.search(""), [])
+        self.assertEqual(self.index.search("xqzv"), [])
+        self.assertEqual(len(self.index.search("a", limit=7)), 7)
+
+    def test_search_skips_excluded_rows(self):
+        everyone = [p["id"] for p in self.index.search("james", limit=10_000)]
+        owned = 1 << self.index.row_of(2544)
+        found = [p["id"] for p in self.index.search("james", limit=10_000, exclude=owned)]
+        self.assertEqual(found, [pid for pid in everyone if pid != 2544])
+        # Excluded rows don't count toward the limit
+        self.assertEqual(len(self.index.search("james", limit=3, exclude=owned)), 3)
+
+
+class StartupImportTests(SimpleTestCase):
+    HEAVY = ("nba_api.stats.endpoints", "pandas", "numpy")
+
+    def loaded_after(self, code: str, **env) -> list[str]:
+        probe = f"import sys\n{code}\nprint(','.join(m for m in {self.HEAVY!r} if m in sys.modules))"
+        proc = subprocess.run(
+            [sys.executable, "-c", probe], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "accounts.settings", **env},
+        )
+        return [m for m in proc.stdout.strip().split(",") if m]
+
+    def test_loading_every_view_imports_no_heavy_module(self):
+        code = "import django\ndjango.setup()\nfrom django.urls import get_resolver\nget_resolver().url_patterns"
+        self.assertEqual(self.loaded_after(code, PLAYERS_WARMUP=""), [])
+
+    def test_warmup_preloads_nba_api_at_worker_start(self):
+        loaded = self.loaded_after("import accounts.wsgi", PLAYERS_WARMUP="1")
+        self.assertIn("nba_api.stats.endpoints", loaded)
+        self.assertIn("pandas", loaded)
+
+    def test_parse_importtime(self):
+        stderr = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |     encodings",
+            "import time:       200 |        900 |   pandas",
+            "import time:        50 |         50 | django",
+            "not an importtime line",
+        ])
+        total, modules = bench_startup.parse_importtime(stderr)
+        self.assertEqual(total, 50)
+        self.assertEqual(modules, {"encodings": 100, "pandas": 900, "django": 50})
+
+
+@override_settings(API_THROTTLE_BURST=1000, SIMILARITY_MIN_GAMES=10)
+class SimilarityTests(TestCase):
+    # (player, pts, reb, ast): two scorers, two bigs, two passers
+    PROFILES = [(1, 30, 5, 4), (2, 28, 6, 5), (3, 10, 13, 2), (4, 12, 12, 1), (5, 12, 4, 11), (6, 14, 5, 10)]
+
+    def setUp(self):
+        cache.clear()
+        similarity.reset_index()
+        self.addCleanup(similarity.reset_index)
+        PlayerSeasonAggregate.objects.bulk_create([
+            PlayerSeasonAggregate(season="2024-25", player_id=pid, games=60, minutes_avg=34,
+                                  pts_avg=pts, reb_avg=reb, ast_avg=ast)
+            for pid, pts, reb, ast in self.PROFILES
+        ] + [PlayerSeasonAggregate(season="2024-25", player_id=7, games=3, pts_avg=30, reb_avg=5, ast_avg=4)])
+
+    def test_nearest_profiles(self):
+        res = APIClient().get("/api/players/1/similar/?season=2024-25&k=2")
+        self.assertEqual(res.data["pool_size"], 6)  # player 7 has too few games
+        self.assertEqual([m["player_id"] for m in res.data["similar"]], [2, 6])
+        self.assertEqual(APIClient().get("/api/players/7/similar/?season=2024-25").status_code, 404)
+
+        compare = APIClient().get("/api/players/compare/?season=2024-25&ids=3,4,5").data
+        self.assertEqual([p["player_id"] for p in compare["players"]], [3, 4, 5])
+        self.assertAlmostEqual(compare["similarity"][0][0], 1.0, places=3)
+        self.assertGreater(compare["similarity"][0][1], compare["similarity"][0][2])
+
+    def test_incremental_update_matches_a_rebuild(self):
+        self.enterContext(mock.patch.object(similarity, "REBUILD_FRACTION", 0.5))
+        index = similarity.get_index()
+        mean, std = index.mean.copy(), index.std.copy()
+
+        # Player 3 turns into a passer, and a new season appears
+        later = timezone.now() + timedelta(seconds=1)
+        PlayerSeasonAggregate.objects.filter(player_id=3).update(pts_avg=13, reb_avg=4, ast_avg=10, updated_at=later)
+        PlayerSeasonAggregate.objects.create(season="2023-24", player_id=1, games=50, minutes_avg=34,
+                                             pts_avg=29, reb_avg=5, ast_avg=4, updated_at=later)
+
+        updated = similarity.get_index()
+        self.assertIs(updated, index)
+        self.assertEqual(updated.updated_rows, 2)
+        self.assertEqual(len(updated.seasons), 7)
+
+        # Same rows as a fresh build with the same mean/std, and the same neighbours
+        rebuilt = similarity.SimilarityIndex.build()
+        rebuilt.mean, rebuilt.std = mean, std
+        raw = np.array([[a[f] for f in similarity.FEATURES] for a in similarity._aggregate_rows()])
+        rebuilt.matrix = rebuilt._vectors(raw)
+        for key, row in rebuilt.rows.items():
+            np.testing.assert_allclose(updated.matrix[updated.rows[key]], rebuilt.matrix[row], atol=1e-6)
+        for pid in (1, 3, 5):
+            self.assertEqual(updated.nearest(pid, "2024-25", k=3), rebuilt.nearest(pid, "2024-25", k=3))
+        # Now a passer, so the passers are closest
+        self.assertEqual({m["player_id"] for m in updated.nearest(3, "2024-25", k=2)}, {5, 6})
+
+    def test_compare_skips_index_rows_without_an_aggregate(self):
+        similarity.get_index()
+        # Deleting doesn't move the watermark, so the index keeps player 4's row
+        PlayerSeasonAggregate.objects.filter(player_id=4).delete()
+        res = APIClient().get("/api/players/compare/?season=2024-25&ids=3,4,5")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([p["player_id"] for p in res.data["players"]], [3, 5])
+        self.assertEqual(len(res.data["similarity"]), 2)
+        self.assertEqual(res.data["missing"], [4])
+
+    def test_rows_written_at_the_watermark_time_are_not_skipped(self):
+        at = timezone.now() + timedelta(seconds=1)
+        PlayerSeasonAggregate.objects.filter(player_id=1).update(updated_at=at)
+        index = similarity.get_index()
+        self.assertEqual(index.built_through[0], at)
+
+        PlayerSeasonAggregate.objects.create(season="2023-24", player_id=1, games=50, minutes_avg=34,
+                                             pts_avg=29, reb_avg=5, ast_avg=4, updated_at=at)
+        self.assertIs(similarity.get_index(), index)
+        self.assertIsNotNone(index.vector(1, "2023-24"))
+        self.assertEqual(index.updated_rows, 1)
+
+    def test_up_to_date_index_is_returned_without_the_lock(self):
+        index = similarity.get_index()
+        with mock.patch.object(similarity, "_lock") as lock:
+            self.assertIs(similarity.get_index(), index)
+        lock.__enter__.assert_not_called()
+
+    def test_many_updates_trigger_a_rebuild(self):
+        index = similarity.get_index()
+        PlayerSeasonAggregate.objects.filter(player_id__in=[1, 2]).update(
+            pts_avg=F("pts_avg") + 5, updated_at=timezone.now() + timedelta(seconds=1),
+        )
+        rebuilt = similarity.get_index()
+        self.assertIsNot(rebuilt, index)  # 2 of 6 rows is past REBUILD_FRACTION
+        self.assertEqual(rebuilt.updated_rows, 0)
+        self.assertNotEqual(rebuilt.mean[similarity.FEATURES.index("pts_avg")],
+                            index.mean[similarity.FEATURES.index("pts_avg")])
@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Per-client token bucket for the players/teams API. Each client (user id
+    when logged in, otherwise IP) gets API_THROTTLE_BURST tokens, refilled at
+    API_THROTTLE_RATE tokens per second; each request spends one.
+
+    Bucket state lives in the shared cache, so the limit holds across workers.
+    The read-modify-write is not atomic, so two simultaneous requests can
+    occasionally both spend the last token; that slack is accepted over a lock.
+    """
+    cache_prefix = "throttle:players"
+
+    def __init__(self):
+        self.burst = float(getattr(settings, "API_THROTTLE_BURST", 30))
+        self.rate = float(getattr(settings, "API_THROTTLE_RATE", 5.0))
+        self._wait = None
+
+    def client_key(self, request) -> str:
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return f"{self.cache_prefix}:user:{user.pk}"
+        return f"{self.cache_prefix}:ip:{self.get_ident(request)}"
+
+    def allow_request(self, request, view) -> bool:
+        if self.burst <= 0:
+            return True
+        key = self.client_key(request)
+        now = time.time()  # wall clock: buckets are shared between processes
+        tokens, updated = cache.get(key) or (self.burst, now)
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+        if tokens < 1:
+            self._wait = (1 - tokens) / self.rate if self.rate > 0 else None
+            cache.set(key, (tokens, now), timeout=self._idle_timeout())
+            return False
+
+        cache.set(key, (tokens - 1, now), timeout=self._idle_timeout())
+        return True
+
+    def wait(self):
+        return self._wait
+
+    def _idle_timeout(self) -> int | None:
+        # After this long the bucket would be full again anyway. A bucket that
+        # never refills (rate 0) is kept for good: None is "no expiry" to the cache
+        return int(self.burst / self.rate) + 1 if self.rate > 0 else None
@@ -0,0 +1,48 @@
+"""
+Lazy access to nba_api.
+
+Importing any nba_api endpoint imports the whole endpoints package and pandas
+(about half a second), so nothing imports nba_api at module level. Views and the
+game-log store call these accessors instead; the first call pays the import,
+later calls hit sys.modules. Set PLAYERS_WARMUP=1 to pay it at worker start.
+
+The static player/team tables are not read from nba_api at runtime; see
+static_index, which maps a prebuilt copy of them.
+"""
+import time
+from importlib import import_module
+
+from . import reference, static_index
+
+
+def endpoints():
+    """nba_api.stats.endpoints, e.g. endpoints().PlayerGameLog(...)"""
+    return import_module("nba_api.stats.endpoints")
+
+
+def live_endpoints():
+    """nba_api.live.nba.endpoints (scoreboard, boxscore) for in-progress games."""
+    return import_module("nba_api.live.nba.endpoints")
+
+
+def warm_up() -> dict[str, float]:
+    """
+    Import nba_api endpoints (and pandas), map the static player/team index
+    and build the /api/teams/ payload.
+    Returns seconds spent per step.
+    """
+    timings = {}
+
+    started = time.perf_counter()
+    endpoints()
+    timings["endpoints"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    static_index.get()
+    timings["static_index"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    reference.team_list()
+    timings["team_list"] = time.perf_counter() - started
+
+    return timings
@@ -1,14 +1,26 @@
 from django.urls import path
 from .views import (
     PlayerDetail,
+    PlayerSeasons,
+    PlayerSimilar,
+    PlayerCompare,
     PlayerSearch,
+    PlayerAnalytics,
+    PlayerRolling,
+    StatLeaders,
     TeamList,
     TeamRoster,
 )
 
 urlpatterns = [
     path("players/search/", PlayerSearch.as_view()),
+    path("players/compare/", PlayerCompare.as_view()),
+    path("players/leaders/", StatLeaders.as_view()),
     path("players/<int:player_id>/", PlayerDetail.as_view()),
+    path("players/<int:player_id>/seasons/", PlayerSeasons.as_view()),
+    path("players/<int:player_id>/similar/", PlayerSimilar.as_view()),
+    path("players/<int:player_id>/analytics/", PlayerAnalytics.as_view()),
+    path("players/<int:player_id>/rolling/", PlayerRolling.as_view()),
     path("teams/", TeamList.as_view()),
     path("teams/<str:team_abbr>/roster/", TeamRoster.as_view()),
 ]
@@ -1,12 +1,18 @@
+import time
 from datetime import date, datetime
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from nba_api.stats.endpoints import commonplayerinfo, playergamelog, commonteamroster
-from nba_api.stats.static import players as static_players
-from nba_api.stats.static import teams as static_teams
+from . import reference, static_index, upstream, warehouse
+from .singleflight import upstream_flight
+from .throttling import TokenBucketThrottle
+from .models import PlayerProfile, PlayerSeasonAggregate
 
 
 # ---------- Helper functions ----------
@@ -27,42 +33,84 @@ def compute_age(birthdate: date | None) -> int | None:
     )
 
 
+def parse_date_param(raw: str | None) -> date | None:
+    raw = (raw or "").strip()
+    return date.fromisoformat(raw) if raw else None
+
+
+def season_params(request) -> tuple[str, str]:
+    """?season=2023-24&season_type=Playoffs, defaulting to the configured regular season."""
+    return (
+        warehouse.parse_season(request.query_params.get("season")),
+        warehouse.parse_season_type(request.query_params.get("season_type")),
+    )
+
+
+def format_game_date(d: date) -> str:
+    # Same shape nba_api's PlayerGameLog uses, e.g. "APR 13, 2025"
+    return d.strftime("%b %d, %Y").upper()
+
+
+def fetch_player_info(player_id: int) -> dict:
+    info = upstream.endpoints().CommonPlayerInfo(
+        player_id=player_id,
+        timeout=60,
+    )
+    return info.get_normalized_dict()["CommonPlayerInfo"][0]
+
+
+def profile_names(player_ids) -> dict[int, str]:
+    return dict(PlayerProfile.objects.filter(player_id__in=list(player_ids)).values_list("player_id", "name"))
+
+
 # ---------- Views: Players ----------
 
 class PlayerDetail(APIView):
     """
     GET /api/players/<player_id>/
+    GET /api/players/<player_id>/?season=2022-23&date_from=2023-01-01&date_to=2023-01-31
     Returns full player profile + recent games + average points
+
+    Game logs come from the local store; a season is pulled from nba_api
+    only the first time it is requested (or when the current season is stale).
     """
+    throttle_classes = [TokenBucketThrottle]
 
     def get(self, request, player_id: int):
+        try:
+            season, season_type = season_params(request)
+            date_from = parse_date_param(request.query_params.get("date_from"))
+            date_to = parse_date_param(request.query_params.get("date_to"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             # ---- Player profile ----
-            info = commonplayerinfo.CommonPlayerInfo(
-                player_id=player_id,
-                timeout=60,
-            )
-            df = info.common_player_info.get_data_frame()
-            row = df.iloc[0].to_dict()
+            # Concurrent requests for the same player share one upstream call
+            row = upstream_flight.do(("player_info", player_id), lambda: fetch_player_info(player_id))
 
             birthdate = parse_birthdate(row.get("BIRTHDATE"))
             age = compute_age(birthdate)
 
             # ---- Game log ----
-            gl = playergamelog.PlayerGameLog(
-                player_id=player_id,
-                season="2024-25",
-                season_type_all_star="Regular Season",
-                timeout=60,
+            upstream_flight.do(
+                ("player_season", player_id, season, season_type),
+                lambda: warehouse.ensure_player_season(player_id, season, season_type),
             )
-            df_log = gl.get_data_frames()[0]
+            logs = warehouse.game_logs(player_id, season, season_type, date_from, date_to)
 
-            recent_games = (
-                df_log[["GAME_DATE", "MATCHUP", "PTS"]]
-                .head(10)
-                .to_dict(orient="records")
-            )
-            avg_pts = float(df_log["PTS"].mean()) if len(df_log) else 0.0
+            recent_games = [
+                {"GAME_DATE": format_game_date(g.game_date), "MATCHUP": g.matchup, "PTS": g.pts}
+                for g in logs[:10]
+            ]
+            avg_pts = logs.aggregate(avg=Avg("pts"))["avg"] or 0.0
+
+            warehouse.store_profiles([{
+                "player_id": int(row.get("PERSON_ID")),
+                "name": row.get("DISPLAY_FIRST_LAST") or "",
+                "position": row.get("POSITION") or "",
+                "team_abbreviation": row.get("TEAM_ABBREVIATION") or "",
+            }])
 
             payload = {
                 "player_id": int(row.get("PERSON_ID")),
@@ -77,6 +125,8 @@ class PlayerDetail(APIView):
                     "name": row.get("TEAM_NAME"),
                     "abbreviation": row.get("TEAM_ABBREVIATION"),
                 },
+                "season": season,
+                "season_type": season_type,
                 "recent_games": recent_games,
                 "avg_pts": round(avg_pts, 2),
             }
@@ -90,11 +140,156 @@ class PlayerDetail(APIView):
             )
 
 
+class PlayerSeasons(APIView):
+    """
+    GET /api/players/<player_id>/seasons/?seasons=2022-23,2023-24,2024-25
+    Returns precomputed per-season averages for side-by-side comparison.
+    Reads the local store only; seasons not loaded yet are listed in "missing"
+    (load them with `python manage.py backfill_season <season>`).
+    """
+    throttle_classes = [TokenBucketThrottle]
+
+    def get(self, request, player_id: int):
+        raw = request.query_params.get("seasons") or ""
+        try:
+            season_type = warehouse.parse_season_type(request.query_params.get("season_type"))
+            seasons = [warehouse.parse_season(s) for s in raw.split(",") if s.strip()]
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not seasons:
+            return Response(
+                {"error": "Missing query parameter: seasons"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        found = warehouse.season_aggregates(player_id, seasons, season_type)
+        payload = {
+            "player_id": player_id,
+            "season_type": season_type,
+            "seasons": [
+                {
+                    "season": a.season,
+                    "games": a.games,
+                    **{f"{stat}_avg": getattr(a, f"{stat}_avg") for stat in warehouse.AGGREGATE_STATS},
+                }
+                for a in (found[s] for s in seasons if s in found)
+            ],
+            "missing": [s for s in seasons if s not in found],
+        }
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class PlayerSimilar(APIView):
+    """
+    GET /api/players/<player_id>/similar/?season=2024-25&k=10&within=2024-25
+    The k player-seasons whose per-game stat profile is closest (cosine over
+    z-scored averages) to this player's season, across every stored season
+    unless `within` limits it to one. Served from an in-memory index.
+    """
+    throttle_classes = [TokenBucketThrottle]
+
+    def get(self, request, player_id: int):
+        try:
+            season = warehouse.parse_season(request.query_params.get("season"))
+            within = request.query_params.get("within")
+            within = warehouse.parse_season(within) if within else None
+            k = int(request.query_params.get("k") or 10)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= k <= 100:
+            return Response({"error": "k must be between 1 and 100"}, status=status.HTTP_400_BAD_REQUEST)
+
+        from . import similarity  # imports NumPy; kept off the startup path
+
+        started = time.perf_counter()
+        index = similarity.get_index()
+        if index.vector(player_id, season) is None:
+            return Response(
+                {"error": f"No stored {season} season with at least {similarity.min_games()} games for player {player_id}"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        matches = index.nearest(player_id, season, k=k, within_season=within)
+        names = profile_names(m["player_id"] for m in matches)
+        for m in matches:
+            m["name"] = names.get(m["player_id"])
+
+        return Response(
+            {
+                "player_id": player_id,
+                "season": season,
+                "pool_size": len(index.seasons),
+                "similar": matches,
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class PlayerCompare(APIView):
+    """
+    GET /api/players/compare/?ids=2544,201939,203999&season=2024-25
+    Side-by-side per-game averages, z-scores against the stored pool, and
+    pairwise cosine similarity for up to 10 players.
+    """
+    throttle_classes = [TokenBucketThrottle]
+
+    def get(self, request):
+        try:
+            season = warehouse.parse_season(request.query_params.get("season"))
+            ids = [int(x) for x in (request.query_params.get("ids") or "").split(",") if x.strip()]
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not 2 <= len(ids) <= 10:
+            return Response({"error": "ids must list 2 to 10 player ids"}, status=status.HTTP_400_BAD_REQUEST)
+
+        from . import similarity
+
+        index = similarity.get_index()
+        indexed = [pid for pid in ids if index.vector(pid, season) is not None]
+        aggregates = {
+            a.player_id: a
+            for a in PlayerSeasonAggregate.objects.filter(
+                season=season, season_type=warehouse.REGULAR_SEASON, player_id__in=indexed,
+            )
+        }
+        # The index can still hold a row whose aggregate has since been deleted
+        found = [pid for pid in indexed if pid in aggregates]
+        names = profile_names(found)
+
+        vectors = [index.vector(pid, season) for pid in found]
+        players = []
+        for pid in found:
+            a = aggregates[pid]
+            raw = [getattr(a, f) for f in similarity.FEATURES]
+            players.append({
+                "player_id": pid,
+                "name": names.get(pid),
+                "games": a.games,
+                "stats": dict(zip(similarity.FEATURES, raw)),
+                "z_scores": {
+                    f: round(float((v - m) / sd), 2)
+                    for f, v, m, sd in zip(similarity.FEATURES, raw, index.mean, index.std)
+                },
+            })
+
+        return Response(
+            {
+                "season": season,
+                "players": players,
+                "similarity": [[round(float(u @ v), 4) for v in vectors] for u in vectors],
+                "missing": [pid for pid in ids if pid not in aggregates],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class PlayerSearch(APIView):
     """
     GET /api/players/search/?q=lebron
     Returns matching players with player_id + name
     """
+    throttle_classes = [TokenBucketThrottle]
 
     def get(self, request):
         q = (request.query_params.get("q") or "").strip()
@@ -104,18 +299,169 @@ class PlayerSearch(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        matches = static_players.find_players_by_full_name(q)
+        # Results only change with the bundled nba_api player table, so the
+        # ETag is known before searching
+        etag = reference.make_etag("search", q.lower(), reference.nba_api_version())
+        return reference.reference_response(
+            request, etag, settings.REFERENCE_MAX_AGE,
+            lambda: cache.get_or_set(f"players:search:{etag}", lambda: self._search(q), settings.REFERENCE_MAX_AGE),
+        )
 
-        results = [
-            {
-                "player_id": int(p["id"]),
-                "name": p["full_name"],
-                "is_active": bool(p.get("is_active")),
-            }
-            for p in matches[:25]
+    def _search(self, q: str) -> list[dict]:
+        return [
+            {"player_id": p["id"], "name": p["full_name"], "is_active": p["is_active"]}
+            for p in static_index.get().search(q, limit=25)
         ]
 
-        return Response(results, status=status.HTTP_200_OK)
+
+# ---------- Views: Analytics ----------
+
+def _not_built(season: str, season_type: str) -> Response:
+    return Response(
+        {"error": f"No columnar store for {season} {season_type}; run `python manage.py build_columnar {season}`"},
+        status=status.HTTP_404_NOT_FOUND,
+    )
+
+
+def _stat_param(request, default: str) -> str:
+    from .columnar import STATS
+
+    stat = (request.query_params.get("stat") or default).strip().lower()
+    if stat not in STATS:
+        raise ValueError(f"stat must be one of: {', '.join(STATS)}")
+    return stat
+
+
+class PlayerAnalytics(APIView):
+    """
+    GET /api/players/<player_id>/analytics/?season=2024-25&last=10
+    GET /api/players/<player_id>/analytics/?date_from=2025-01-01&date_to=2025-01-31
+    Per-game averages over the selected games, split home/away, wins/losses
+    and by month. Served from the memory-mapped columnar store.
+    """
+    throttle_classes = [TokenBucketThrottle]
+
+    def get(self, request, player_id: int):
+        try:
+            season, season_type = season_params(request)
+            date_from = parse_date_param(request.query_params.get("date_from"))
+            date_to = parse_date_param(request.query_params.get("date_to"))
+            last = int(request.query_params.get("last") or 0)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if last < 0:
+            return Response({"error": "last must be a positive number of games"}, status=status.HTTP_400_BAD_REQUEST)
+
+        from . import columnar  # imports NumPy; kept off the startup path
+
+        store = columnar.get(season, season_type)
+        if store is None:
+            return _not_built(season, season_type)
+
+        started = time.perf_counter()
+        rows = store.span(player_id, date_from, date_to, last=last or None)
+        if rows is None:
+            return Response(
+                {"error": f"No stored {season} {season_type} games for player {player_id}"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(
+            {
+                "player_id": player_id,
+                "season": season,
+                "season_type": season_type,
+                "averages": columnar.averages(store, rows),
+                "splits": columnar.splits(store, rows),
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class PlayerRolling(APIView):
+    """
+    GET /api/players/<player_id>/rolling/?season=2024-25&stat=pts&window=5
+    Every game's value of `stat` with the average of the `window` games
+    ending with it, oldest first.
+    """
+    throttle_classes = [TokenBucketThrottle]
+
+    def get(self, request, player_id: int):
+        try:
+            season, season_type = season_params(request)
+            stat = _stat_param(request, "fantasy_points")
+            window = int(request.query_params.get("window") or 5)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= window <= 82:
+            return Response({"error": "window must be between 1 and 82"}, status=status.HTTP_400_BAD_REQUEST)
+
+        from . import columnar  # imports NumPy; kept off the startup path
+
+        store = columnar.get(season, season_type)
+        if store is None:
+            return _not_built(season, season_type)
+
+        rows = store.span(player_id)
+        if rows is None:
+            return Response(
+                {"error": f"No stored {season} {season_type} games for player {player_id}"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(
+            {
+                "player_id": player_id,
+                "season": season,
+                "season_type": season_type,
+                "stat": stat,
+                "window": window,
+                "games": columnar.rolling(store, rows, stat, window),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class StatLeaders(APIView):
+    """
+    GET /api/players/leaders/?season=2024-25&stat=pts&min_games=20&limit=25
+    Players ranked by per-game average of `stat`, computed over the whole
+    season's column in one pass.
+    """
+    throttle_classes = [TokenBucketThrottle]
+
+    def get(self, request):
+        try:
+            season, season_type = season_params(request)
+            stat = _stat_param(request, "fantasy_points")
+            min_games = int(request.query_params.get("min_games") or 1)
+            limit = int(request.query_params.get("limit") or 25)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= limit <= 500:
+            return Response({"error": "limit must be between 1 and 500"}, status=status.HTTP_400_BAD_REQUEST)
+
+        from . import columnar  # imports NumPy; kept off the startup path
+
+        store = columnar.get(season, season_type)
+        if store is None:
+            return _not_built(season, season_type)
+
+        started = time.perf_counter()
+        leaders = columnar.leaders(store, stat, min_games=max(1, min_games), limit=limit)
+        names = profile_names(p["player_id"] for p in leaders)
+        for p in leaders:
+            p["name"] = names.get(p["player_id"])
+        return Response(
+            {
+                "season": season,
+                "season_type": season_type,
+                "stat": stat,
+                "players_ranked": store.meta["players"],
+                "leaders": leaders,
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 # ---------- Views: Teams ----------
@@ -125,47 +471,69 @@ class TeamList(APIView):
     GET /api/teams/
     Returns all NBA teams for a dropdown list
     """
+    throttle_classes = [TokenBucketThrottle]
 
     def get(self, request):
-        teams = static_teams.get_teams()
-        payload = [
-            {
-                "team_id": int(t["id"]),
-                "abbreviation": t["abbreviation"],
-                "name": t["full_name"],
-            }
-            for t in teams
-        ]
-        payload.sort(key=lambda x: x["name"])
-        return Response(payload, status=status.HTTP_200_OK)
+        payload, etag = reference.team_list()
+        return reference.reference_response(request, etag, settings.REFERENCE_MAX_AGE, lambda: payload)
 
 
 class TeamRoster(APIView):
     """
     GET /api/teams/<team_abbr>/roster/
-    Example: /api/teams/LAL/roster/
+    Example: /api/teams/LAL/roster/?season=2019-20
 
-    Returns current season roster for a team
+    Returns the team's roster for a season (default: current season).
+    Rosters are cached; finished seasons never expire.
     """
+    throttle_classes = [TokenBucketThrottle]
 
     def get(self, request, team_abbr: str):
         team_abbr = team_abbr.upper().strip()
+        try:
+            season = warehouse.parse_season(request.query_params.get("season"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        team = static_teams._find_team_by_abbreviation(team_abbr)
-        if not team:
+        team = static_index.get().team_by_abbreviation(team_abbr)
+        if team is None:
             return Response(
                 {"error": f"Unknown team abbreviation: {team_abbr}"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        team_id = team["id"]
+        team_id = team.id
+
+        cache_key = f"players:roster:{team_id}:{season}"
+        players = cache.get(cache_key)
+        if players is None:
+            # Concurrent misses share one upstream fetch
+            players = upstream_flight.do(cache_key, lambda: self._fetch(team_id, team_abbr, season, cache_key))
 
-        roster = commonteamroster.CommonTeamRoster(
+        payload = {
+            "team": {
+                "team_id": int(team_id),
+                "abbreviation": team_abbr,
+                "name": team.full_name,
+            },
+            "season": season,
+            "players": players,
+        }
+        max_age = 300 if warehouse.is_current_season(season) else settings.REFERENCE_MAX_AGE
+        return reference.reference_response(request, reference.make_etag(payload), max_age, lambda: payload)
+
+    def _fetch(self, team_id: int, team_abbr: str, season: str, cache_key: str) -> list[dict]:
+        # A flight that finished just before this one started may have filled it
+        players = cache.get(cache_key)
+        if players is not None:
+            return players
+
+        roster = upstream.endpoints().CommonTeamRoster(
             team_id=team_id,
-            season="2024-25",
+            season=season,
             timeout=60,
         )
-        df = roster.common_team_roster.get_data_frame()
+        data = roster.common_team_roster.get_dict()
 
         players = [
             {
@@ -174,17 +542,14 @@ class TeamRoster(APIView):
                 "position": r.get("POSITION"),
                 "jersey": r.get("NUM"),
             }
-            for r in df.to_dict(orient="records")
+            for r in (dict(zip(data["headers"], row)) for row in data["data"])
         ]
-
-        return Response(
-            {
-                "team": {
-                    "team_id": int(team_id),
-                    "abbreviation": team_abbr,
-                    "name": team.get("full_name"),
-                },
-                "players": players,
-            },
-            status=status.HTTP_200_OK,
-        )
+        if warehouse.is_current_season(season):
+            warehouse.store_profiles([
+                {"player_id": p["player_id"], "name": p["name"],
+                 "position": p["position"] or "", "team_abbreviation": team_abbr}
+                for p in players
+            ])
+        timeout = settings.NBA_CURRENT_SEASON_TTL if warehouse.is_current_season(season) else None
+        cache.set(cache_key, players, timeout=timeout)
+        return players
@@ -0,0 +1,394 @@
+import re
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, F
+from django.utils import timezone
+
+from . import static_index, upstream
+from .models import PlayerGameLog, PlayerProfile, PlayerSeasonAggregate, SeasonBackfill
+from .scoring import fantasy_points
+
+
+# ---------- Seasons ----------
+
+SEASON_RE = re.compile(r"^(\d{4})-(\d{2})$")
+
+REGULAR_SEASON = "Regular Season"
+SEASON_TYPES = ("Regular Season", "Playoffs", "Pre Season", "All Star")
+
+# PlayerGameLog field -> nba_api column
+STAT_COLUMNS = {
+    "minutes": "MIN",
+    "pts": "PTS",
+    "reb": "REB",
+    "ast": "AST",
+    "stl": "STL",
+    "blk": "BLK",
+    "tov": "TOV",
+    "fg3m": "FG3M",
+    "fgm": "FGM",
+    "fga": "FGA",
+    "ftm": "FTM",
+    "fta": "FTA",
+}
+
+AGGREGATE_STATS = ("minutes", "pts", "reb", "ast", "stl", "blk", "tov", "fg3m", "fantasy_points")
+
+
+def default_season() -> str:
+    return getattr(settings, "NBA_DEFAULT_SEASON", "2024-25")
+
+
+def parse_season(raw: str | None) -> str:
+    """
+    Validate an nba_api season string like "2023-24".
+    Empty means the default season. Raises ValueError on anything else.
+    """
+    raw = (raw or "").strip()
+    if not raw:
+        return default_season()
+
+    m = SEASON_RE.match(raw)
+    if not m or (int(m.group(1)) + 1) % 100 != int(m.group(2)):
+        raise ValueError(f"Invalid season '{raw}', expected a format like 2024-25")
+    return raw
+
+
+def parse_season_type(raw: str | None) -> str:
+    raw = (raw or "").strip()
+    if not raw:
+        return REGULAR_SEASON
+    for season_type in SEASON_TYPES:
+        if raw.lower() == season_type.lower():
+            return season_type
+    raise ValueError(f"Invalid season_type '{raw}', expected one of: {', '.join(SEASON_TYPES)}")
+
+
+def season_bounds(season: str) -> tuple[date, date]:
+    start_year = int(season[:4])
+    return date(start_year, 9, 1), date(start_year + 1, 7, 31)
+
+
+def current_season() -> str:
+    return getattr(settings, "NBA_CURRENT_SEASON", default_season())
+
+
+def is_current_season(season: str) -> bool:
+    return season == current_season()
+
+
+# ---------- Row conversion ----------
+
+def _parse_game_date(raw: str) -> date:
+    # PlayerGameLog sends "Apr 13, 2025", LeagueGameLog sends "2025-04-13"
+    raw = (raw or "").strip()
+    try:
+        return date.fromisoformat(raw[:10])
+    except ValueError:
+        return datetime.strptime(raw.title(), "%b %d, %Y").date()
+
+
+def _parse_minutes(raw) -> float:
+    if raw in (None, ""):
+        return 0.0
+    if isinstance(raw, str) and ":" in raw:
+        mins, secs = raw.split(":", 1)
+        return int(mins) + int(secs) / 60
+    return float(raw)
+
+
+def _row_to_log(row: dict, season: str, season_type: str, player_id: int | None = None) -> PlayerGameLog:
+    stats = {field: row.get(column) or 0 for field, column in STAT_COLUMNS.items()}
+    stats["minutes"] = _parse_minutes(row.get("MIN"))
+    return PlayerGameLog(
+        season=season,
+        season_type=season_type,
+        player_id=int(player_id if player_id is not None else row.get("PLAYER_ID") or row.get("Player_ID")),
+        game_id=str(row.get("GAME_ID") or row.get("Game_ID")),
+        game_date=_parse_game_date(row.get("GAME_DATE")),
+        matchup=row.get("MATCHUP") or "",
+        wl=row.get("WL") or "",
+        fantasy_points=fantasy_points(stats),
+        **stats,
+    )
+
+
+def store_logs(logs: list[PlayerGameLog]) -> None:
+    """Upsert on (season, season_type, player_id, game_id); stat corrections overwrite."""
+    if not logs:
+        return
+    PlayerGameLog.objects.bulk_create(
+        logs,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["season", "season_type", "player_id", "game_id"],
+        update_fields=["game_date", "matchup", "wl", "fantasy_points", *STAT_COLUMNS.keys()],
+    )
+
+
+# fetched_at for aggregates built only from live lines, so the first read pulls the full season
+NEVER_FETCHED = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def refresh_aggregates(season: str, season_type: str, player_ids=None, fetched_at=None) -> int:
+    """
+    Recompute per-season averages with one grouped query and upsert them.
+    Limited to player_ids when given (single-player refresh); otherwise the whole season.
+
+    fetched_at is when the logs were last pulled in full. Partial updates (live
+    box scores) leave it out: existing rows keep theirs, and new rows get
+    NEVER_FETCHED so _is_stale() still sends them for a full fetch.
+    """
+    qs = PlayerGameLog.objects.filter(season=season, season_type=season_type)
+    if player_ids is not None:
+        qs = qs.filter(player_id__in=list(player_ids))
+
+    rows = qs.values("player_id").annotate(
+        games=Count("id"),
+        **{f"{stat}_avg": Avg(stat) for stat in AGGREGATE_STATS},
+    )
+    now = timezone.now()
+    aggregates = [
+        PlayerSeasonAggregate(
+            season=season,
+            season_type=season_type,
+            fetched_at=fetched_at or NEVER_FETCHED,
+            updated_at=now,
+            **{k: (round(v, 2) if isinstance(v, float) else v) for k, v in row.items()},
+        )
+        for row in rows
+    ]
+    update_fields = ["games", "updated_at", *(f"{stat}_avg" for stat in AGGREGATE_STATS)]
+    if fetched_at is not None:
+        update_fields.append("fetched_at")
+    PlayerSeasonAggregate.objects.bulk_create(
+        aggregates,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["season", "season_type", "player_id"],
+        update_fields=update_fields,
+    )
+    return len(aggregates)
+
+
+# ---------- Single-player reads ----------
+
+def _is_stale(aggregate: PlayerSeasonAggregate | None) -> bool:
+    if aggregate is None:
+        return True
+    if not is_current_season(aggregate.season):
+        # Finished seasons never change upstream
+        return False
+    ttl = getattr(settings, "NBA_CURRENT_SEASON_TTL", 6 * 60 * 60)
+    return timezone.now() - aggregate.fetched_at > timedelta(seconds=ttl)
+
+
+def fetch_player_season(player_id: int, season: str, season_type: str = REGULAR_SEASON) -> PlayerSeasonAggregate:
+    """Pull one player's season from nba_api into the store (one upstream call)."""
+    gl = upstream.endpoints().PlayerGameLog(
+        player_id=player_id,
+        season=season,
+        season_type_all_star=season_type,
+        timeout=60,
+    )
+    rows = gl.get_normalized_dict()["PlayerGameLog"]
+    logs = [_row_to_log(r, season, season_type, player_id=player_id) for r in rows]
+
+    now = timezone.now()
+    with transaction.atomic():
+        store_logs(logs)
+        refresh_aggregates(season, season_type, player_ids=[player_id], fetched_at=now)
+        # Players without games still get a row, so the empty season isn't refetched
+        aggregate, _ = PlayerSeasonAggregate.objects.update_or_create(
+            season=season, season_type=season_type, player_id=player_id,
+            defaults={"fetched_at": now, "updated_at": now},
+        )
+    return aggregate
+
+
+def ensure_player_season(player_id: int, season: str, season_type: str = REGULAR_SEASON) -> PlayerSeasonAggregate:
+    aggregate = PlayerSeasonAggregate.objects.filter(
+        season=season, season_type=season_type, player_id=player_id,
+    ).first()
+    if _is_stale(aggregate):
+        aggregate = fetch_player_season(player_id, season, season_type)
+    return aggregate
+
+
+def game_logs(player_id: int, season: str, season_type: str = REGULAR_SEASON,
+              date_from: date | None = None, date_to: date | None = None):
+    """Stored games for the season, newest first, fetching the season once if missing."""
+    ensure_player_season(player_id, season, season_type)
+    qs = PlayerGameLog.objects.filter(season=season, season_type=season_type, player_id=player_id)
+    if date_from:
+        qs = qs.filter(game_date__gte=date_from)
+    if date_to:
+        qs = qs.filter(game_date__lte=date_to)
+    return qs.order_by("-game_date")
+
+
+def season_aggregates(player_id: int, seasons: list[str], season_type: str = REGULAR_SEASON) -> dict:
+    """Local-only lookup used for multi-season comparisons; never calls nba_api."""
+    found = PlayerSeasonAggregate.objects.filter(
+        player_id=player_id, season_type=season_type, season__in=seasons,
+    )
+    return {a.season: a for a in found}
+
+
+def ranked_pool(season: str, season_type: str = REGULAR_SEASON, limit: int | None = None) -> list[tuple[int, float]]:
+    """(player_id, season fantasy points) best first, from stored aggregates only."""
+    qs = (
+        PlayerSeasonAggregate.objects
+        .filter(season=season, season_type=season_type, games__gt=0)
+        .annotate(total=F("fantasy_points_avg") * F("games"))
+        .order_by("-total", "player_id")
+        .values_list("player_id", "total")
+    )
+    return list(qs[:limit] if limit else qs)
+
+
+# ---------- Player profiles ----------
+
+def position_codes(position: str | None) -> frozenset[str]:
+    """
+    "Guard-Forward" (CommonPlayerInfo) or "G-F" (CommonTeamRoster) -> {"G", "F"}.
+    Unknown or empty positions give an empty set.
+    """
+    codes = {part.strip()[:1].upper() for part in (position or "").split("-")}
+    return frozenset(codes & {"G", "F", "C"})
+
+
+def store_profiles(rows: list[dict]) -> None:
+    """Upsert profiles from dicts with player_id, name, position and team_abbreviation."""
+    if not rows:
+        return
+    now = timezone.now()
+    PlayerProfile.objects.bulk_create(
+        [PlayerProfile(updated_at=now, **row) for row in rows],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["player_id"],
+        update_fields=["name", "position", "team_abbreviation", "updated_at"],
+    )
+
+
+def load_team_profiles(season: str, pause: float = 0.6, log=None) -> int:
+    """Refresh every player's profile from CommonTeamRoster, one upstream call per team."""
+    teams = static_index.get().teams
+    loaded = 0
+    for n, team in enumerate(teams):
+        data = upstream.endpoints().CommonTeamRoster(
+            team_id=team.id, season=season, timeout=60,
+        ).common_team_roster.get_dict()
+        rows = [dict(zip(data["headers"], r)) for r in data["data"]]
+        store_profiles([
+            {
+                "player_id": int(r["PLAYER_ID"]),
+                "name": r["PLAYER"],
+                "position": r.get("POSITION") or "",
+                "team_abbreviation": team.abbreviation,
+            }
+            for r in rows
+        ])
+        loaded += len(rows)
+        if log:
+            log(f"{team.abbreviation}: {len(rows)} players")
+        if pause and n < len(teams) - 1:
+            time.sleep(pause)
+    return loaded
+
+
+# ---------- Schedule ----------
+
+SCHEDULE_CACHE_SECONDS = 6 * 3600
+
+
+def teams_playing(day: date) -> frozenset[str] | None:
+    """
+    Abbreviations of the teams with a game on `day`. Past days come from the
+    stored game logs; today and later (whose logs may be partial or missing) from
+    the upstream scoreboard, cached for a few hours. None if the scoreboard can't
+    be fetched, so callers can treat every team as playing.
+    """
+    if day < date.today():
+        matchups = PlayerGameLog.objects.filter(game_date=day).values_list("matchup", flat=True).distinct()
+        played = {m.split()[0] for m in matchups if m}
+        if played:
+            return frozenset(played)
+
+    key = f"players:schedule:{day.isoformat()}"
+    teams = cache.get(key)
+    if teams is None:
+        try:
+            data = upstream.endpoints().ScoreboardV2(game_date=day.isoformat(), timeout=30).line_score.get_dict()
+        except Exception:
+            return None
+        column = data["headers"].index("TEAM_ABBREVIATION")
+        teams = frozenset(r[column] for r in data["data"])
+        cache.set(key, teams, SCHEDULE_CACHE_SECONDS)
+    return teams
+
+
+# ---------- Season backfill ----------
+
+def backfill_season(season: str, season_type: str = REGULAR_SEASON, window_days: int = 7,
+                    restart: bool = False, pause: float = 0.6, log=None) -> SeasonBackfill:
+    """
+    Load every player's games for a season from LeagueGameLog, one date window per
+    upstream call. Each window's rows and the checkpoint commit together, so an
+    interrupted run picks up at the first unfinished window. The checkpoint never
+    passes yesterday: today's games may not have been played yet, so the next run
+    fetches today again.
+    """
+    backfill, _ = SeasonBackfill.objects.get_or_create(season=season, season_type=season_type)
+    if restart:
+        backfill.status = SeasonBackfill.Status.RUNNING
+        backfill.last_date = None
+        backfill.rows_loaded = 0
+        backfill.started_at = timezone.now()
+        backfill.finished_at = None
+        backfill.save()
+    elif backfill.status == SeasonBackfill.Status.COMPLETE:
+        return backfill
+
+    season_start, season_end = season_bounds(season)
+    today = date.today()
+    end = min(season_end, today)
+    cursor = backfill.last_date + timedelta(days=1) if backfill.last_date else season_start
+
+    while cursor <= end:
+        window_end = min(cursor + timedelta(days=window_days - 1), end)
+        result = upstream.endpoints().LeagueGameLog(
+            season=season,
+            season_type_all_star=season_type,
+            player_or_team_abbreviation="P",
+            date_from_nullable=cursor.strftime("%m/%d/%Y"),
+            date_to_nullable=window_end.strftime("%m/%d/%Y"),
+            timeout=60,
+        )
+        rows = result.get_normalized_dict()["LeagueGameLog"]
+        logs = [_row_to_log(r, season, season_type) for r in rows]
+
+        with transaction.atomic():
+            store_logs(logs)
+            backfill.last_date = min(window_end, today - timedelta(days=1))
+            backfill.rows_loaded += len(logs)
+            backfill.updated_at = timezone.now()
+            backfill.save(update_fields=["last_date", "rows_loaded", "updated_at"])
+
+        if log:
+            log(f"{season} {cursor}..{window_end}: {len(logs)} rows")
+        cursor = window_end + timedelta(days=1)
+        if cursor <= end and pause:
+            time.sleep(pause)
+
+    refresh_aggregates(season, season_type, fetched_at=timezone.now())
+    if end >= season_end:
+        backfill.status = SeasonBackfill.Status.COMPLETE
+        backfill.finished_at = timezone.now()
+        backfill.save(update_fields=["status", "finished_at"])
+    return backfill
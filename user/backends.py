@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that serves request.user from the cache, so an authenticated
+    request with a cached session needs no database query at all.
+
+    Only the user's fields minus the password hash are cached, plus the session
+    auth hash (an HMAC of it), which is all Django's per-request session check
+    compares. The password stays a deferred field: anything that needs it (a
+    password check, SECRET_KEY_FALLBACKS) loads it from the row. user/apps.py
+    drops the entry whenever a User is saved or deleted, so a password change
+    still logs out other sessions.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        cached = cache.get(key)
+        if cached is not None:
+            user = _from_cache(cached)
+        else:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, _to_cache(user), timeout=getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 300))
+        return user if self.user_can_authenticate(user) else None
+
+
+def _cached_fields() -> list[str]:
+    return [f.attname for f in get_user_model()._meta.concrete_fields if f.attname != "password"]
+
+
+def _to_cache(user) -> dict:
+    return {
+        "db": user._state.db,
+        "values": [getattr(user, name) for name in _cached_fields()],
+        "session_auth_hash": user.get_session_auth_hash(),
+    }
+
+
+def _from_cache(cached: dict):
+    user = get_user_model().from_db(cached["db"], _cached_fields(), cached["values"])
+    session_auth_hash = cached["session_auth_hash"]
+    user.get_session_auth_hash = lambda: session_auth_hash
+    return user
+
+
+def forget_user(sender, instance, **kwargs):
+    cache.delete(user_cache_key(instance.pk))
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+
+    User = get_user_model()
+    post_save.connect(forget_user, sender=User, dispatch_uid="user.backends.forget_user_save")
+    post_delete.connect(forget_user, sender=User, dispatch_uid="user.backends.forget_user_delete")
@@ -0,0 +1,60 @@
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+}
+AUTH_BACKENDS = {
+    "model": "django.contrib.auth.backends.ModelBackend",
+    "cached": "user.backends.CachedModelBackend",
+}
+
+
+class Command(BaseCommand):
+    help = "Measure authenticated request throughput for each session engine / auth backend combination."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/user/", help="Login-protected URL to request (default: /user/)")
+        parser.add_argument("--duration", type=float, default=3.0, help="Seconds per configuration")
+        parser.add_argument("--configs", default="db:model,cached_db:model,cached_db:cached,cache:cached",
+                            help="Comma separated session_engine:auth_backend pairs")
+
+    def handle(self, *args, **options):
+        username = f"bench_auth_{uuid.uuid4().hex[:8]}"
+        user = User.objects.create_user(username=username, password=uuid.uuid4().hex)
+        try:
+            for config in options["configs"].split(","):
+                engine, backend = config.strip().split(":")
+                with override_settings(SESSION_ENGINE=SESSION_ENGINES[engine],
+                                       AUTHENTICATION_BACKENDS=[AUTH_BACKENDS[backend]]):
+                    self._run(config.strip(), user, options["path"], options["duration"])
+        finally:
+            user.delete()
+
+    def _run(self, label: str, user, path: str, duration: float) -> None:
+        client = Client(HTTP_HOST="localhost")
+        client.force_login(user)
+        client.get(path)  # warm the session and user caches
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(path)
+        if response.status_code != 200:
+            self.stderr.write(f"{label}: GET {path} returned {response.status_code}")
+            return
+
+        done = 0
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            client.get(path)
+            done += 1
+
+        client.logout()
+        self.stdout.write(f"{label:<20} req/s={done / duration:9.1f}  queries/request={len(queries)}")
@@ -1,3 +1,95 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import authenticate, get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from .backends import CachedModelBackend, user_cache_key
+
+
+class CachedModelBackendTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("ann", "ann@test.com", "first-password")
+
+    def test_cache_holds_no_password_hash(self):
+        CachedModelBackend().get_user(self.user.pk)
+
+        cached = cache.get(user_cache_key(self.user.pk))
+        self.assertNotIn(self.user.password, repr(cached))
+        with self.assertNumQueries(0):
+            user = CachedModelBackend().get_user(self.user.pk)
+        self.assertEqual((user.pk, user.username, user.email), (self.user.pk, "ann", "ann@test.com"))
+        self.assertEqual(user.get_session_auth_hash(), self.user.get_session_auth_hash())
+        # The hash is loaded from the row when something needs it
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password("first-password"))
+
+    def test_password_change_logs_out_other_sessions(self):
+        other = self.client_class()
+        other.login(username="ann", password="first-password")
+        self.assertTrue(other.get("/").wsgi_request.user.is_authenticated)
+        self.assertTrue(other.get("/").wsgi_request.user.is_authenticated)  # served from the cache
+
+        self.user.set_password("second-password")
+        self.user.save()
+
+        self.assertFalse(other.get("/").wsgi_request.user.is_authenticated)
+
+    def test_saving_the_cached_user_keeps_the_password(self):
+        CachedModelBackend().get_user(self.user.pk)
+        user = CachedModelBackend().get_user(self.user.pk)
+        user.first_name = "Ann"
+        user.save()
+
+        self.assertTrue(get_user_model().objects.get(pk=self.user.pk).check_password("first-password"))
+
+
+@override_settings(LOGIN_MAX_ATTEMPTS_PER_IP=4, LOGIN_MAX_ATTEMPTS_PER_USERNAME=2)
+class LoginThrottleTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        get_user_model().objects.create_user("ann", "ann@test.com", "right-password")
+
+    def login(self, username, password, ip="10.0.0.1"):
+        return self.client.post("/user/login/", {"username": username, "password": password}, REMOTE_ADDR=ip)
+
+    def test_username_is_blocked_before_authenticate(self):
+        for _ in range(2):
+            self.assertEqual(self.login("ann", "wrong").status_code, 200)
+
+        with mock.patch("user.views.authenticate", wraps=authenticate) as auth:
+            res = self.login("ann", "right-password", ip="10.0.0.2")
+        self.assertEqual(res.status_code, 429)
+        auth.assert_not_called()
+        self.assertNotIn("_auth_user_id", self.client.session)
+
+    def test_successful_login_resets_the_username(self):
+        self.login("ann", "wrong")
+        self.assertEqual(self.login("ann", "right-password").status_code, 302)
+        self.client.logout()
+
+        # One failure left before the reset would have blocked the next attempt
+        self.login("ann", "wrong")
+        self.assertEqual(self.login("ann", "right-password").status_code, 302)
+
+    def test_ip_cap_covers_every_username(self):
+        for name in ("bob", "cat", "dan", "eve"):
+            self.login(name, "wrong")
+
+        self.assertEqual(self.login("ann", "right-password").status_code, 429)
+        self.assertEqual(self.login("ann", "right-password", ip="10.0.0.2").status_code, 302)
+
+    def test_registration_is_capped_per_ip(self):
+        def register(n, ip="10.0.0.1"):
+            return self.client.post("/user/register/", {
+                "username": f"user{n}", "email": f"user{n}@test.com",
+                "password": "pw", "confirm_password": "other",
+            }, REMOTE_ADDR=ip)
+
+        for n in range(4):
+            self.assertEqual(register(n).status_code, 200)
+        self.assertEqual(register(4).status_code, 429)
+        self.assertEqual(register(5, ip="10.0.0.2").status_code, 200)
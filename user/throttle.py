@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.cache import cache
+
+
+# Failed-login limiter. Counters live in the shared cache, keyed per client IP
+# and per username, and expire LOGIN_ATTEMPT_WINDOW seconds after the first
+# failure. A blocked request is rejected before authenticate() runs, so
+# guessing passwords can't keep every worker busy in the password hasher.
+
+def client_ip(request) -> str:
+    return request.META.get("REMOTE_ADDR") or "unknown"
+
+
+def _limits() -> dict[str, int]:
+    return {
+        "ip": getattr(settings, "LOGIN_MAX_ATTEMPTS_PER_IP", 20),
+        "user": getattr(settings, "LOGIN_MAX_ATTEMPTS_PER_USERNAME", 5),
+    }
+
+
+def _keys(scope: str, ip: str, username: str | None) -> dict[str, str]:
+    keys = {"ip": f"auth:{scope}:ip:{ip}"}
+    if username:
+        keys["user"] = f"auth:{scope}:user:{username.strip().lower()}"
+    return keys
+
+
+def is_blocked(scope: str, ip: str, username: str | None = None) -> bool:
+    keys = _keys(scope, ip, username)
+    counts = cache.get_many(list(keys.values()))
+    limits = _limits()
+    return any(counts.get(key, 0) >= limits[kind] for kind, key in keys.items())
+
+
+def record_failure(scope: str, ip: str, username: str | None = None) -> None:
+    window = getattr(settings, "LOGIN_ATTEMPT_WINDOW", 15 * 60)
+    for key in _keys(scope, ip, username).values():
+        # add() starts the window on the first failure; incr() keeps its expiry
+        if not cache.add(key, 1, timeout=window):
+            try:
+                cache.incr(key)
+            except ValueError:  # expired between add() and incr()
+                cache.add(key, 1, timeout=window)
+
+
+def reset(scope: str, username: str) -> None:
+    # Only the username counter: other users behind the same IP keep theirs
+    cache.delete(_keys(scope, "", username)["user"])
@@ -5,6 +5,8 @@ from django.shortcuts import render, redirect
 from django.http import HttpResponse
 from django.contrib import messages
 
+from . import throttle
+
 
 @login_required
 def home(request):
@@ -13,6 +15,13 @@ def home(request):
 
 def register_view(request):
     if request.method == 'POST':
+        ip = throttle.client_ip(request)
+        if throttle.is_blocked('register', ip):
+            messages.error(request, 'Too many attempts. Please try again later.')
+            return render(request, 'registration/register.html', status=429)
+        # Every registration attempt costs a password hash, so count them all
+        throttle.record_failure('register', ip)
+
         username = request.POST['username']
         email = request.POST['email']
         password = request.POST['password']
@@ -34,12 +43,19 @@ def login_view(request):
     if request.method == 'POST':
         username = request.POST['username']
         password = request.POST['password']
+        ip = throttle.client_ip(request)
+        if throttle.is_blocked('login', ip, username):
+            messages.error(request, "Too many failed login attempts. Please try again later.")
+            return render(request, 'registration/login.html', status=429)
+
         user = authenticate(request, username= username, password= password)
 
         if user is not None:
+            throttle.reset('login', username)
             login(request, user)
             return redirect('home')
         else:
+            throttle.record_failure('login', ip, username)
             messages.error(request, "Invalid username or password")
     return render(request, 'registration/login.html')
 